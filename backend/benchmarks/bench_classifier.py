@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: news relevance classification.
+Compares the previous per-category regex searches (fetch_private_health._is_relevant,
+fetch_sector_news._qualifies) with news_classifier's single-pass phrase table on synthetic
+articles, then grows the keyword lists to show how each scales.
+
+Run: cd backend && python benchmarks/bench_classifier.py [--articles 5000] [--extra 500] [--repeat 5]
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from news_classifier import KEYWORDS, KeywordClassifier
+
+FILLER = (
+    "the company said on monday that its software platform for small businesses "
+    "would expand into new markets after a strong quarter with customers across "
+    "europe latin america and north america according to people familiar"
+).split()
+
+
+def _legacy_pattern(keywords: list[str]) -> re.Pattern:
+    """One alternation regex per category, as shipped before news_classifier."""
+    alternatives = "|".join(re.escape(k).replace(r"\ ", " ") for k in keywords)
+    return re.compile(rf"\b({alternatives})\b", re.I)
+
+
+def _legacy_classify(patterns: dict[str, re.Pattern], text: str) -> set[str]:
+    text = text.lower()
+    return {c for c, p in patterns.items() if p.search(text)}
+
+
+def make_articles(n: int, seed: int = 7) -> list[str]:
+    """Synthetic title + description texts; about half contain a keyword."""
+    rng = random.Random(seed)
+    keywords = sorted({k for ks in KEYWORDS.values() for k in ks if "-" not in k and "/" not in k})
+    out = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(20, 60))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        out.append(" ".join(words).capitalize())
+    return out
+
+
+def extra_keywords(n: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(5, 10))) for _ in range(n)]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n_articles = int(sys.argv[sys.argv.index("--articles") + 1]) if "--articles" in sys.argv else 5000
+    n_extra = int(sys.argv[sys.argv.index("--extra") + 1]) if "--extra" in sys.argv else 500
+    repeat = int(sys.argv[sys.argv.index("--repeat") + 1]) if "--repeat" in sys.argv else 5
+    articles = make_articles(n_articles)
+
+    print(f"Articles: {n_articles} (best of {repeat})\n")
+    for label, extra in (("shipped keywords", 0), (f"+{n_extra} keywords/category", n_extra)):
+        categories = {c: ks + extra_keywords(extra, seed=i) for i, (c, ks) in enumerate(KEYWORDS.items())}
+        patterns = {c: _legacy_pattern(ks) for c, ks in categories.items()}
+        classifier = KeywordClassifier(categories)
+        assert all(_legacy_classify(patterns, a) == classifier.classify(a) for a in articles)
+
+        legacy = _best_of(lambda: [_legacy_classify(patterns, a) for a in articles], repeat)
+        single = _best_of(lambda: [classifier.classify(a) for a in articles], repeat)
+        print(f"  {label:28s} regex {legacy * 1000:9.2f} ms   single-pass {single * 1000:8.2f} ms   {legacy / single:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
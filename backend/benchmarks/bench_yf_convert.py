@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: yfinance DataFrame -> FMP-shaped rows.
+Compares the previous DataFrame.iterrows() conversion with yf_fallback._frame_to_rows
+(columnar) on a synthetic one-year, multi-ticker download.
+
+Run: cd backend && python benchmarks/bench_yf_convert.py [--tickers 30] [--repeat 5]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from yf_fallback import _frame_to_rows, _ticker_frame
+
+
+def _legacy_get_row_val(row, key, default=0):
+    for c in row.index:
+        if c == key or (isinstance(c, tuple) and c[0] == key):
+            return float(row[c])
+    return float(default)
+
+
+def _legacy_frame_to_rows(data) -> list[dict]:
+    """Row-by-row conversion as shipped before the columnar path."""
+    rows = []
+    for idx, row in data.iterrows():
+        date_str = idx.strftime("%Y-%m-%d") if hasattr(idx, "strftime") else str(idx)[:10]
+        close_val = _legacy_get_row_val(row, "Close", 0)
+        rows.append({
+            "date": date_str,
+            "open": _legacy_get_row_val(row, "Open", close_val),
+            "high": _legacy_get_row_val(row, "High", close_val),
+            "low": _legacy_get_row_val(row, "Low", close_val),
+            "close": close_val,
+        })
+    rows.sort(key=lambda r: r["date"], reverse=True)
+    return rows
+
+
+def make_frame(n_tickers: int, days: int = 252, seed: int = 7) -> pd.DataFrame:
+    """Synthetic yf.download(group_by='column') result: (field, ticker) MultiIndex columns."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2026-02-03", periods=days)
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+    fields = ["Close", "High", "Low", "Open", "Volume"]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(days, n_tickers)), axis=0))
+    blocks = {
+        "Close": close,
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Open": close * (1 + rng.normal(0, 0.005, size=close.shape)),
+        "Volume": rng.integers(1e5, 1e7, size=close.shape).astype(float),
+    }
+    data = np.hstack([blocks[f] for f in fields])
+    columns = pd.MultiIndex.from_product([fields, tickers], names=["Price", "Ticker"])
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n_tickers = int(sys.argv[sys.argv.index("--tickers") + 1]) if "--tickers" in sys.argv else 30
+    repeat = int(sys.argv[sys.argv.index("--repeat") + 1]) if "--repeat" in sys.argv else 5
+    frame = make_frame(n_tickers)
+    tickers = list(frame.columns.get_level_values(1).unique())
+    # What a single-symbol yf.download returns: MultiIndex columns for one ticker
+    single = frame.loc[:, (slice(None), tickers[0])]
+    per_ticker = [_ticker_frame(frame, t) for t in tickers]
+
+    assert _legacy_frame_to_rows(single) == _frame_to_rows(single)
+    assert all(_legacy_frame_to_rows(f) == _frame_to_rows(f) for f in per_ticker)
+
+    print(f"Frame: {len(frame)} days x {n_tickers} tickers (best of {repeat})\n")
+    cases = [
+        ("single-ticker MultiIndex", lambda conv: conv(single)),
+        (f"{n_tickers} tickers, split", lambda conv: [conv(f) for f in per_ticker]),
+    ]
+    for label, run in cases:
+        legacy = _best_of(lambda: run(_legacy_frame_to_rows), repeat)
+        columnar = _best_of(lambda: run(_frame_to_rows), repeat)
+        print(f"  {label:28s} iterrows {legacy * 1000:9.2f} ms   columnar {columnar * 1000:8.2f} ms   {legacy / columnar:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
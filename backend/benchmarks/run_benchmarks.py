@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the backend fetch and data-processing hot paths.
+
+Runs fetch_prices against a synthetic ticker universe and a local stub provider (no
+network, no API keys) in a scratch data/ directory, and reports wall time (best of
+--repeat) and peak Python memory (tracemalloc) per stage:
+
+  snapshot       fetch_daily_snapshot: quote batch -> snapshot assembly -> index/history write
+  backfill       backfill over --days trading days for every ticker
+  patch_missing  _patch_daily_missing_tickers with 10% of tickers absent from every file
+  patch_ltm      _patch_ltm_from_daily with half the LTM tickers missing
+  validate       validate_data over every daily file (cold index)
+  yf_convert     yf_fallback DataFrame -> rows for every ticker (needs pandas)
+
+Results are compared against benchmarks/baseline.json (same --tickers/--days only).
+Timings are machine-dependent: refresh the baseline on the machine you compare on.
+
+Run: cd backend && python benchmarks/run_benchmarks.py [--tickers 120] [--days 260] [--repeat 3]
+         [--only backfill,validate] [--save-baseline] [--check]
+"""
+
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fetch_prices
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+REGRESSION_RATIO = 1.5  # --check fails when a stage is this much slower than the baseline
+
+
+def _arg(flag: str, default):
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            return type(default)(sys.argv[idx + 1])
+    return default
+
+
+def _price(ticker_idx: int, day: int) -> float:
+    """Deterministic synthetic close: a per-ticker level with a bounded zigzag."""
+    return round((50 + ticker_idx % 400) * (1 + ((day * 7 + ticker_idx * 13) % 21 - 10) / 200), 2)
+
+
+def _business_days(from_date: str, to_date: str) -> list[str]:
+    d = datetime.strptime(from_date, "%Y-%m-%d")
+    end = datetime.strptime(to_date, "%Y-%m-%d")
+    out = []
+    while d <= end:
+        if d.weekday() < 5:
+            out.append(d.strftime("%Y-%m-%d"))
+        d += timedelta(days=1)
+    return out
+
+
+class StubFetcher:
+    """FMPFetcher stand-in serving synthetic quotes and EOD history."""
+
+    batch_quote_supported = True
+
+    def __init__(self, tickers: list[str]):
+        self.index = {t: i for i, t in enumerate(tickers)}
+        self.calls = 0
+
+    def _row(self, ticker: str, date_str: str) -> dict:
+        close = _price(self.index[ticker], datetime.strptime(date_str, "%Y-%m-%d").toordinal())
+        return {"date": date_str, "open": close, "high": close * 1.01, "low": close * 0.99, "close": close}
+
+    def get_quote(self, symbol: str) -> dict | None:
+        self.calls += 1
+        today = datetime.now().toordinal()
+        price, prev = _price(self.index[symbol], today), _price(self.index[symbol], today - 1)
+        return {"symbol": symbol, "price": price, "previousClose": prev,
+                "change": price - prev, "changePercentage": (price - prev) / prev * 100}
+
+    def get_batch_quote(self, symbols: list[str], fallback_to_single: bool = True) -> list[dict]:
+        self.calls += 1
+        return [self.get_quote(s) for s in symbols]
+
+    def get_historical_eod(self, symbol: str, from_date: str, to_date: str) -> list[dict]:
+        self.calls += 1
+        rows = [self._row(symbol, d) for d in _business_days(from_date, to_date)]
+        return rows[::-1]  # FMP order: newest first
+
+
+def make_universe(n_tickers: int) -> tuple[dict, dict]:
+    """Synthetic TICKERS / SECTORS spread across the real sector ids."""
+    sector_ids = list(fetch_prices.SECTORS)
+    tickers = {f"T{i:04d}": {"name": f"Synthetic {i}", "sector": sector_ids[i % len(sector_ids)]}
+               for i in range(n_tickers)}
+    sectors = {sid: {"name": fetch_prices.SECTORS[sid]["name"],
+                     "tickers": [t for t, m in tickers.items() if m["sector"] == sid]}
+               for sid in sector_ids}
+    return tickers, sectors
+
+
+def _reset(data_dir: Path, fetcher: StubFetcher) -> None:
+    """Point fetch_prices at data_dir with a fresh price store, index and stub fetcher."""
+    fetch_prices.DATA_DIR = data_dir
+    fetch_prices._price_store = None
+    fetch_prices._daily_index = None
+    fetch_prices._fetcher = fetcher
+
+
+def _use_stub_providers(tickers: dict, sectors: dict) -> StubFetcher:
+    fetch_prices.TICKERS = tickers
+    fetch_prices.SECTORS = sectors
+    # Nothing may reach Yahoo: every synthetic ticker is FMP-routed and the stub always answers
+    fetch_prices.yf_get_quote = lambda *a: None
+    fetch_prices.yf_get_quotes = lambda *a: {}
+    fetch_prices.yf_get_historical_eod = lambda *a: []
+    fetch_prices.yf_get_historical_eod_batch = lambda *a: {}
+    return StubFetcher(list(tickers))
+
+
+def _copy_data(template: Path, scratch: Path) -> Path:
+    target = scratch / f"data-{time.perf_counter_ns()}"
+    shutil.copytree(template, target)
+    return target
+
+
+def _write_json(path: Path, obj) -> None:
+    path.write_text(json.dumps(obj, indent=2))
+
+
+def build_cases(scratch: Path, tickers: dict, fetcher: StubFetcher, days: int) -> dict:
+    """{name: (setup() -> None, run() -> None)}; setup is not timed."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    start = _business_days((datetime.now() - timedelta(days=days * 7 // 5 + 7)).strftime("%Y-%m-%d"), today)[-days]
+    names = list(tickers)
+
+    # Backfilled data/ shared (copied) by the read-side cases
+    template = scratch / "template"
+    template.mkdir()
+    _reset(template, fetcher)
+    with contextlib.redirect_stdout(io.StringIO()):
+        fetch_prices.backfill(start_date=start)
+    closes = {t: fetcher._row(t, start)["close"] for t in names}
+    _write_json(template / "baseline.json", {"date": start, "tickers": {t: {"price": closes[t]} for t in names}})
+    ltm = {"tickers": {t: {"name": tickers[t]["name"], "sector": tickers[t]["sector"], "high_price": closes[t],
+                           "high_date": start, "zero_price": closes[t], "ltm_high_pct": 0.0} for t in names},
+           "sectors": {}}
+    _write_json(template / "ltm_high.json", ltm)
+
+    def fresh(path: Path = None):
+        _reset(path or _copy_data(template, scratch), fetcher)
+
+    def empty():
+        path = scratch / f"empty-{time.perf_counter_ns()}"
+        path.mkdir()
+        fresh(path)
+
+    def drop_tickers():
+        fresh()
+        dropped = set(names[::10])
+        for f in fetch_prices.DATA_DIR.glob("2*.json"):
+            snap = json.loads(f.read_text())
+            snap["tickers"] = {t: v for t, v in snap["tickers"].items() if t not in dropped}
+            _write_json(f, snap)
+        (fetch_prices.DATA_DIR / "history.json").unlink(missing_ok=True)
+        fetch_prices._daily_index = None
+
+    def drop_ltm():
+        fresh()
+        path = fetch_prices.DATA_DIR / "ltm_high.json"
+        _write_json(path, {"tickers": {t: v for t, v in ltm["tickers"].items() if t not in set(names[::2])},
+                           "sectors": {}})
+
+    cases = {
+        "snapshot": (empty, lambda: fetch_prices.fetch_daily_snapshot(today)),
+        "backfill": (empty, lambda: fetch_prices.backfill(start_date=start)),
+        "patch_missing": (drop_tickers, fetch_prices._patch_daily_missing_tickers),
+        "patch_ltm": (drop_ltm, fetch_prices._patch_ltm_from_daily),
+        "validate": (fresh, fetch_prices.validate_data),
+    }
+    try:
+        import numpy  # noqa: F401  (yf_convert needs pandas + numpy)
+        from bench_yf_convert import make_frame
+        from yf_fallback import _frame_to_rows, _ticker_frame
+
+        frame = make_frame(len(names), days=days)
+        cols = list(frame.columns.get_level_values(1).unique())
+        cases["yf_convert"] = (lambda: None, lambda: [_frame_to_rows(_ticker_frame(frame, t)) for t in cols])
+    except ImportError:
+        print("  (yf_convert skipped: pandas not installed)")
+    return cases
+
+
+def measure(setup, run, repeat: int) -> dict:
+    """Best-of-repeat wall time, then one traced run for peak memory."""
+    best = float("inf")
+    for _ in range(repeat):
+        setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+    setup()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mb": round(peak / 2**20, 2)}
+
+
+def main() -> int:
+    n_tickers = _arg("--tickers", 120)
+    days = _arg("--days", 260)
+    repeat = _arg("--repeat", 3)
+    only = [c for c in _arg("--only", "").split(",") if c]
+
+    tickers, sectors = make_universe(n_tickers)
+    fetcher = _use_stub_providers(tickers, sectors)
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    comparable = baseline.get("params") == {"tickers": n_tickers, "days": days}
+
+    print(f"Universe: {n_tickers} tickers x {days} trading days (best of {repeat})\n")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = build_cases(Path(tmp), tickers, fetcher, days)
+        for name, (setup, run) in cases.items():
+            if only and name not in only:
+                continue
+            results[name] = measure(setup, run, repeat)
+            line = f"  {name:14s} {results[name]['seconds'] * 1000:10.1f} ms  {results[name]['peak_mb']:8.2f} MB peak"
+            base = baseline.get("results", {}).get(name) if comparable else None
+            if base:
+                ratio = results[name]["seconds"] / base["seconds"] if base["seconds"] else 1.0
+                results[name]["vs_baseline"] = round(ratio, 2)
+                flag = "  ⚠ slower" if ratio > REGRESSION_RATIO else ""
+                line += f"   baseline {base['seconds'] * 1000:9.1f} ms  {ratio:5.2f}x{flag}"
+            print(line)
+    if baseline and not comparable:
+        print(f"\n  (baseline is for {baseline.get('params')}; not compared)")
+
+    if "--save-baseline" in sys.argv:
+        saved = dict(baseline.get("results", {})) if comparable else {}
+        saved.update({k: {"seconds": v["seconds"], "peak_mb": v["peak_mb"]} for k, v in results.items()})
+        out = {"saved_at": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+               "params": {"tickers": n_tickers, "days": days}, "results": saved}
+        BASELINE_FILE.write_text(json.dumps(out, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {BASELINE_FILE}")
+    if "--check" in sys.argv:
+        slow = [k for k, v in results.items() if v.get("vs_baseline", 0) > REGRESSION_RATIO]
+        if slow:
+            print(f"\n❌ Slower than {REGRESSION_RATIO}x baseline: {', '.join(slow)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Record/replay of provider responses for offline, deterministic runs.
+
+With PROVIDER_CASSETTE=path and PROVIDER_CASSETTE_MODE=record, every FMP, Yahoo, NewsAPI
+and DDG call goes to the network as usual and its result (or error) is saved to a gzipped
+JSON cassette at exit. With PROVIDER_CASSETTE_MODE=replay, the same calls are served from
+the cassette with no network access, no API keys and no rate-limit waits. A call that was
+not recorded raises CassetteMiss. REPLAY_LATENCY_MS adds simulated latency per call: a
+number of milliseconds, or "recorded" to sleep as long as the recorded call took.
+
+Calls are keyed by provider, operation and request arguments (API keys and since-last-run
+windows excluded), and repeated calls replay in recorded order. Date ranges are part of the
+key, so replay a cassette against the data/ it was recorded with, on the same day, or with
+fixed-date workloads.
+"""
+
+import atexit
+import copy
+import functools
+import gzip
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from run_metrics import get_metrics
+
+RECORD, REPLAY = "record", "replay"
+
+
+class CassetteMiss(KeyError):
+    """Replay asked for a call the cassette does not contain."""
+
+
+class Cassette:
+    def __init__(self, path: Path, mode: str, latency_ms: str = None, sleep=time.sleep):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"cassette mode must be {RECORD!r} or {REPLAY!r}, not {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[dict]] = {}
+        self._positions: dict[str, int] = {}
+        if mode == REPLAY:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                self._entries = json.load(f)["calls"]
+
+    def call(self, provider: str, operation: str, args, fn):
+        """Run fn() (record) or return its recorded result (replay) for this provider call."""
+        key = f"{provider}:{operation}:{json.dumps(args, sort_keys=True, default=str)}"
+        if self.mode == REPLAY:
+            return self._replay(provider, operation, key)
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self._append(key, {"error": _describe(e), "seconds": round(time.perf_counter() - start, 4)})
+            raise
+        # JSON round-trip: what is stored is exactly what replay returns
+        stored = json.loads(json.dumps(result, default=str))
+        self._append(key, {"result": stored, "seconds": round(time.perf_counter() - start, 4)})
+        return result
+
+    def _append(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+
+    def _replay(self, provider: str, operation: str, key: str):
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(key)
+            i = self._positions.get(key, 0)
+            self._positions[key] = i + 1
+            entry = entries[min(i, len(entries) - 1)]  # past the recording: repeat the last response
+        delay = self._delay(entry["seconds"])
+        if delay:
+            self._sleep(delay)
+        get_metrics().record(provider, operation, delay, "replay" if "result" in entry else "error")
+        if "error" in entry:
+            raise _rebuild(entry["error"])
+        return copy.deepcopy(entry["result"])
+
+    def _delay(self, recorded: float) -> float:
+        if not self.latency_ms:
+            return 0.0
+        if self.latency_ms == "recorded":
+            return recorded
+        return float(self.latency_ms) / 1000
+
+    def save(self) -> None:
+        if self.mode != RECORD:
+            return
+        with self._lock:
+            out = {"recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "calls": self._entries}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                json.dump(out, f, separators=(",", ":"))
+        print(f"📼 Recorded {sum(len(v) for v in self._entries.values())} provider call(s) to {self.path}")
+
+
+def _describe(e: Exception) -> dict:
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    return {"type": type(e).__name__, "message": str(e), "status": status}
+
+
+_ERROR_TYPES = {"PermissionError": PermissionError, "ValueError": ValueError, "ImportError": ImportError}
+
+
+def _rebuild(error: dict) -> Exception:
+    """Recreate a recorded error; HTTP errors keep their status code (e.g. FMP's 402)."""
+    if error.get("status") is not None:
+        response = requests.Response()
+        response.status_code = error["status"]
+        return requests.exceptions.HTTPError(error["message"], response=response)
+    return _ERROR_TYPES.get(error["type"], RuntimeError)(error["message"])
+
+
+_cassette = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette | None:
+    """Process-wide cassette from PROVIDER_CASSETTE / PROVIDER_CASSETTE_MODE, or None."""
+    global _cassette, _cassette_loaded
+    with _cassette_lock:
+        if not _cassette_loaded:
+            path = os.getenv("PROVIDER_CASSETTE")
+            if path:
+                _cassette = Cassette(path, os.getenv("PROVIDER_CASSETTE_MODE", REPLAY),
+                                     os.getenv("REPLAY_LATENCY_MS"))
+                atexit.register(_cassette.save)
+            _cassette_loaded = True
+        return _cassette
+
+
+def replaying() -> bool:
+    """True when provider calls are served from a cassette (no network, keys optional)."""
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == REPLAY
+
+
+def replayable(provider: str, operation, key=None):
+    """
+    Decorator routing a provider call through the cassette, if one is configured.
+    operation is a name, or a callable of the call's arguments returning one.
+    key(*args, **kwargs) returns the JSON-able request arguments identifying the call
+    (default: all arguments).
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cassette = get_cassette()
+            if cassette is None:
+                return fn(*args, **kwargs)
+            name = operation(*args, **kwargs) if callable(operation) else operation
+            args_key = key(*args, **kwargs) if key else [args, kwargs]
+            return cassette.call(provider, name, args_key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorate
@@ -0,0 +1,68 @@
+"""
+Per-provider circuit breaker for the price fetchers.
+
+After `threshold` consecutive failures a provider's breaker opens and calls to it are
+skipped, so the rest of the run goes straight to the healthy provider. Once `cooldown`
+seconds pass, the breaker half-opens: one probe call goes through. If the probe succeeds
+the breaker closes; if it fails the breaker opens again for another cooldown.
+"""
+
+import os
+import threading
+import time
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+DEFAULT_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5"))
+DEFAULT_COOLDOWN_SEC = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN_SEC", "60"))
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int = DEFAULT_THRESHOLD,
+                 cooldown: float = DEFAULT_COOLDOWN_SEC, clock=time.monotonic):
+        self.name = name
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.skipped = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while calls would be skipped (open and still cooling down, or a probe in flight)."""
+        with self._lock:
+            if self.state == OPEN:
+                return self._clock() - self._opened_at < self.cooldown
+            return self.state == HALF_OPEN and self._probing
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. After the cooldown, lets exactly one probe through."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+                if self.state == CLOSED:
+                    print(f"  ⚡ {self.name} circuit open after {self.failures} consecutive failures "
+                          f"— skipping it for {self.cooldown:.0f}s")
+                self.state = OPEN
+                self._opened_at = self._clock()
+            self._probing = False
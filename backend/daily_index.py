@@ -0,0 +1,114 @@
+"""
+In-memory index of daily snapshot files (data/2026-*.json), parsed once per process.
+
+The patch, repair and validate passes in fetch_prices all read from one DailyIndex
+(file stem -> snapshot dict) instead of re-globbing and re-parsing the directory, and
+write back only the files they changed. When given a HistoryArtifact, every write also
+updates the consolidated history file.
+"""
+
+import json
+from pathlib import Path
+
+from history_artifact import HistoryArtifact
+
+DAILY_GLOB = "2026-*.json"
+
+
+class DailyIndex:
+    def __init__(self, data_dir: Path, history: HistoryArtifact | None = None):
+        self.data_dir = Path(data_dir)
+        self.history = history
+        self._snapshots: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        # Stems whose file exists but does not parse
+        self.unreadable: set[str] = set()
+        self._loaded = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        for path in sorted(self.data_dir.glob(DAILY_GLOB)):
+            try:
+                self._snapshots[path.stem] = json.loads(path.read_text())
+            except (json.JSONDecodeError, OSError):
+                self.unreadable.add(path.stem)
+
+    def stems(self, dates_only: bool = False) -> list[str]:
+        """Sorted file stems; dates_only skips intraday files like 2026-02-12-noon."""
+        self._load()
+        stems = sorted(self._snapshots)
+        if dates_only:
+            stems = [s for s in stems if s.count("-") == 2]
+        return stems
+
+    def get(self, stem: str) -> dict | None:
+        self._load()
+        return self._snapshots.get(stem)
+
+    def tickers(self, stem: str) -> dict:
+        return (self.get(stem) or {}).get("tickers", {})
+
+    def items(self, dates_only: bool = False):
+        """(stem, snapshot) pairs in date order."""
+        return [(s, self._snapshots[s]) for s in self.stems(dates_only)]
+
+    def mark_dirty(self, stem: str) -> None:
+        self._dirty.add(stem)
+
+    def dirty(self) -> list[str]:
+        """Stems changed in memory but not yet flushed."""
+        return sorted(self._dirty)
+
+    def put(self, stem: str, snapshot: dict) -> None:
+        """Replace a snapshot in memory; written on the next flush()."""
+        self._load()
+        self._snapshots[stem] = snapshot
+        self.unreadable.discard(stem)
+        self._dirty.add(stem)
+
+    def write(self, stem: str, snapshot: dict) -> Path:
+        """
+        Replace a snapshot and write its file immediately. Each call also saves the whole
+        history artifact, so passes writing many days put() them and flush() once.
+        """
+        self.put(stem, snapshot)
+        self._dirty.discard(stem)
+        path = self._write_file(stem)
+        self._update_history([stem])
+        return path
+
+    def flush(self) -> int:
+        """Write every changed snapshot back to disk. Returns number of files written."""
+        stems = sorted(self._dirty)
+        for stem in stems:
+            self._write_file(stem)
+        self._dirty.clear()
+        if stems:
+            self._update_history(stems)
+        return len(stems)
+
+    def _update_history(self, stems: list[str]) -> None:
+        """Fold written snapshots into the history artifact; seeds it from every file if missing."""
+        if self.history is None:
+            return
+        if not self.history.load():
+            self.history.rebuild(snapshot for _, snapshot in self.items())
+            self.history.save()
+            return
+        changed = [self.history.update(self._snapshots[stem]) for stem in stems]
+        if any(changed):
+            self.history.save()
+
+    def rebuild_history(self) -> None:
+        """Regenerate the history artifact from every snapshot on disk."""
+        if self.history is not None:
+            self.history.rebuild(snapshot for _, snapshot in self.items())
+            self.history.save()
+
+    def _write_file(self, stem: str) -> Path:
+        path = self.data_dir / f"{stem}.json"
+        with open(path, "w") as f:
+            json.dump(self._snapshots[stem], f, indent=2)
+        return path
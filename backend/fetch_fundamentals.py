@@ -9,30 +9,24 @@ Or:  npm run fetch:fundamentals
 """
 
 import json
+import os
 import sys
-import time
 import logging
 import warnings
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from cassette import replayable, replaying
+from rate_limit import get_limiter
+from run_metrics import get_metrics, write_report
+from yf_fallback import load_yfinance, yahoo_session
+
 warnings.filterwarnings("ignore", message=".*possibly delisted.*")
 warnings.filterwarnings("ignore", message=".*no timezone found.*")
 warnings.filterwarnings("ignore", message=".*No timezone found.*")
 logging.getLogger("yfinance").setLevel(logging.WARNING)
 
-try:
-    import yfinance as yf
-except ImportError:
-    print("yfinance not installed. Run: pip install yfinance")
-    sys.exit(1)
-
-_yf_session = None
-try:
-    from curl_cffi import requests as curl_requests
-    _yf_session = curl_requests.Session(impersonate="chrome", timeout=15)
-except ImportError:
-    pass
 
 TICKERS = {
     "HUBS":     {"name": "HubSpot",                "sector": "crm"},
@@ -71,7 +65,16 @@ TICKERS = {
 }
 
 DATA_DIR = Path(__file__).parent.parent / "data"
-DELAY_BETWEEN_TICKERS = 0.5
+# Concurrent Ticker.info fetches (Yahoo request rate is still capped by YAHOO_RATE_PER_MIN)
+FUNDAMENTALS_WORKERS = int(os.getenv("FUNDAMENTALS_WORKERS", "4"))
+
+# Per-ticker cache of raw .info fields. Quarter-level fields (revenue, growth, margins,
+# debt, cash) are reused for INFO_CACHE_TTL_DAYS; within that window a rerun only
+# refreshes the price through the lighter fast_info and rescales market cap and EV.
+INFO_CACHE_PATH = Path(os.getenv("INFO_CACHE_PATH") or Path(__file__).resolve().parent.parent / ".cache" / "yf_info.json")
+INFO_CACHE_TTL_DAYS = float(os.getenv("INFO_CACHE_TTL_DAYS", "7"))
+QUARTERLY_FIELDS = ["totalRevenue", "revenueGrowth", "ebitdaMargins", "totalDebt", "totalCash"]
+PRICE_FIELDS = ["enterpriseValue", "marketCap", "currentPrice", "regularMarketPrice"]
 
 
 def _fmt_large(val):
@@ -101,14 +104,133 @@ def _safe_float(val):
         return None
 
 
-def fetch_fundamentals():
+def _load_info_cache() -> dict:
+    try:
+        return json.loads(INFO_CACHE_PATH.read_text())
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def _save_info_cache(cache: dict) -> None:
+    INFO_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    INFO_CACHE_PATH.write_text(json.dumps(cache, indent=2))
+
+
+def _is_fresh(cached: dict | None) -> bool:
+    """True if cached quarter-level fields are younger than INFO_CACHE_TTL_DAYS."""
+    if not cached or not cached.get("fetched_at"):
+        return False
+    try:
+        age = datetime.now() - datetime.fromisoformat(cached["fetched_at"])
+    except ValueError:
+        return False
+    return age < timedelta(days=INFO_CACHE_TTL_DAYS)
+
+
+def _price_fields(t, cached_fields: dict) -> dict:
+    """
+    Refresh only price-sensitive fields via fast_info (much lighter than .info). Market cap
+    is the cached .info market cap scaled by new / cached price, and EV keeps the cached net
+    debt (EV - market cap): fast_info.market_cap is in the quote currency (pence for SGE.L),
+    and debt and cash are in the reporting currency (NZD for XRO.AX).
+    """
+    price = _safe_float(t.fast_info.last_price)
+    cached_price = _safe_float(cached_fields.get("currentPrice") or cached_fields.get("regularMarketPrice"))
+    market_cap = _safe_float(cached_fields.get("marketCap"))
+    if price is None or not cached_price or market_cap is None:
+        raise ValueError("no cached price / market cap to reprice from")
+    fields = dict(cached_fields)
+    fields["currentPrice"] = price
+    fields["marketCap"] = market_cap / cached_price * price
+    ev = _safe_float(cached_fields.get("enterpriseValue"))
+    if ev is not None:
+        fields["enterpriseValue"] = fields["marketCap"] + (ev - market_cap)
+    return fields
+
+
+@replayable("yahoo", "info", key=lambda ticker, cached: [ticker, _is_fresh(cached)])
+def _fetch_info(ticker: str, cached: dict | None) -> tuple[dict, bool]:
+    """
+    Raw info fields for ticker. Within the cache TTL only price fields are refetched;
+    otherwise (or if the light call fails) the full .info is fetched. Returns (fields, full_fetch).
+    """
+    kwargs = {}
+    if yahoo_session() is not None:
+        kwargs["session"] = yahoo_session()
+    t = load_yfinance().Ticker(ticker, **kwargs)
+    if _is_fresh(cached):
+        try:
+            get_limiter("yahoo").acquire()
+            with get_metrics().timed("yahoo", "fast_info"):
+                fields = _price_fields(t, cached["fields"])
+            get_metrics().add("yahoo.info_cache_hits")
+            return fields, False
+        except Exception:
+            pass
+    get_limiter("yahoo").acquire()
+    with get_metrics().timed("yahoo", "info"):
+        info = t.info or {}
+    return {k: info.get(k) for k in QUARTERLY_FIELDS + PRICE_FIELDS}, True
+
+
+def _build_entry(meta: dict, info: dict) -> dict:
+    """ARR multiple and Rule of 40 from raw info fields."""
+    ev = _safe_float(info.get("enterpriseValue"))
+    market_cap = _safe_float(info.get("marketCap"))
+    current_price = _safe_float(info.get("currentPrice") or info.get("regularMarketPrice"))
+    ttm_revenue = _safe_float(info.get("totalRevenue"))
+    revenue_growth = _safe_float(info.get("revenueGrowth"))
+    ebitda_margins = _safe_float(info.get("ebitdaMargins"))
+
+    arr_multiple = None
+    if ev is not None and ttm_revenue is not None and ttm_revenue > 0:
+        arr_multiple = round(ev / ttm_revenue, 1)
+
+    revenue_growth_pct = None
+    if revenue_growth is not None:
+        revenue_growth_pct = round(revenue_growth * 100, 1)
+
+    ebitda_margin_pct = None
+    if ebitda_margins is not None:
+        ebitda_margin_pct = round(ebitda_margins * 100, 1)
+
+    rule_of_40 = None
+    if revenue_growth_pct is not None and ebitda_margin_pct is not None:
+        rule_of_40 = round(revenue_growth_pct + ebitda_margin_pct, 1)
+
+    return {
+        "name": meta["name"],
+        "sector": meta["sector"],
+        "enterprise_value": ev,
+        "market_cap": market_cap,
+        "current_price": current_price,
+        "ttm_revenue": ttm_revenue,
+        "arr_multiple": arr_multiple,
+        "revenue_growth_pct": revenue_growth_pct,
+        "ebitda_margin_pct": ebitda_margin_pct,
+        "rule_of_40": rule_of_40,
+        "inputs": {
+            "ev": _fmt_large(ev),
+            "market_cap": _fmt_large(market_cap),
+            "ttm_revenue": _fmt_large(ttm_revenue),
+            "revenue_growth": f"{revenue_growth_pct}%" if revenue_growth_pct is not None else None,
+            "ebitda_margin": f"{ebitda_margin_pct}%" if ebitda_margin_pct is not None else None,
+        },
+    }
+
+
+def fetch_fundamentals(workers: int = None, refresh_cache: bool = False):
     """Fetch ARR Multiple and Rule of 40 for all public tickers."""
+    if load_yfinance() is None and not replaying():
+        print("yfinance not installed. Run: pip install yfinance")
+        sys.exit(1)
     DATA_DIR.mkdir(exist_ok=True)
     output_file = DATA_DIR / "fundamentals.json"
+    workers = max(1, workers or FUNDAMENTALS_WORKERS)
 
     print("Fetching fundamentals (ARR Multiple, Rule of 40)...")
     print(f"Source: Yahoo Finance (yfinance)")
-    print(f"Tracking {len(TICKERS)} tickers\n")
+    print(f"Tracking {len(TICKERS)} tickers ({workers} worker(s))\n")
 
     result = {
         "fetched_at": datetime.now().isoformat(),
@@ -128,86 +250,132 @@ def fetch_fundamentals():
         "tickers": {},
     }
 
-    success = 0
-    failed = 0
+    cache = {} if refresh_cache else _load_info_cache()
+    now = datetime.now().isoformat()
 
-    for ticker, meta in TICKERS.items():
+    def fetch_one(ticker):
         try:
-            kwargs = {}
-            if _yf_session is not None:
-                kwargs["session"] = _yf_session
-            t = yf.Ticker(ticker, **kwargs)
-            info = t.info or {}
-
-            ev = _safe_float(info.get("enterpriseValue"))
-            market_cap = _safe_float(info.get("marketCap"))
-            current_price = _safe_float(info.get("currentPrice") or info.get("regularMarketPrice"))
-            ttm_revenue = _safe_float(info.get("totalRevenue"))
-            revenue_growth = _safe_float(info.get("revenueGrowth"))
-            ebitda_margins = _safe_float(info.get("ebitdaMargins"))
-
-            arr_multiple = None
-            if ev is not None and ttm_revenue is not None and ttm_revenue > 0:
-                arr_multiple = round(ev / ttm_revenue, 1)
-
-            revenue_growth_pct = None
-            if revenue_growth is not None:
-                revenue_growth_pct = round(revenue_growth * 100, 1)
-
-            ebitda_margin_pct = None
-            if ebitda_margins is not None:
-                ebitda_margin_pct = round(ebitda_margins * 100, 1)
-
-            rule_of_40 = None
-            if revenue_growth_pct is not None and ebitda_margin_pct is not None:
-                rule_of_40 = round(revenue_growth_pct + ebitda_margin_pct, 1)
-
-            entry = {
-                "name": meta["name"],
-                "sector": meta["sector"],
-                "enterprise_value": ev,
-                "market_cap": market_cap,
-                "current_price": current_price,
-                "ttm_revenue": ttm_revenue,
-                "arr_multiple": arr_multiple,
-                "revenue_growth_pct": revenue_growth_pct,
-                "ebitda_margin_pct": ebitda_margin_pct,
-                "rule_of_40": rule_of_40,
-                "inputs": {
-                    "ev": _fmt_large(ev),
-                    "market_cap": _fmt_large(market_cap),
-                    "ttm_revenue": _fmt_large(ttm_revenue),
-                    "revenue_growth": f"{revenue_growth_pct}%" if revenue_growth_pct is not None else None,
-                    "ebitda_margin": f"{ebitda_margin_pct}%" if ebitda_margin_pct is not None else None,
-                },
-            }
-
-            result["tickers"][ticker] = entry
-
-            arr_str = f"{arr_multiple:.1f}x" if arr_multiple is not None else "N/A"
-            r40_str = f"{rule_of_40:.0f}" if rule_of_40 is not None else "N/A"
-            ev_str = _fmt_large(ev) or "N/A"
-            rev_str = _fmt_large(ttm_revenue) or "N/A"
-            print(f"  {ticker:10s} {meta['name']:25s} EV={ev_str:>8s}  Rev={rev_str:>8s}  ARR Mult={arr_str:>6s}  Ro40={r40_str:>4s}")
-            success += 1
-
+            return _fetch_info(ticker, cache.get(ticker)), None
         except Exception as e:
-            print(f"  ⚠ {ticker:10s} {meta['name']:25s} ERROR: {e}")
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(TICKERS))) as pool:
+        fetched = list(pool.map(fetch_one, TICKERS))
+
+    success = 0
+    failed = 0
+    refreshed = 0
+
+    for (ticker, meta), (got, error) in zip(TICKERS.items(), fetched):
+        if error is not None:
+            print(f"  ⚠ {ticker:10s} {meta['name']:25s} ERROR: {error}")
             failed += 1
+            continue
+        info, full_fetch = got
+        if full_fetch:
+            cache[ticker] = {"fetched_at": now, "fields": info}
+            refreshed += 1
+        else:
+            cache[ticker]["fields"] = info
+        entry = _build_entry(meta, info)
+        result["tickers"][ticker] = entry
 
-        time.sleep(DELAY_BETWEEN_TICKERS)
+        arr_multiple, rule_of_40 = entry["arr_multiple"], entry["rule_of_40"]
+        arr_str = f"{arr_multiple:.1f}x" if arr_multiple is not None else "N/A"
+        r40_str = f"{rule_of_40:.0f}" if rule_of_40 is not None else "N/A"
+        ev_str = _fmt_large(entry["enterprise_value"]) or "N/A"
+        rev_str = _fmt_large(entry["ttm_revenue"]) or "N/A"
+        print(f"  {ticker:10s} {meta['name']:25s} EV={ev_str:>8s}  Rev={rev_str:>8s}  ARR Mult={arr_str:>6s}  Ro40={r40_str:>4s}")
+        success += 1
 
+    _save_info_cache(cache)
     with open(output_file, "w") as f:
         json.dump(result, f, indent=2)
 
     print(f"\n✅ Saved to {output_file}")
-    print(f"   {success} tickers fetched, {failed} failed")
+    print(f"   {success} tickers fetched ({refreshed} full .info refresh(es), {success - refreshed} price-only), {failed} failed")
     return result
 
 
+def reprice_from_snapshot(snapshot: dict, data_dir: Path = None) -> int:
+    """
+    Recompute price-sensitive metrics (price, market cap, EV, ARR multiple) in
+    fundamentals.json from a daily snapshot's closes — no network access.
+    Share count and net debt are implied from the last Yahoo fetch (market_cap / price and
+    EV - market_cap), which keeps units consistent for listings quoted in pence or cents.
+    Revenue, growth and margins are left as fetched. Returns the number of tickers repriced.
+    """
+    fundamentals_file = (data_dir or DATA_DIR) / "fundamentals.json"
+    try:
+        fundamentals = json.loads(fundamentals_file.read_text())
+    except (json.JSONDecodeError, OSError):
+        return 0
+    closes = snapshot.get("tickers", {})
+    repriced = 0
+    for ticker, entry in fundamentals.get("tickers", {}).items():
+        close = _safe_float((closes.get(ticker) or {}).get("close"))
+        price = _safe_float(entry.get("current_price"))
+        market_cap = _safe_float(entry.get("market_cap"))
+        if close is None or price is None or price <= 0 or market_cap is None:
+            continue
+        ev = _safe_float(entry.get("enterprise_value"))
+        new_market_cap = market_cap / price * close
+        new_ev = new_market_cap + (ev - market_cap) if ev is not None else None
+        ttm_revenue = _safe_float(entry.get("ttm_revenue"))
+        entry["current_price"] = close
+        entry["market_cap"] = new_market_cap
+        entry["enterprise_value"] = new_ev
+        if new_ev is not None and ttm_revenue is not None and ttm_revenue > 0:
+            entry["arr_multiple"] = round(new_ev / ttm_revenue, 1)
+        entry["price_date"] = snapshot.get("date")
+        inputs = entry.setdefault("inputs", {})
+        inputs["ev"] = _fmt_large(new_ev)
+        inputs["market_cap"] = _fmt_large(new_market_cap)
+        repriced += 1
+    if repriced:
+        fundamentals["repriced_at"] = datetime.now().isoformat()
+        fundamentals["price_date"] = snapshot.get("date")
+        with open(fundamentals_file, "w") as f:
+            json.dump(fundamentals, f, indent=2)
+    return repriced
+
+
+def _latest_daily_snapshot(data_dir: Path) -> dict | None:
+    """Latest close snapshot (data/YYYY-MM-DD.json, not intraday files)."""
+    for path in sorted(data_dir.glob("2026-*.json"), reverse=True):
+        if path.stem.count("-") == 2:
+            try:
+                return json.loads(path.read_text())
+            except (json.JSONDecodeError, OSError):
+                continue
+    return None
+
+
+def _arg_int(flag: str) -> int | None:
+    """Return the integer following flag in sys.argv (e.g. --workers 8), or None."""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            try:
+                return int(sys.argv[idx + 1])
+            except ValueError:
+                pass
+    return None
+
+
 if __name__ == "__main__":
+    if "--reprice" in sys.argv:
+        # Offline: refresh market cap / EV / ARR multiple from the latest daily close
+        latest = _latest_daily_snapshot(DATA_DIR)
+        count = reprice_from_snapshot(latest) if latest else 0
+        print(f"Repriced {count} ticker(s) from {latest['date'] if latest else 'no snapshot'} closes")
+        sys.exit(0)
     if "--force" in sys.argv:
         output = DATA_DIR / "fundamentals.json"
         if output.exists():
             output.unlink()
-    fetch_fundamentals()
+    try:
+        # --refresh-info ignores the .info cache and refetches every field
+        fetch_fundamentals(workers=_arg_int("--workers"), refresh_cache="--refresh-info" in sys.argv)
+    finally:
+        write_report()
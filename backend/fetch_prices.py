@@ -7,29 +7,117 @@ Run daily after market close: python fetch_prices.py
 Or set up a cron: 0 18 * * 1-5 cd /path/to/backend && python fetch_prices.py
 """
 
+import hashlib
 import json
+import os
 import sys
+import threading
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from circuit_breaker import CircuitBreaker
+from daily_index import DailyIndex
+from history_artifact import HISTORY_FILENAME, HistoryArtifact
+from fetch_fundamentals import reprice_from_snapshot
 from fmp_fetcher import FMPFetcher
-from yf_fallback import get_quote as yf_get_quote, get_historical_eod as yf_get_historical_eod
+from http_session import set_pool_size
+from price_store import PriceStore
+from rate_limit import backoff_delay
+from run_metrics import get_metrics, write_report
+from yf_fallback import (
+    get_quote as yf_get_quote,
+    get_quotes as yf_get_quotes,
+    get_historical_eod as yf_get_historical_eod,
+    get_historical_eod_batch as yf_get_historical_eod_batch,
+    take_blocked as yf_take_blocked,
+)
 
 # Tickers on international exchanges: Yahoo often has better coverage than FMP
 YAHOO_FIRST_TICKERS = frozenset({"XRO.AX", "SGE.L", "TOTS3.SA", "4478.T", "SDR.AX", "CSU.TO"})
 YAHOO_EXCLUDED = frozenset({"SMAR"})  # FMP only — Yahoo has no/incorrect data
 MAX_RETRIES = 2
-RETRY_DELAY_SEC = 2
+RETRY_DELAY_SEC = 2  # backoff base: retries wait up to 2s, then 4s (with jitter)
+
+# Concurrent quote fetching: tickers run on a bounded worker pool, and each provider
+# has its own in-flight cap. yf.download keeps module-level state, so Yahoo stays
+# serialized by default. Override with env vars or --workers N.
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+PROVIDER_CONCURRENCY = {
+    "fmp": int(os.getenv("FMP_CONCURRENCY", "4")),
+    "yahoo": int(os.getenv("YAHOO_CONCURRENCY", "1")),
+}
+_provider_slots = {name: threading.BoundedSemaphore(max(1, n)) for name, n in PROVIDER_CONCURRENCY.items()}
+# Once a provider fails repeatedly (FMP down / out of quota, Yahoo blocking us), its breaker
+# opens and the rest of the run skips it; it is probed again after a cooldown
+_breakers = {"fmp": CircuitBreaker("FMP"), "yahoo": CircuitBreaker("Yahoo")}
 
 
-def _get_fetcher():
-    """Return FMP fetcher if API key is set, else None (use yfinance only)."""
+def set_concurrency(workers: int = None, fmp: int = None, yahoo: int = None) -> None:
+    """Override worker count and per-provider concurrency limits (e.g. from CLI flags)."""
+    global FETCH_WORKERS
+    if workers is not None:
+        FETCH_WORKERS = max(1, workers)
+        set_pool_size(FETCH_WORKERS)
+    for name, limit in (("fmp", fmp), ("yahoo", yahoo)):
+        if limit is not None:
+            PROVIDER_CONCURRENCY[name] = max(1, limit)
+            _provider_slots[name] = threading.BoundedSemaphore(PROVIDER_CONCURRENCY[name])
+
+
+def _call_provider(provider: str, fn, *args, default=None):
+    """
+    Run a provider call while holding one of that provider's concurrency slots. Returns
+    default without calling when the provider's circuit is open. FMP calls fail by raising.
+    yf_fallback swallows errors, so a Yahoo call fails only if yfinance raised or logged a
+    rate-limit / blocking error; an empty result (holiday window, delisted symbol) does not.
+    """
+    breaker = _breakers[provider]
+    if not breaker.allow():
+        return default
+    if provider == "yahoo":
+        yf_take_blocked()  # clear anything left by an earlier call on this thread
     try:
-        return FMPFetcher()
-    except ValueError:
-        return None
+        with _provider_slots[provider]:
+            result = fn(*args)
+    except Exception:
+        breaker.record_failure()
+        raise
+    if provider == "yahoo" and yf_take_blocked():
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return result
+
+
+def _retry_sleep(attempt: int) -> None:
+    delay = backoff_delay(attempt, RETRY_DELAY_SEC)
+    get_metrics().add("retry_sleeps")
+    get_metrics().add("retry_sleep_sec", delay)
+    time.sleep(delay)
+
+
+def _providers_available(fetcher, yahoo_excluded: bool) -> bool:
+    """True if a retry could reach some provider (not every usable circuit is open)."""
+    fmp_up = fetcher is not None and not _breakers["fmp"].is_open()
+    yahoo_up = not yahoo_excluded and not _breakers["yahoo"].is_open()
+    return fmp_up or yahoo_up
+
+
+_fetcher = None
+
+
+def _get_fetcher():
+    """Return the run's shared FMP fetcher if API key is set, else None (use yfinance only)."""
+    global _fetcher
+    if _fetcher is None:
+        try:
+            _fetcher = FMPFetcher()
+        except ValueError:
+            return None
+    return _fetcher
 
 
 def _is_valid_quote(q) -> bool:
@@ -47,33 +135,43 @@ def _fetch_quote_with_fallback(ticker: str, fetcher) -> tuple[dict | None, bool]
     for attempt in range(MAX_RETRIES + 1):
         q = None
         if use_yahoo_first:
-            q = yf_get_quote(ticker)
+            q = _call_provider("yahoo", yf_get_quote, ticker)
             if _is_valid_quote(q):
                 return (q, True)
             if fetcher:
                 try:
-                    q = fetcher.get_quote(ticker)
+                    q = _call_provider("fmp", fetcher.get_quote, ticker)
                 except (requests.exceptions.HTTPError, Exception):
                     pass
             if _is_valid_quote(q):
+                get_metrics().add("fallbacks.quote.fmp")
                 return (q, False)
         else:
             if fetcher:
                 try:
-                    q = fetcher.get_quote(ticker)
+                    q = _call_provider("fmp", fetcher.get_quote, ticker)
                 except (requests.exceptions.HTTPError, Exception):
                     pass
             if _is_valid_quote(q):
                 return (q, False)
             if not yahoo_excluded:
-                q = yf_get_quote(ticker)
+                q = _call_provider("yahoo", yf_get_quote, ticker)
                 if _is_valid_quote(q):
+                    if fetcher:
+                        get_metrics().add("fallbacks.quote.yahoo")
                     return (q, True)
         if attempt < MAX_RETRIES:
-            time.sleep(RETRY_DELAY_SEC)
+            if not _providers_available(fetcher, yahoo_excluded):
+                break
+            _retry_sleep(attempt)
     return (None, False)
 
 
+def _yahoo_end(to_date: str) -> str:
+    """yfinance's end date is exclusive; FMP's to date (and ours) is inclusive."""
+    return (datetime.strptime(to_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
 def _fetch_historical_with_fallback(ticker: str, from_date: str, to_date: str, fetcher) -> tuple[list | None, bool]:
     """Fetch historical EOD: Yahoo-first for international tickers, else FMP then Yahoo. Returns (rows, used_yahoo)."""
     use_yahoo_first = ticker in YAHOO_FIRST_TICKERS
@@ -81,33 +179,138 @@ def _fetch_historical_with_fallback(ticker: str, from_date: str, to_date: str, f
     for attempt in range(MAX_RETRIES + 1):
         rows = None
         if use_yahoo_first:
-            rows = yf_get_historical_eod(ticker, from_date, to_date)
+            rows = _call_provider("yahoo", yf_get_historical_eod, ticker, from_date, _yahoo_end(to_date))
             if _is_valid_historical(rows):
                 return (rows, True)
             if fetcher:
                 try:
-                    rows = fetcher.get_historical_eod(ticker, from_date, to_date)
+                    rows = _call_provider("fmp", fetcher.get_historical_eod, ticker, from_date, to_date)
                 except (requests.exceptions.HTTPError, Exception):
                     pass
             if _is_valid_historical(rows):
+                get_metrics().add("fallbacks.historical.fmp")
                 return (rows, False)
         else:
             if fetcher:
                 try:
-                    rows = fetcher.get_historical_eod(ticker, from_date, to_date)
+                    rows = _call_provider("fmp", fetcher.get_historical_eod, ticker, from_date, to_date)
                 except (requests.exceptions.HTTPError, Exception):
                     pass
             if _is_valid_historical(rows):
                 return (rows, False)
             if not yahoo_excluded:
-                rows = yf_get_historical_eod(ticker, from_date, to_date)
+                rows = _call_provider("yahoo", yf_get_historical_eod, ticker, from_date, _yahoo_end(to_date))
                 if _is_valid_historical(rows):
+                    if fetcher:
+                        get_metrics().add("fallbacks.historical.yahoo")
                     return (rows, True)
         if attempt < MAX_RETRIES:
-            time.sleep(RETRY_DELAY_SEC)
+            if not _providers_available(fetcher, yahoo_excluded):
+                break
+            _retry_sleep(attempt)
     return (None, False)
 
 
+def _fetch_historical_many(tickers: list[str], from_date: str, to_date: str, fetcher) -> dict[str, tuple[list, bool]]:
+    """
+    Fetch historical EOD for many tickers: one multi-symbol Yahoo download for Yahoo-first
+    tickers, FMP per ticker for the rest (on the worker pool), one more Yahoo download for
+    FMP misses, then the per-ticker retry chain for anything still missing.
+    Returns {ticker: (rows, used_yahoo)} for tickers with data.
+    """
+    result = {}
+
+    def take_yahoo(batch_tickers):
+        if not batch_tickers:
+            return
+        rows_by_ticker = _call_provider("yahoo", yf_get_historical_eod_batch, batch_tickers, from_date,
+                                        _yahoo_end(to_date), default={})
+        for t in batch_tickers:
+            if _is_valid_historical(rows_by_ticker.get(t)):
+                result[t] = (rows_by_ticker[t], True)
+
+    take_yahoo([t for t in tickers if t in YAHOO_FIRST_TICKERS or (not fetcher and t not in YAHOO_EXCLUDED)])
+
+    def fetch_fmp(ticker):
+        try:
+            return _call_provider("fmp", fetcher.get_historical_eod, ticker, from_date, to_date)
+        except Exception:
+            return None
+
+    fmp_tickers = [t for t in tickers if t not in result and t not in YAHOO_FIRST_TICKERS] if fetcher else []
+    if fmp_tickers:
+        with ThreadPoolExecutor(max_workers=max(1, min(FETCH_WORKERS, len(fmp_tickers)))) as pool:
+            for t, rows in zip(fmp_tickers, pool.map(fetch_fmp, fmp_tickers)):
+                if _is_valid_historical(rows):
+                    result[t] = (rows, False)
+
+    take_yahoo([t for t in fmp_tickers if t not in result and t not in YAHOO_EXCLUDED])
+
+    remaining = [t for t in tickers if t not in result]
+    if remaining:
+        with ThreadPoolExecutor(max_workers=max(1, min(FETCH_WORKERS, len(remaining)))) as pool:
+            fetched = pool.map(lambda t: _fetch_historical_with_fallback(t, from_date, to_date, fetcher), remaining)
+            for t, (rows, used_yahoo) in zip(remaining, fetched):
+                if rows:
+                    result[t] = (rows, used_yahoo)
+    return result
+
+
+# Historical bars for this process: every pass reads from one PriceStore, so each ticker
+# range is fetched at most once per run. PRICE_STORE_PATH persists it across runs.
+PRICE_STORE_PATH = os.getenv("PRICE_STORE_PATH")
+# Earliest bar any backfill pass reads (_patch_daily_missing_tickers starts 5 days before Feb 1)
+BACKFILL_HISTORY_START = "2026-01-27"
+# Incremental backfill: calendar days before a ticker's last stored date to refetch (covers prev_close)
+INCREMENTAL_LOOKBACK_DAYS = 5
+_price_store = None
+
+
+def _get_price_store() -> PriceStore:
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore(PRICE_STORE_PATH)
+        _price_store.load()
+    return _price_store
+
+
+def _load_history(tickers: list[str], from_date: str, to_date: str, fetcher) -> dict[str, tuple[list, bool]]:
+    """
+    Historical EOD for many tickers from the run's PriceStore. Only ranges the store has not
+    covered yet go to the network (batched per identical gap via _fetch_historical_many).
+    Returns {ticker: (rows newest first, used_yahoo)} for tickers with data in range.
+    """
+    store = _get_price_store()
+    # Never ask providers for bars that cannot exist yet
+    fetch_to = min(to_date, datetime.now().strftime("%Y-%m-%d"))
+    # Gaps are reserved under the store lock, fetched without it, then merged under it again
+    by_gap = store.claim(tickers, from_date, fetch_to)
+    claimed = [t for gap_tickers in by_gap.values() for t in gap_tickers]
+    try:
+        for (gap_from, gap_to), gap_tickers in by_gap.items():
+            fetched = _fetch_historical_many(gap_tickers, gap_from, gap_to, fetcher)
+            with store.lock:
+                store.network_fetches += len(gap_tickers)
+                for t in gap_tickers:
+                    rows, used_yahoo = fetched.get(t, (None, False))
+                    store.add(t, rows, gap_from, gap_to, used_yahoo)
+    finally:
+        store.release(claimed)
+    with store.lock:
+        result = {}
+        for t in tickers:
+            rows = store.rows(t, from_date, to_date)
+            if rows:
+                result[t] = (rows, store.used_yahoo(t))
+        return result
+
+
+def _prime_history(from_date: str, to_date: str = None) -> None:
+    """Load the widest range a run needs in one pass, so later passes read only from the store."""
+    to_date = to_date or datetime.now().strftime("%Y-%m-%d")
+    _load_history(list(TICKERS.keys()), from_date, to_date, _get_fetcher())
+
+
 def _is_valid_historical(rows) -> bool:
     """Check if historical rows have usable close data."""
     if not rows or not isinstance(rows, list):
@@ -175,6 +378,18 @@ SECTORS = {
 }
 
 DATA_DIR = Path(__file__).parent.parent / "data"
+_daily_index = None
+
+
+def _get_daily_index() -> DailyIndex:
+    """
+    Daily snapshots parsed once per process (rebuilt if DATA_DIR is repointed).
+    Writes through the index also keep data/history.json up to date.
+    """
+    global _daily_index
+    if _daily_index is None or _daily_index.data_dir != DATA_DIR:
+        _daily_index = DailyIndex(DATA_DIR, HistoryArtifact(DATA_DIR / HISTORY_FILENAME))
+    return _daily_index
 
 
 def _patch_baseline_from_daily():
@@ -182,8 +397,8 @@ def _patch_baseline_from_daily():
     baseline_file = DATA_DIR / "baseline.json"
     if not baseline_file.exists():
         return
-    daily_files = sorted(DATA_DIR.glob("2026-*.json"))
-    if not daily_files:
+    index = _get_daily_index()
+    if not index.stems():
         return
     with open(baseline_file) as f:
         baseline = json.load(f)
@@ -194,8 +409,7 @@ def _patch_baseline_from_daily():
         return
     # Use earliest snapshot that has each ticker (e.g. fetch:force may have it in latest)
     patched = 0
-    for daily_path in daily_files:
-        daily = json.loads(daily_path.read_text())
+    for stem, daily in index.items():
         tickers = daily.get("tickers", {})
         for t in list(missing):
             if t in tickers and tickers[t].get("close"):
@@ -206,7 +420,7 @@ def _patch_baseline_from_daily():
                     "price": round(close, 2),
                 }
                 patched += 1
-                print(f"  📋 Patched baseline for {t} from {daily_path.name} (${close:.2f})")
+                print(f"  📋 Patched baseline for {t} from {stem}.json (${close:.2f})")
                 missing.discard(t)
         if not missing:
             break
@@ -232,21 +446,22 @@ def _patch_ltm_from_daily():
     missing = all_tickers - set(ltm_tickers.keys())
     if not missing:
         return
-    daily_files = sorted(DATA_DIR.glob("2026-*.json"))
-    if not daily_files:
+    index = _get_daily_index()
+    if not index.stems():
         return
+    # One pass over the dailies collects closes for every missing ticker
+    closes_by_ticker = {t: [] for t in missing}
+    for stem, daily in index.items():
+        for t, tick_data in daily.get("tickers", {}).items():
+            if t in closes_by_ticker and tick_data.get("close"):
+                closes_by_ticker[t].append((f"{stem}.json", float(tick_data["close"])))
     # For each missing ticker, find max close across all dailies and use baseline as zero
     patched = 0
     for t in missing:
         base_price = base_prices.get(t, {}).get("price")
         if base_price is None or base_price <= 0:
             continue
-        closes = []
-        for daily_path in daily_files:
-            daily = json.loads(daily_path.read_text())
-            tick_data = daily.get("tickers", {}).get(t)
-            if tick_data and tick_data.get("close"):
-                closes.append((daily_path.name, float(tick_data["close"])))
+        closes = closes_by_ticker[t]
         if not closes:
             continue
         high_close = max(c for _, c in closes)
@@ -283,15 +498,20 @@ def _patch_ltm_from_daily():
         print(f"  ✅ Patched {patched} missing LTM tickers from daily snapshots")
 
 
+def _historical_window(date_str: str) -> tuple[str, str]:
+    """Fetch range around date_str used for single-date historical lookups (covers prev_close)."""
+    dt = datetime.strptime(date_str, "%Y-%m-%d")
+    return (dt - timedelta(days=5)).strftime("%Y-%m-%d"), (dt + timedelta(days=2)).strftime("%Y-%m-%d")
+
+
 def _fetch_historical_ticker_for_date(ticker: str, date_str: str, fetcher) -> dict | None:
     """
     Get ticker data from historical EOD for a specific date.
     Used when live quote fails (e.g. international markets closed during US trading hours).
     Returns ticker dict with name, sector, close, prev_close, daily_pct or None.
     """
-    fetch_start = (datetime.strptime(date_str, "%Y-%m-%d") - timedelta(days=5)).strftime("%Y-%m-%d")
-    fetch_end = (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=2)).strftime("%Y-%m-%d")
-    rows, _ = _fetch_historical_with_fallback(ticker, fetch_start, fetch_end, fetcher)
+    fetch_start, fetch_end = _historical_window(date_str)
+    rows, _ = _load_history([ticker], fetch_start, fetch_end, fetcher).get(ticker, (None, False))
     if not rows:
         return None
     sorted_rows = sorted(rows, key=lambda r: r.get("date", ""))
@@ -312,8 +532,102 @@ def _fetch_historical_ticker_for_date(ticker: str, date_str: str, fetcher) -> di
     }
 
 
-def fetch_daily_snapshot(date_str=None):
-    """Fetch closing prices for all tickers via FMP batch-quote. Saves to data/{date}.json"""
+def _fetch_batch_quotes(tickers: list[str], fetcher) -> dict[str, dict] | None:
+    """
+    Fetch all FMP-routed tickers (everything not Yahoo-first) in one batch-quote request.
+    Returns {symbol: quote} for valid quotes, or None when batch is unavailable (no key,
+    402 on the current plan, or request failure) and tickers must be fetched one by one.
+    """
+    if not fetcher or not getattr(fetcher, "batch_quote_supported", False):
+        return None
+    fmp_tickers = [t for t in tickers if t not in YAHOO_FIRST_TICKERS]
+    if not fmp_tickers:
+        return None
+    try:
+        data = _call_provider("fmp", fetcher.get_batch_quote, fmp_tickers, False, default=[])
+    except Exception:
+        return None
+    if not fetcher.batch_quote_supported:
+        print("  ℹ FMP batch-quote not available on this plan — using per-ticker quotes")
+        return None
+    wanted = set(fmp_tickers)
+    return {q["symbol"]: q for q in data if _is_valid_quote(q) and q.get("symbol") in wanted}
+
+
+def _fetch_quotes(tickers: list[str], fetcher, date_str: str = None) -> list[dict]:
+    """
+    Fetch quotes for all tickers: one FMP batch-quote for FMP-routed tickers and one
+    multi-symbol Yahoo download for Yahoo-first tickers and batch misses, then the
+    per-ticker fallback chain for anything still missing, on a bounded worker
+    pool (FETCH_WORKERS) so one slow or failing ticker no longer holds up the rest. When
+    date_str is set, a ticker whose live quote fails falls back to historical EOD for that date.
+    Progress lines are printed in ticker order after the pool drains, matching a serial run.
+    """
+    batch = _fetch_batch_quotes(tickers, fetcher)
+    # Every ticker headed for Yahoo (Yahoo-first, FMP batch misses, or all of them when
+    # there is no FMP key) shares one multi-symbol download
+    yahoo_tickers = [
+        t for t in tickers
+        if t not in YAHOO_EXCLUDED
+        and (t in YAHOO_FIRST_TICKERS or not fetcher or (batch is not None and t not in batch))
+    ]
+    yahoo_batch = _call_provider("yahoo", yf_get_quotes, yahoo_tickers, default={}) if yahoo_tickers else {}
+
+    def fetch_one(ticker):
+        if batch is not None and ticker in batch:
+            return batch[ticker], "fmp"
+        if _is_valid_quote(yahoo_batch.get(ticker)):
+            return yahoo_batch[ticker], "yahoo"
+        # FMP already answered for this ticker in the batch: only retry via Yahoo, unless
+        # FMP is its sole source (YAHOO_EXCLUDED) or it is routed Yahoo-first anyway.
+        batched = batch is not None and ticker not in YAHOO_FIRST_TICKERS and ticker not in YAHOO_EXCLUDED
+        q, used_fallback = _fetch_quote_with_fallback(ticker, None if batched else fetcher)
+        if q:
+            return q, "yahoo" if used_fallback else "fmp"
+        return None, None
+
+    workers = max(1, min(FETCH_WORKERS, len(tickers)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fetch_one, tickers))
+
+    # Fallback to historical EOD when live quote fails (international markets closed, etc.):
+    # one batched history load for every miss, then per-ticker lookups from the store
+    missing = [t for t, (q, _) in zip(tickers, results) if q is None]
+    if date_str and missing:
+        _load_history(missing, *_historical_window(date_str), fetcher)
+        for i, ticker in enumerate(tickers):
+            if ticker not in missing:
+                continue
+            ticker_data = _fetch_historical_ticker_for_date(ticker, date_str, fetcher)
+            if ticker_data:
+                # Build a quote-like dict for downstream processing
+                results[i] = ({
+                    "symbol": ticker,
+                    "price": ticker_data["close"],
+                    "previousClose": ticker_data["prev_close"],
+                    "change": ticker_data["close"] - ticker_data["prev_close"],
+                    "changePercentage": ticker_data["daily_pct"],
+                }, "historical")
+
+    quotes = []
+    for ticker, (q, source) in zip(tickers, results):
+        if q:
+            quotes.append(q)
+        if source == "yahoo":
+            print(f"  📡 {ticker}: yf fallback (FMP unavailable)")
+        elif source == "historical":
+            print(f"  📋 {ticker}: historical EOD (live quote unavailable)")
+        elif q is None:
+            sources = "FMP + yfinance + historical" if date_str else "FMP + yfinance"
+            print(f"  ⚠ {ticker}: no data ({sources})")
+    return quotes
+
+
+def fetch_daily_snapshot(date_str=None, reprice=True):
+    """
+    Fetch closing prices for all tickers via FMP batch-quote (+ Yahoo fallback). Saves to data/{date}.json.
+    reprice=False leaves fundamentals.json alone (update_all reprices it in its own stage).
+    """
     DATA_DIR.mkdir(exist_ok=True)
 
     if date_str is None:
@@ -331,29 +645,7 @@ def fetch_daily_snapshot(date_str=None):
     all_tickers = list(TICKERS.keys())
     fetcher = _get_fetcher()
 
-    quotes = []
-    for ticker in all_tickers:
-        q, used_fallback = _fetch_quote_with_fallback(ticker, fetcher)
-
-        if q:
-            quotes.append(q)
-            if used_fallback:
-                print(f"  📡 {ticker}: yf fallback (FMP unavailable)")
-        else:
-            # Fallback to historical EOD when live quote fails (international markets closed, etc.)
-            ticker_data = _fetch_historical_ticker_for_date(ticker, date_str, fetcher)
-            if ticker_data:
-                # Build a quote-like dict for downstream processing
-                quotes.append({
-                    "symbol": ticker,
-                    "price": ticker_data["close"],
-                    "previousClose": ticker_data["prev_close"],
-                    "change": ticker_data["close"] - ticker_data["prev_close"],
-                    "changePercentage": ticker_data["daily_pct"],
-                })
-                print(f"  📋 {ticker}: historical EOD (live quote unavailable)")
-            else:
-                print(f"  ⚠ {ticker}: no data (FMP + yfinance + historical)")
+    quotes = _fetch_quotes(all_tickers, fetcher, date_str=date_str)
 
     quote_by_symbol = {q.get("symbol"): q for q in quotes if q.get("symbol")}
 
@@ -412,11 +704,16 @@ def fetch_daily_snapshot(date_str=None):
                 "tickers_total": len(sector_info["tickers"]),
             }
 
-    with open(output_file, "w") as f:
-        json.dump(snapshot, f, indent=2)
+    _get_daily_index().write(output_file.stem, snapshot)
 
     # Patch any remaining missing tickers from historical EOD (belt-and-suspenders)
     _patch_missing_tickers_in_daily(output_file, date_str, snapshot)
+    _get_daily_index().flush()
+
+    # Keep ARR multiples current with today's closes (local recompute, no Yahoo call)
+    repriced = reprice_from_snapshot(snapshot, DATA_DIR) if reprice else 0
+    if repriced:
+        print(f"  📐 Repriced fundamentals for {repriced} tickers from {date_str} closes")
 
     print(f"\n✅ Saved to {output_file}")
     print(f"   {len(snapshot['tickers'])} tickers, {len(snapshot['sectors'])} sectors")
@@ -424,13 +721,17 @@ def fetch_daily_snapshot(date_str=None):
 
 
 def _patch_missing_tickers_in_daily(file_path: Path, date_str: str, snapshot: dict) -> None:
-    """Fill missing tickers in a daily snapshot from historical EOD. Updates file if any patched."""
+    """
+    Fill missing tickers in a daily snapshot from historical EOD. A patched snapshot is
+    put() in the daily index; the caller flushes once after patching every file.
+    """
     all_tickers = set(TICKERS.keys())
     present = set(snapshot.get("tickers", {}).keys())
     missing = all_tickers - present
     if not missing:
         return
     fetcher = _get_fetcher()
+    _load_history(sorted(missing), *_historical_window(date_str), fetcher)
     patched = 0
     for ticker in missing:
         data = _fetch_historical_ticker_for_date(ticker, date_str, fetcher)
@@ -439,18 +740,8 @@ def _patch_missing_tickers_in_daily(file_path: Path, date_str: str, snapshot: di
             patched += 1
             print(f"  📋 Patched {ticker} from historical into {file_path.name}")
     if patched:
-        for sector_id, sector_info in SECTORS.items():
-            sector_changes = [snapshot["tickers"][t]["daily_pct"] for t in sector_info["tickers"] if t in snapshot["tickers"]]
-            if sector_changes:
-                avg = sum(sector_changes) / len(sector_changes)
-                snapshot["sectors"][sector_id] = {
-                    "name": sector_info["name"],
-                    "avg_daily_pct": round(avg, 2),
-                    "tickers_tracked": len(sector_changes),
-                    "tickers_total": len(sector_info["tickers"]),
-                }
-        with open(file_path, "w") as f:
-            json.dump(snapshot, f, indent=2)
+        _recompute_sector_averages(snapshot)
+        _get_daily_index().put(file_path.stem, snapshot)
 
 
 def fetch_intraday_snapshot(date_str=None, time_label="noon", suffix="noon"):
@@ -472,16 +763,7 @@ def fetch_intraday_snapshot(date_str=None, time_label="noon", suffix="noon"):
     all_tickers = list(TICKERS.keys())
     fetcher = _get_fetcher()
 
-    quotes = []
-    for ticker in all_tickers:
-        q, used_fallback = _fetch_quote_with_fallback(ticker, fetcher)
-
-        if q:
-            quotes.append(q)
-            if used_fallback:
-                print(f"  📡 {ticker}: yf fallback (FMP unavailable)")
-        else:
-            print(f"  ⚠ {ticker}: no data (FMP + yfinance)")
+    quotes = _fetch_quotes(all_tickers, fetcher)
 
     quote_by_symbol = {q.get("symbol"): q for q in quotes if q.get("symbol")}
 
@@ -540,8 +822,7 @@ def fetch_intraday_snapshot(date_str=None, time_label="noon", suffix="noon"):
                 "tickers_total": len(sector_info["tickers"]),
             }
 
-    with open(output_file, "w") as f:
-        json.dump(snapshot, f, indent=2)
+    _get_daily_index().write(output_file.stem, snapshot)
 
     print(f"\n✅ Saved to {output_file}")
     print(f"   {len(snapshot['tickers'])} tickers, {len(snapshot['sectors'])} sectors")
@@ -579,8 +860,9 @@ def fetch_baseline(start_date="2026-02-03"):
         "tickers": {},
     }
 
+    history = _load_history(all_tickers, start_date, end_date, fetcher)
     for ticker in all_tickers:
-        rows, used_fallback = _fetch_historical_with_fallback(ticker, start_date, end_date, fetcher)
+        rows, used_fallback = history.get(ticker, (None, False))
         if not rows:
             print(f"  ⚠ {ticker}: no historical data (FMP + yfinance)")
             continue
@@ -616,9 +898,26 @@ def fetch_baseline(start_date="2026-02-03"):
     print(f"\n✅ Baseline saved to {baseline_file}")
 
 
-def backfill(start_date="2026-02-03"):
-    """Backfill daily snapshots from start_date to today using FMP historical EOD."""
-    print(f"Backfilling from {start_date} to today...\n")
+def _last_stored_dates(start_date: str) -> dict[str, str]:
+    """Latest daily snapshot date (on or after start_date) that holds each ticker."""
+    last = {}
+    index = _get_daily_index()
+    for date_str in index.stems(dates_only=True):
+        if date_str < start_date:
+            continue
+        for t in index.tickers(date_str):
+            last[t] = date_str
+    return last
+
+
+def backfill(start_date="2026-02-03", incremental=False):
+    """
+    Backfill daily snapshots from start_date to today using FMP historical EOD.
+    incremental=True requests, per ticker, only the tail after the last date already stored
+    in data/ (plus a few days before it for prev_close), so steady-state cost depends on the
+    days missing rather than the days since start_date.
+    """
+    print(f"Backfilling from {start_date} to today{' (incremental)' if incremental else ''}...\n")
 
     DATA_DIR.mkdir(exist_ok=True)
     all_tickers = list(TICKERS.keys())
@@ -627,12 +926,21 @@ def backfill(start_date="2026-02-03"):
 
     # Fetch from 5 days before start to get prev_close for first day
     fetch_start = (datetime.strptime(start_date, "%Y-%m-%d") - timedelta(days=5)).strftime("%Y-%m-%d")
+    fetch_from = {t: fetch_start for t in all_tickers}
+    if incremental:
+        for t, last_date in _last_stored_dates(start_date).items():
+            if t in fetch_from:
+                fetch_from[t] = (datetime.strptime(last_date, "%Y-%m-%d") - timedelta(days=INCREMENTAL_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
 
     # Per-ticker: date -> {close, prev_close}
     by_ticker = {}
 
+    history = {}
+    for from_date in sorted(set(fetch_from.values())):
+        group = [t for t in all_tickers if fetch_from[t] == from_date]
+        history.update(_load_history(group, from_date, end_date, fetcher))
     for ticker in all_tickers:
-        rows, _ = _fetch_historical_with_fallback(ticker, fetch_start, end_date, fetcher)
+        rows, _ = history.get(ticker, (None, False))
         if not rows:
             continue
 
@@ -705,58 +1013,90 @@ def backfill(start_date="2026-02-03"):
                     "tickers_total": len(sector_info["tickers"]),
                 }
 
-        with open(output_file, "w") as f:
-            json.dump(snapshot, f, indent=2)
+        # Written below in one flush: every history.json save re-serializes the whole file
+        _get_daily_index().put(date_str, snapshot)
 
         print(f"  ✅ {date_str}: {len(snapshot['tickers'])} tickers")
 
+    _get_daily_index().flush()
     _patch_daily_missing_tickers()
     print(f"\nBackfill complete.")
 
 
 def repair_daily_files():
     """Patch missing tickers in existing daily files (e.g. after fetch during US hours missed international)."""
-    daily_files = sorted(p for p in DATA_DIR.glob("2026-*.json") if p.stem.count("-") <= 2)
-    if not daily_files:
+    index = _get_daily_index()
+    daily_dates = index.stems(dates_only=True)
+    if not daily_dates:
         print("No daily files to repair.")
         return
-    print(f"Repairing {len(daily_files)} daily file(s)...\n")
-    for daily_path in daily_files:
-        date_str = daily_path.stem
-        if date_str.count("-") > 2:
-            continue
-        daily = json.loads(daily_path.read_text())
-        snapshot = daily
-        _patch_missing_tickers_in_daily(daily_path, date_str, snapshot)
+    print(f"Repairing {len(daily_dates)} daily file(s)...\n")
+    # Load history for every ticker missing anywhere in one pass, instead of one fetch per file
+    all_tickers = set(TICKERS.keys())
+    missing = set()
+    dates = []
+    for date_str in daily_dates:
+        absent = all_tickers - set(index.tickers(date_str).keys())
+        if absent:
+            missing |= absent
+            dates.append(date_str)
+    if missing:
+        _load_history(sorted(missing), _historical_window(dates[0])[0], _historical_window(dates[-1])[1], _get_fetcher())
+    for date_str in dates:
+        _patch_missing_tickers_in_daily(DATA_DIR / f"{date_str}.json", date_str, index.get(date_str))
+    index.flush()
+    index.rebuild_history()
     print("\n✅ Repair complete.")
 
 
+def _recompute_sector_averages(snapshot: dict) -> None:
+    """Refresh avg_daily_pct for every sector with at least one ticker in the snapshot."""
+    tickers_data = snapshot.get("tickers", {})
+    for sector_id, sector_info in SECTORS.items():
+        changes = [tickers_data[t]["daily_pct"] for t in sector_info["tickers"] if t in tickers_data]
+        if changes:
+            snapshot.setdefault("sectors", {})[sector_id] = {
+                "name": sector_info["name"],
+                "avg_daily_pct": round(sum(changes) / len(changes), 2),
+                "tickers_tracked": len(changes),
+                "tickers_total": len(sector_info["tickers"]),
+            }
+
+
 def _patch_daily_missing_tickers():
     """Merge missing tickers into existing daily files (e.g. SMAR added after initial backfill)."""
-    daily_files = sorted(DATA_DIR.glob("2026-*.json"))
-    if not daily_files:
+    index = _get_daily_index()
+    daily_dates = index.stems(dates_only=True)
+    if not daily_dates:
         return
     all_tickers = set(TICKERS.keys())
+    # Only tickers absent from at least one daily file need history
+    present_everywhere = set(all_tickers)
+    for date_str in daily_dates:
+        present_everywhere &= set(index.tickers(date_str).keys())
+    all_tickers -= present_everywhere
+    if not all_tickers:
+        return
     fetcher = _get_fetcher()
     fetch_start = (datetime.strptime("2026-02-01", "%Y-%m-%d") - timedelta(days=5)).strftime("%Y-%m-%d")
     end_date = datetime.now().strftime("%Y-%m-%d")
     patched_count = 0
-    for ticker in all_tickers:
-        rows, _ = _fetch_historical_with_fallback(ticker, fetch_start, end_date, fetcher)
+    history = _load_history(sorted(all_tickers), fetch_start, end_date, fetcher)
+    for ticker in sorted(all_tickers):
+        rows, _ = history.get(ticker, (None, False))
         if not rows:
             continue
         sorted_rows = sorted(rows, key=lambda r: r.get("date", ""))
-        by_date = {r.get("date", "")[:10]: r for r in sorted_rows if r.get("close") is not None}
-        for daily_path in daily_files:
-            date_str = daily_path.name.replace(".json", "")
-            if date_str not in by_date:
+        position = {r.get("date", "")[:10]: i for i, r in enumerate(sorted_rows) if r.get("close") is not None}
+        for date_str in daily_dates:
+            if date_str not in position:
                 continue
-            daily = json.loads(daily_path.read_text())
-            tickers_data = daily.get("tickers", {})
+            daily = index.get(date_str)
+            tickers_data = daily.setdefault("tickers", {})
             if ticker in tickers_data:
                 continue
-            curr = by_date[date_str]
-            idx = next((i for i, r in enumerate(sorted_rows) if r.get("date", "")[:10] == date_str), -1)
+            idx = position[date_str]
+            curr = sorted_rows[idx]
             prev_close = float(sorted_rows[idx - 1].get("close", 0)) if idx > 0 else float(curr.get("close", 0))
             current = float(curr.get("close", 0))
             daily_change = ((current - prev_close) / prev_close) * 100 if prev_close else 0
@@ -767,19 +1107,13 @@ def _patch_daily_missing_tickers():
                 "prev_close": round(prev_close, 2),
                 "daily_pct": round(daily_change, 2),
             }
-            for sector_id, sector_info in SECTORS.items():
-                changes = [tickers_data[t]["daily_pct"] for t in sector_info["tickers"] if t in tickers_data]
-                if changes:
-                    daily["sectors"][sector_id] = {
-                        "name": sector_info["name"],
-                        "avg_daily_pct": round(sum(changes) / len(changes), 2),
-                        "tickers_tracked": len(changes),
-                        "tickers_total": len(sector_info["tickers"]),
-                    }
-            with open(daily_path, "w") as f:
-                json.dump(daily, f, indent=2)
+            index.mark_dirty(date_str)
             patched_count += 1
-            print(f"  📋 Patched {ticker} into {daily_path.name}")
+            print(f"  📋 Patched {ticker} into {date_str}.json")
+    # Each changed file is recomputed and written once, however many tickers it gained
+    for date_str in index.dirty():
+        _recompute_sector_averages(index.get(date_str))
+    index.flush()
     if patched_count:
         print(f"  ✅ Patched {patched_count} missing ticker entries into daily files")
 
@@ -811,8 +1145,9 @@ def fetch_ltm_high(zero_date="2026-02-03"):
         "sectors": {},
     }
 
+    history = _load_history(all_tickers, start_date, end_date, fetcher)
     for ticker in all_tickers:
-        rows, used_fallback = _fetch_historical_with_fallback(ticker, start_date, end_date, fetcher)
+        rows, used_fallback = history.get(ticker, (None, False))
         if not rows:
             print(f"  ⚠ {ticker}: no historical data (FMP + yfinance)")
             continue
@@ -894,14 +1229,16 @@ def validate_data() -> bool:
         if missing:
             errors.append(f"ltm_high.json missing tickers: {sorted(missing)}")
 
-    daily_files = sorted(DATA_DIR.glob("2026-*.json"))
-    if not daily_files:
+    index = _get_daily_index()
+    stems = index.stems() + list(index.unreadable)
+    if not stems:
         errors.append("no daily snapshots (2026-*.json)")
     else:
-        latest = json.loads(daily_files[-1].read_text())
-        missing = all_tickers - set(latest.get("tickers", {}).keys())
+        # Newest date; its close snapshot wins over intraday files (2026-02-12-noon) of that day
+        latest = max(stems, key=lambda s: (s[:10], s.count("-") == 2, s))
+        missing = all_tickers - set(index.tickers(latest).keys())
         if missing:
-            errors.append(f"latest daily ({daily_files[-1].name}) missing tickers: {sorted(missing)}")
+            errors.append(f"latest daily ({latest}.json) missing tickers: {sorted(missing)}")
 
     if errors:
         print("❌ DATA VALIDATION FAILED:")
@@ -912,13 +1249,179 @@ def validate_data() -> bool:
     return True
 
 
-if __name__ == "__main__":
+def _manifest_file() -> Path:
+    return DATA_DIR / "manifest.json"
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _load_manifest() -> dict:
+    try:
+        return json.loads(_manifest_file().read_text()).get("files", {})
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return {}
+
+
+def _write_manifest() -> None:
+    """
+    Record checksum, ticker count and finality for baseline, LTM and every daily snapshot.
+    A daily file is final once its date is in the past and it holds every ticker.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    all_tickers = set(TICKERS.keys())
+    files = {}
+    for name in ("baseline.json", "ltm_high.json"):
+        path = DATA_DIR / name
+        try:
+            tickers = json.loads(path.read_text()).get("tickers", {})
+        except (json.JSONDecodeError, OSError):
+            continue
+        files[name] = {"sha256": _file_sha256(path), "tickers": len(tickers), "final": False}
+    index = _get_daily_index()
+    for date_str in index.stems(dates_only=True):
+        tickers = set(index.tickers(date_str).keys())
+        files[f"{date_str}.json"] = {
+            "sha256": _file_sha256(DATA_DIR / f"{date_str}.json"),
+            "tickers": len(tickers),
+            "final": date_str < today and all_tickers <= tickers,
+        }
+    _manifest_file().write_text(json.dumps({"generated_at": datetime.now().isoformat(), "files": files}, indent=2))
+
+
+def _is_complete(path: Path) -> bool:
+    """True if path parses and holds every tracked ticker."""
+    try:
+        tickers = json.loads(path.read_text()).get("tickers", {})
+    except (json.JSONDecodeError, OSError):
+        return False
+    return set(TICKERS.keys()) <= set(tickers.keys())
+
+
+def refresh_data() -> bool:
+    """
+    Differential refresh (replaces the delete-everything rebuild in CI):
+    - baseline / LTM high are rebuilt only if missing or incomplete
+    - daily files whose checksum no longer matches a finalized manifest entry, or that do
+      not parse, are rebuilt from historical EOD; incomplete ones are patched in place
+    - missing trading days are filled by incremental backfill, and today is refetched
+    - finalized historical snapshots are left untouched
+    Then the manifest is rewritten and validate_data() decides the result.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
+    today = datetime.now().strftime("%Y-%m-%d")
+    manifest = _load_manifest()
+    print(f"Differential refresh ({len(manifest)} file(s) in manifest)...\n")
+
+    for name in ("baseline.json", "ltm_high.json"):
+        path = DATA_DIR / name
+        if path.exists() and not _is_complete(path):
+            print(f"  ♻ {name} incomplete — rebuilding")
+            path.unlink()
+    fetch_baseline()
+
+    index = _get_daily_index()
+    all_tickers = set(TICKERS.keys())
+    rebuild = sorted(s for s in index.unreadable if s.count("-") == 2 and s < today)
+    patch = []
+    for date_str in index.stems(dates_only=True):
+        if date_str >= today:
+            continue
+        entry = manifest.get(f"{date_str}.json")
+        if entry and entry.get("final"):
+            if entry.get("sha256") != _file_sha256(DATA_DIR / f"{date_str}.json"):
+                rebuild.append(date_str)  # finalized file changed on disk since it was recorded
+        elif not all_tickers <= set(index.tickers(date_str).keys()):
+            patch.append(date_str)
+    for date_str in sorted(rebuild):
+        print(f"  ♻ {date_str}.json stale — rebuilding from historical EOD")
+        # Overwritten only if history has data for the date; otherwise the old file stays
+        _patch_missing_tickers_in_daily(DATA_DIR / f"{date_str}.json", date_str, {
+            "date": date_str, "fetched_at": datetime.now().isoformat(), "tickers": {}, "sectors": {},
+        })
+    for date_str in patch:
+        _patch_missing_tickers_in_daily(DATA_DIR / f"{date_str}.json", date_str, index.get(date_str))
+    index.flush()
+
+    backfill(incremental=True)
+
+    ltm_file = DATA_DIR / "ltm_high.json"
+    if not ltm_file.exists():
+        fetch_ltm_high()
+
+    today_file = DATA_DIR / f"{today}.json"
+    if today_file.exists():
+        today_file.unlink()
+    fetch_daily_snapshot()
+    _patch_baseline_from_daily()
+    _patch_ltm_from_daily()
+
+    _get_daily_index().rebuild_history()
+    _write_manifest()
+    return validate_data()
+
+
+def _arg_int(flag: str) -> int | None:
+    """Return the integer following flag in sys.argv (e.g. --workers 8), or None."""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            try:
+                return int(sys.argv[idx + 1])
+            except ValueError:
+                pass
+    return None
+
+
+def _save_price_store() -> None:
+    """Persist the run's PriceStore when PRICE_STORE_PATH is set."""
+    if _price_store is not None:
+        _price_store.save()
+
+
+def _report_cache_stats() -> None:
+    """Print FMP response cache counters for this run (when the cache is enabled)."""
+    if _fetcher is not None and _fetcher.cache is not None:
+        print(f"\n🗄  FMP cache: {_fetcher.cache.summary()}")
+
+
+def _report_breakers() -> None:
+    """Print providers whose circuit opened during this run."""
+    for provider, breaker in _breakers.items():
+        if breaker.skipped:
+            print(f"⚡ {breaker.name} circuit {breaker.state}: {breaker.skipped} call(s) skipped")
+            get_metrics().add(f"circuit_skipped.{provider}", breaker.skipped)
+
+
+# Flags that select what _run_cli does (first match names the run's stage in the report)
+CLI_MODES = ("--validate", "--repair", "--refresh", "--ltm", "--ltm-high", "--baseline", "--force-baseline",
+             "--backfill", "--force", "--11am", "--noon")
+
+
+def main() -> int:
+    set_concurrency(workers=_arg_int("--workers"), fmp=_arg_int("--fmp-concurrency"), yahoo=_arg_int("--yahoo-concurrency"))
+    mode = next((f.lstrip("-") for f in CLI_MODES if f in sys.argv), "daily")
+    try:
+        with get_metrics().stage(mode):
+            return _run_cli()
+    finally:
+        _save_price_store()
+        _report_cache_stats()
+        _report_breakers()
+        if mode != "validate":  # read-only guardrail; keep the fetch run's report
+            write_report()
+
+
+def _run_cli() -> int:
     if "--validate" in sys.argv:
         ok = validate_data()
-        sys.exit(0 if ok else 1)
+        return 0 if ok else 1
     if "--repair" in sys.argv:
         repair_daily_files()
-        sys.exit(0)
+        return 0
+    if "--refresh" in sys.argv:
+        return 0 if refresh_data() else 1
     if "--ltm" in sys.argv or "--ltm-high" in sys.argv:
         fetch_ltm_high()
     elif "--baseline" in sys.argv or "--force-baseline" in sys.argv:
@@ -928,8 +1431,12 @@ if __name__ == "__main__":
                 baseline_file.unlink()
         fetch_baseline()
     elif "--backfill" in sys.argv:
+        incremental = "--incremental" in sys.argv
+        if not incremental:
+            # Baseline, backfill and the daily patch pass share one history load
+            _prime_history(BACKFILL_HISTORY_START)
         fetch_baseline()
-        backfill()
+        backfill(incremental=incremental)
     elif "--force" in sys.argv:
         today = datetime.now().strftime("%Y-%m-%d")
         f = DATA_DIR / f"{today}.json"
@@ -952,3 +1459,8 @@ if __name__ == "__main__":
         fetch_noon_snapshot()
     else:
         fetch_daily_snapshot()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
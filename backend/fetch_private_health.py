@@ -9,7 +9,8 @@ Fetches publicly available health indicators for private companies:
 - Other relevant news
 
 Uses NewsAPI (newsapi.org) — requires NEWS_API_KEY env var.
-Free tier: 100 requests/day. Run periodically (e.g. weekly): python fetch_private_health.py
+Free tier: 100 requests/day. Company searches are coalesced into a handful of OR-joined
+queries (about 6 requests per run). Run periodically (e.g. weekly): python fetch_private_health.py
 
 Output: data/private_health.json — merged into Private Cos UI. Only companies with
 relevant news get bullets; each bullet includes date, source, and clickable URL.
@@ -19,13 +20,21 @@ import json
 import os
 import re
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
 import requests
 from dotenv import load_dotenv
 
+from cassette import replayable, replaying
+from http_session import get_session, timeout_for
+from news_classifier import classify
+from news_store import STORE_DIR, ArticleStore
+from rate_limit import backoff_delay, get_limiter, retry_after_seconds
+from run_metrics import get_metrics, write_report
+
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 # Private company names from sectors.js (status: "private")
@@ -41,101 +50,172 @@ PRIVATE_COMPANIES = [
 # LATAM companies — also search Spanish/Portuguese sources
 LATAM_COMPANIES = {"CONTPAQi", "SIIGO", "Nubox", "Colppy", "Bind ERP", "Alegra", "CONTPAQi Nómina", "Buk"}
 
-# Keywords that indicate relevant health/funding news (English)
-RELEVANT_KEYWORDS = re.compile(
-    r"\b(funding|raised|raise|acquisition|acquired|acquirer|valuation|"
-    r"series [a-d]|seed round|down round|up round|layoff|layoffs|"
-    r"ipo|merger|invest|investment|venture|vc|private equity)\b",
-    re.I,
-)
-
-# Spanish/Portuguese keywords for LATAM articles
-RELEVANT_KEYWORDS_ES_PT = re.compile(
-    r"\b(financiamiento|financiación|inversión|inversão|adquisición|aquisição|"
-    r"valoración|valoração|valuación|ronda|funding|levantamiento|levantou|"
-    r"fusion|fusão|merger|venture|capital|private equity|"
-    r"despidos|demissões|layoff|serie [a-d]|seed)\b",
-    re.I,
-)
+# Company names that are also common words: require the name in the article text
+AMBIGUOUS_NAMES = {"wave", "notion", "spot", "cloud", "stay", "bind", "person"}
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 OUTPUT_FILE = DATA_DIR / "private_health.json"
+STORE_FILE = STORE_DIR / "private_health_articles.json"
+WINDOW_DAYS = 30  # Free tier: search up to 1 month old only
+# Companies fetched successfully within this many hours are served from the store on rerun
+NEWS_REFRESH_HOURS = float(os.getenv("NEWS_REFRESH_HOURS", "12"))
+NEWSAPI_RATE_LIMIT_RETRIES = 2  # 429 retries (Retry-After honored, else backoff with jitter)
+# Coalesced queries in flight at once (request rate is capped by NEWSAPI_RATE_PER_MIN)
+NEWSAPI_WORKERS = int(os.getenv("NEWSAPI_WORKERS", "6"))
+NEWSAPI_MAX_QUERY_CHARS = 500  # NewsAPI's limit on q
+NEWSAPI_NAMES_PER_QUERY = int(os.getenv("NEWSAPI_NAMES_PER_QUERY", "8"))
+# Results per name, as in the one-query-per-company search: a coalesced query asks for this
+# many per name (max 100), and each name keeps at most this many of the articles mentioning it
+NEWSAPI_PAGE_SIZE_PER_NAME = 5
 
 
 def _get_api_key() -> str | None:
-    return os.environ.get("NEWS_API_KEY") or os.environ.get("NEWSAPI_KEY")
-
-
-def _search_news(company: str, api_key: str, from_date: str, language: str = "en") -> list[dict]:
-    """Search NewsAPI for company + funding-related terms. Returns list of articles."""
-    # Strip accents/special chars for search; keep base name
-    search_name = company.split()[0] if company else ""
-    if not search_name:
-        return []
-
-    if language == "en":
-        query = f'"{search_name}" (funding OR raised OR acquisition OR acquired OR valuation OR "down round" OR "up round")'
-    elif language == "es":
-        query = f'"{search_name}" (financiamiento OR inversión OR adquisición OR valuation OR funding OR ronda)'
-    else:
-        # Portuguese (pt)
-        query = f'"{search_name}" (financiamento OR inversão OR aquisição OR valuation OR funding OR ronda)'
-
-    # top-headlines doesn't support language; for non-en go straight to everything
-    endpoints = []
-    if language == "en":
-        endpoints.append((
-            "https://newsapi.org/v2/top-headlines",
-            {"q": search_name, "pageSize": 5, "apiKey": api_key},
-        ))
-    endpoints.append((
-        "https://newsapi.org/v2/everything",
-        {
-            "q": query,
-            "from": from_date,
-            "sortBy": "publishedAt",
-            "pageSize": 5,
-            "language": language,
-            "apiKey": api_key,
-        },
-    ))
-
-    for url, params in endpoints:
-        try:
-            r = requests.get(url, params=params, timeout=15)
-            if r.status_code == 426:
-                continue  # Upgrade required, try next endpoint
-            r.raise_for_status()
-            data = r.json()
-            articles = data.get("articles") or []
-            if articles:
-                return articles
-        except requests.exceptions.RequestException as e:
-            if "426" in str(e):
+    return os.environ.get("NEWS_API_KEY") or os.environ.get("NEWSAPI_KEY") or ("replay" if replaying() else None)
+
+
+# OR-joined funding keywords appended to every query, per language
+KEYWORD_CLAUSES = {
+    "en": '(funding OR raised OR acquisition OR acquired OR valuation OR "down round" OR "up round")',
+    "es": "(financiamiento OR inversión OR adquisición OR valuation OR funding OR ronda)",
+    "pt": "(financiamento OR inversão OR aquisição OR valuation OR funding OR ronda)",
+}
+
+
+def _search_name(company: str) -> str:
+    """Base name sent to NewsAPI ("Zoho CRM" and "Zoho Books" both search "Zoho")."""
+    return company.split()[0] if company else ""
+
+
+def _build_query(names: list[str], language: str) -> str:
+    """'"A" (kw...)' for one name, '("A" OR "B") (kw...)' for several."""
+    quoted = " OR ".join(f'"{n}"' for n in names)
+    if len(names) > 1:
+        quoted = f"({quoted})"
+    return f"{quoted} {KEYWORD_CLAUSES[language]}"
+
+
+def _plan_queries(companies: list[str], max_chars: int = None, max_names: int = None,
+                  served: frozenset = frozenset()) -> list[tuple[str, list[str]]]:
+    """
+    Coalesce company × language searches into as few NewsAPI requests as possible:
+    identical search names are deduped, then packed into OR-joined queries up to the
+    query-length limit (and NEWSAPI_NAMES_PER_QUERY, so one busy name cannot crowd the
+    others out of a page). Common-word names (AMBIGUOUS_NAMES) match far more articles
+    than they keep, so each gets its own query. (language, name) pairs in served were already
+    answered (by the top-headlines probe) and are left out. Returns [(language, [search
+    names])] in language order.
+    """
+    max_chars = max_chars or NEWSAPI_MAX_QUERY_CHARS
+    max_names = max_names or NEWSAPI_NAMES_PER_QUERY
+    plan = []
+    for language in KEYWORD_CLAUSES:
+        names = []
+        for company in companies:
+            name = _search_name(company)
+            if name and language in _languages(company) and name not in names and (language, name) not in served:
+                names.append(name)
+        batch = []
+        for name in names:
+            if name.lower() in AMBIGUOUS_NAMES:
+                plan.append((language, [name]))
                 continue
-            print(f"  ⚠ {company}: API error — {e}")
+            if batch and (len(batch) >= max_names or len(_build_query(batch + [name], language)) > max_chars):
+                plan.append((language, batch))
+                batch = []
+            batch.append(name)
+        if batch:
+            plan.append((language, batch))
+    return plan
+
+
+def _newsapi_get(url: str, params: dict, operation: str) -> requests.Response:
+    """GET a NewsAPI endpoint under the rate limiter; 429s are retried (Retry-After honored)."""
+    limiter = get_limiter("newsapi")
+    with get_metrics().timed("newsapi", operation) as call:
+        for attempt in range(NEWSAPI_RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            r = get_session().get(url, params=params, timeout=timeout_for(url))
+            call.update(status=r.status_code, bytes=len(r.content or b""), retries=attempt)
+            if r.status_code != 429 or attempt == NEWSAPI_RATE_LIMIT_RETRIES:
+                break
+            wait = retry_after_seconds(r)
+            limiter.pause(wait if wait is not None else backoff_delay(attempt))
+    return r
+
+
+@replayable("newsapi", "top-headlines", key=lambda name, api_key: [name])
+def _top_headlines(name: str, api_key: str) -> list[dict]:
+    """
+    English top-headlines probe for one search name, tried before the everything search as
+    it always has been. The endpoint has no OR operator, so it is not coalesced.
+    Returns articles, or [] if there are none or the request failed (everything then runs).
+    """
+    url = "https://newsapi.org/v2/top-headlines"
+    try:
+        r = _newsapi_get(url, {"q": name, "pageSize": NEWSAPI_PAGE_SIZE_PER_NAME, "apiKey": api_key}, "top-headlines")
+        if r.status_code == 426:
             return []
-        except json.JSONDecodeError:
-            continue
+        r.raise_for_status()
+        return r.json().get("articles") or []
+    except (requests.exceptions.RequestException, json.JSONDecodeError):
+        return []
 
-    return []
+
+@replayable("newsapi", "everything", key=lambda names, api_key, from_date, language="en": [names, language])
+def _search_news(names: list[str], api_key: str, from_date: str, language: str = "en") -> list[dict] | None:
+    """
+    Run one coalesced NewsAPI everything query for names + funding-related terms.
+    Returns list of articles, or None if the request failed.
+    """
+    url = "https://newsapi.org/v2/everything"
+    params = {
+        "q": _build_query(names, language),
+        "from": from_date,
+        "sortBy": "publishedAt",
+        "pageSize": min(100, NEWSAPI_PAGE_SIZE_PER_NAME * len(names)),
+        "language": language,
+        "apiKey": api_key,
+    }
+    try:
+        r = _newsapi_get(url, params, "everything")
+        if r.status_code == 426:
+            print(f"  ⚠ {', '.join(names)} ({language}): upgrade required for this date range")
+            return None
+        r.raise_for_status()
+        return r.json().get("articles") or []
+    except requests.exceptions.RequestException as e:
+        print(f"  ⚠ {', '.join(names)} ({language}): API error — {e}")
+        return None
+    except json.JSONDecodeError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _name_pattern(search_name: str) -> re.Pattern:
+    return re.compile(rf"\b{re.escape(search_name)}\b", re.I)
+
+
+def _mentions(article: dict, search_name: str) -> bool:
+    """
+    True if a coalesced query's article is about search_name (title, description or
+    content). Whole words only: "Buk" must not match "Bukele", nor "Deel" "deeply".
+    """
+    text = " ".join(article.get(k) or "" for k in ("title", "description", "content"))
+    return _name_pattern(search_name).search(text) is not None
 
 
 def _is_relevant(article: dict, company: str, use_es_pt: bool = False) -> bool:
     """Check if article title/description contains relevant keywords."""
-    title = (article.get("title") or "").lower()
-    desc = (article.get("description") or "").lower()
-    text = f"{title} {desc}"
+    title = article.get("title") or ""
+    desc = article.get("description") or ""
     # LATAM companies: accept English OR Spanish/Portuguese keywords
-    if use_es_pt:
-        if not RELEVANT_KEYWORDS.search(text) and not RELEVANT_KEYWORDS_ES_PT.search(text):
-            return False
-    elif not RELEVANT_KEYWORDS.search(text):
+    if not classify(title, desc) & ({"deal", "deal_es_pt"} if use_es_pt else {"deal"}):
         return False
     # Avoid articles about unrelated companies with same word (e.g. "Wave" physics)
     search_name = company.split()[0].lower()
-    if search_name in ("wave", "notion", "spot", "cloud", "stay", "bind", "person"):
+    if search_name in AMBIGUOUS_NAMES:
         # Require company name to appear
+        text = f"{title} {desc}".lower()
         if search_name not in text and company.lower() not in text:
             return False
     return True
@@ -153,6 +233,27 @@ def _format_article(article: dict) -> dict:
     }
 
 
+def _languages(company: str) -> tuple[str, ...]:
+    """English search for all; add Spanish/Portuguese for LATAM companies."""
+    return ("en", "es", "pt") if company in LATAM_COMPANIES else ("en",)
+
+
+def _merge_company(company: str, articles: list[dict]) -> list[dict]:
+    """Relevant articles for company, formatted and deduped by URL (first occurrence wins)."""
+    use_es_pt = company in LATAM_COMPANIES
+    seen = set()
+    unique = []
+    for a in articles:
+        if not (_is_relevant(a, company, use_es_pt=use_es_pt) and a.get("url")):
+            continue
+        r = _format_article(a)
+        u = r.get("url", "")
+        if u and u not in seen:
+            seen.add(u)
+            unique.append(r)
+    return unique
+
+
 def fetch_private_health():
     """Fetch health indicators for all private companies. Writes to data/private_health.json."""
     api_key = _get_api_key()
@@ -161,55 +262,83 @@ def fetch_private_health():
         print("   Then: export NEWS_API_KEY=your_key && python fetch_private_health.py")
         sys.exit(1)
 
-    # Free tier: search up to 1 month old only
-    from_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
     DATA_DIR.mkdir(exist_ok=True)
+    now = datetime.now()
+    store = ArticleStore(STORE_FILE, WINDOW_DAYS)
 
     latam_only = "--latam-only" in sys.argv
     companies = [c for c in PRIVATE_COMPANIES if c in LATAM_COMPANIES] if latam_only else PRIVATE_COMPANIES
+    # Only ask NewsAPI about companies not fetched recently, and only since their last fetch
+    to_fetch = [c for c in companies if not store.is_fresh(c, timedelta(hours=NEWS_REFRESH_HOURS), now)]
 
     print("Fetching private company health indicators...")
     if latam_only:
         print(f"  [LATAM only] Spanish + Portuguese sources included")
-    print(f"  From: {from_date} | Companies: {len(companies)}\n")
+    print(f"  Window: {WINDOW_DAYS} days | Companies: {len(companies)} ({len(companies) - len(to_fetch)} fresh in store)\n")
 
     result = {
-        "fetched_at": datetime.now().isoformat(),
+        "fetched_at": now.isoformat(),
         "description": "Health indicators for private SMB SaaS companies. Run periodically: npm run fetch:private",
         "companies": {},
     }
 
-    for i, company in enumerate(companies):
-        # English search for all; add Spanish/Portuguese for LATAM companies
-        articles = _search_news(company, api_key, from_date, language="en")
-        if company in LATAM_COMPANIES:
-            for lang in ("es", "pt"):
-                articles.extend(_search_news(company, api_key, from_date, language=lang))
-                time.sleep(0.5)  # Rate limit between language requests
-
-        use_es_pt = company in LATAM_COMPANIES
-        relevant = [
-            _format_article(a)
-            for a in articles
-            if _is_relevant(a, company, use_es_pt=use_es_pt) and a.get("url")
-        ]
-        # Dedupe by URL
-        seen = set()
-        unique = []
-        for r in relevant:
-            u = r.get("url", "")
-            if u and u not in seen:
-                seen.add(u)
-                unique.append(r)
-
-        if unique:
-            result["companies"][company] = unique[:5]  # Max 5 per company
-            print(f"  ✅ {company}: {len(unique)} item(s)")
-        else:
-            print(f"  ⏭ {company}: no relevant news")
-
-        if i < len(companies) - 1:
-            time.sleep(0.5)  # Rate limit for free tier
+    # Each name first gets its English top-headlines probe; a name the probe answers skips the
+    # English everything search, as before. The remaining company × language searches are
+    # coalesced into a few OR-joined queries on one pool. A company is attributed its articles
+    # (name mention + _is_relevant) and merged into the store as soon as every query covering
+    # it has returned; languages merge in en/es/pt order.
+    names = list(dict.fromkeys(_search_name(c) for c in to_fetch if _search_name(c)))
+    with ThreadPoolExecutor(max_workers=max(1, NEWSAPI_WORKERS)) as pool:
+        headlines = {n: a for n, a in zip(names, pool.map(lambda n: _top_headlines(n, api_key), names)) if a}
+    plan = _plan_queries(to_fetch, served=frozenset(("en", n) for n in headlines))
+    print(f"  {len(names)} top-headlines probe(s) ({len(headlines)} answered), {len(plan)} everything request(s)\n")
+    # Plan is in en/es/pt order, so sorted query ids give the language merge order
+    query_ids = {c: sorted(i for i, (lang, names) in enumerate(plan) if _search_name(c) in names and lang in _languages(c))
+                 for c in to_fetch}
+    waiting = {c: set(ids) for c, ids in query_ids.items()}
+    responses = {}
+
+    def query_from(lang, names):
+        """Earliest since-last-fetch start among the companies a query covers."""
+        covered = [c for c in to_fetch if _search_name(c) in names and lang in _languages(c)]
+        return min(store.since(c, now) for c in covered).strftime("%Y-%m-%dT%H:%M:%S")
+
+    def merge(company):
+        name = _search_name(company)
+        ids = query_ids[company]
+        if any(responses[i] is None for i in ids):
+            print(f"  ⚠ {company}: request failed — keeping stored items")
+            return
+        articles = list(headlines.get(name, []))
+        for i in ids:
+            articles += [a for a in responses[i] if _mentions(a, name)][:NEWSAPI_PAGE_SIZE_PER_NAME]
+        new = sum(store.add(company, a, now) for a in _merge_company(company, articles))
+        store.mark_fetched(company, now)
+        print(f"  {'✅' if new else '⏭'} {company}: {new} new item(s)")
+
+    for company in to_fetch:
+        if not waiting[company]:  # fully answered by its top-headlines probe
+            merge(company)
+    with ThreadPoolExecutor(max_workers=max(1, NEWSAPI_WORKERS)) as pool:
+        futures = {
+            pool.submit(_search_news, names, api_key, query_from(lang, names), lang): i
+            for i, (lang, names) in enumerate(plan)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            responses[i] = future.result()
+            for company in to_fetch:
+                if i in waiting[company]:
+                    waiting[company].discard(i)
+                    if not waiting[company]:
+                        merge(company)
+
+    pruned = store.prune(now)
+    store.save()
+    for company in companies:
+        items = store.articles(company)
+        if items:
+            result["companies"][company] = items[:5]  # Max 5 per company
 
     # When --latam-only, merge with existing file so we don't overwrite other companies
     if latam_only and OUTPUT_FILE.exists():
@@ -226,9 +355,12 @@ def fetch_private_health():
 
     count = sum(len(v) for v in result["companies"].values())
     print(f"\n✅ Saved to {OUTPUT_FILE}")
-    print(f"   {len(result['companies'])} companies with news, {count} total items")
+    print(f"   {len(result['companies'])} companies with news, {count} total items ({pruned} aged out of the store)")
     return result
 
 
 if __name__ == "__main__":
-    fetch_private_health()
+    try:
+        fetch_private_health()
+    finally:
+        write_report()
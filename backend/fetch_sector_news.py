@@ -11,20 +11,27 @@ Output: data/sector_news.json — feeds the "Relevant Sector News" tab.
 """
 
 import json
+import os
 import re
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from cassette import replayable, replaying
+from news_classifier import classify
+from news_store import STORE_DIR, ArticleStore
+from rate_limit import get_limiter
+from run_metrics import get_metrics, write_report
+
 try:
     from duckduckgo_search import DDGS
 except ImportError:
     try:
         from ddgs import DDGS
     except ImportError:
-        print("❌ duckduckgo-search not installed. Run: pip install duckduckgo-search")
-        sys.exit(1)
+        DDGS = None  # only live searches need it; cassette replay works without
 
 # Sectors from sectors.js — id, name, search terms
 SECTORS = [
@@ -43,35 +50,50 @@ DATA_DIR = Path(__file__).parent.parent / "data"
 OUTPUT_FILE = DATA_DIR / "sector_news.json"
 MAX_PER_QUERY = 12  # Fetch more raw results; filter reduces to value/valuation/stock only
 MAX_PER_SECTOR = 15
-
-# CRITICAL: Only news about sector value, valuation, or stock performance qualifies.
-VALUE_VALUATION_STOCK_PATTERN = re.compile(
-    r"\b(valuation|valuations|value|valued|market cap|market value|"
-    r"stock|stocks|share price|shares|equity|ticker|trading|traded|"
-    r"analyst|analysts|earnings|revenue|growth|outlook|"
-    r"price target|downgrade|upgrade|downgraded|upgraded|"
-    r"multiple|P/E|forward revenue|ARR|"
-    r"selloff|sell-off|crash|drop|decline|rally)\b",
-    re.I,
-)
-
+WINDOW_DAYS = 15
+STORE_FILE = STORE_DIR / "sector_news_articles.json"
+# Sectors fetched successfully within this many hours are served from the store on rerun
+NEWS_REFRESH_HOURS = float(os.getenv("NEWS_REFRESH_HOURS", "12"))
+# Searches in flight at once; pacing is still DDG_RATE_PER_MIN
+SECTOR_NEWS_WORKERS = int(os.getenv("SECTOR_NEWS_WORKERS", "3"))
 
 def _qualifies(article: dict) -> bool:
     """CRITICAL guardrail: only include if about sector value, valuation, or stock performance."""
-    title = (article.get("title") or "").lower()
-    body = (article.get("body") or "").lower()
-    text = f"{title} {body}"
-    return bool(VALUE_VALUATION_STOCK_PATTERN.search(text))
+    return "market" in classify(article.get("title"), article.get("body"))
+
+
+def _timelimit(since: datetime, now: datetime = None) -> str:
+    """Narrowest DuckDuckGo timelimit (d/w/m) that still covers everything since `since`."""
+    age = (now or datetime.now()) - since
+    if age <= timedelta(days=1):
+        return "d"
+    if age <= timedelta(days=7):
+        return "w"
+    return "m"
+
+
+_local = threading.local()
 
 
-def _search_news(query: str, max_results: int = MAX_PER_QUERY) -> list[dict]:
-    """Search DuckDuckGo news. Returns list of {title, url, date, body}."""
+def _client() -> "DDGS":
+    """DDGS client for the current worker thread, reused across its searches."""
+    if getattr(_local, "ddgs", None) is None:
+        _local.ddgs = DDGS()
+    return _local.ddgs
+
+
+@replayable("ddg", "news", key=lambda query, max_results=MAX_PER_QUERY, timelimit="m": [query, max_results])
+def _search_news(query: str, max_results: int = MAX_PER_QUERY, timelimit: str = "m") -> list[dict] | None:
+    """Search DuckDuckGo news. Returns list of {title, url, date, body}, or None if the search failed."""
+    get_limiter("ddg").acquire()  # DDG_RATE_PER_MIN; be nice to DuckDuckGo
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.news(query, max_results=max_results))
+        with get_metrics().timed("ddg", "news") as call:
+            results = list(_client().news(query, timelimit=timelimit, max_results=max_results))
+            call["status"] = "ok" if results else "empty"
     except Exception as e:
-        print(f"    ⚠ Search error: {e}")
-        return []
+        print(f"    ⚠ Search error ({query}): {e}")
+        _local.ddgs = None  # start the next search on a fresh client
+        return None
 
     out = []
     for r in results:
@@ -109,13 +131,13 @@ def _parse_date(s: str) -> str:
 
 
 def _is_within_window(date_str: str) -> bool:
-    """Return True if date is within the last 15 days. Drops articles with missing/unparseable dates."""
+    """Return True if date is within the last WINDOW_DAYS days. Drops articles with missing/unparseable dates."""
     parsed = _parse_date(date_str)
     if not parsed or len(parsed) < 10:
         return False
     try:
         article_date = datetime.strptime(parsed[:10], "%Y-%m-%d").date()
-        cutoff = (datetime.now() - timedelta(days=15)).date()
+        cutoff = (datetime.now() - timedelta(days=WINDOW_DAYS)).date()
         return article_date >= cutoff
     except ValueError:
         return False
@@ -123,48 +145,77 @@ def _is_within_window(date_str: str) -> bool:
 
 def fetch_sector_news():
     """Fetch news for each sector. Writes to data/sector_news.json."""
+    if DDGS is None and not replaying():
+        print("❌ duckduckgo-search not installed. Run: pip install duckduckgo-search")
+        sys.exit(1)
     DATA_DIR.mkdir(exist_ok=True)
+    now = datetime.now()
+    store = ArticleStore(STORE_FILE, WINDOW_DAYS)
 
     print("Fetching sector news (analyst & market view) via web search...")
     print(f"  Sectors: {len(SECTORS)} | Run: npm run fetch:sector-news\n")
 
     result = {
-        "fetched_at": datetime.now().isoformat(),
+        "fetched_at": now.isoformat(),
         "description": "Analyst and market news per sector. Run periodically: npm run fetch:sector-news",
         "sectors": {},
     }
 
+    # All sectors' queries share one bounded pool. Each result is filtered and merged into
+    # the store as it arrives; a sector is marked fetched once all of its queries succeed.
+    fresh = {s["id"] for s in SECTORS if store.is_fresh(s["id"], timedelta(hours=NEWS_REFRESH_HOURS), now)}
+    pending = {s["id"]: len(s["queries"]) for s in SECTORS if s["id"] not in fresh}
+    failed = set()
+    new = dict.fromkeys(pending, 0)
+
+    with ThreadPoolExecutor(max_workers=max(1, SECTOR_NEWS_WORKERS)) as pool:
+        futures = {
+            pool.submit(_search_news, q, timelimit=_timelimit(store.since(s["id"], now), now)): s
+            for s in SECTORS if s["id"] in pending for q in s["queries"]
+        }
+        for future in as_completed(futures):
+            sector = futures[future]
+            sector_id = sector["id"]
+            articles = future.result()
+            if articles is None:
+                failed.add(sector_id)
+            else:
+                for a in articles:
+                    a["date"] = _parse_date(a.get("date", "")) or a.get("date", "")
+                # CRITICAL: Filter to only value/valuation/stock-performance news, max 15 days old
+                qualified = [a for a in articles if _qualifies(a) and _is_within_window(a.get("date", ""))]
+                new[sector_id] += sum(store.add(sector_id, a, now) for a in _dedupe_by_url(qualified))
+            pending[sector_id] -= 1
+            if not pending[sector_id]:
+                if sector_id not in failed:
+                    store.mark_fetched(sector_id, now)
+                print(f"  ✅ {sector['name']}: {new[sector_id]} new article(s)")
+
     for sector in SECTORS:
-        sector_id = sector["id"]
-        sector_name = sector["name"]
-        all_articles = []
-
-        for q in sector["queries"]:
-            articles = _search_news(q)
-            for a in articles:
-                a["date"] = _parse_date(a.get("date", "")) or a.get("date", "")
-            all_articles.extend(articles)
-            time.sleep(1)  # Be nice to DuckDuckGo
-
-        # CRITICAL: Filter to only value/valuation/stock-performance news, max 15 days old
-        qualified = [a for a in all_articles if _qualifies(a) and _is_within_window(a.get("date", ""))]
-        unique = _dedupe_by_url(qualified)[:MAX_PER_SECTOR]
-
-        result["sectors"][sector_id] = {
-            "name": sector_name,
+        if sector["id"] in fresh:
+            print(f"  ⏭ {sector['name']}: fetched recently — using stored articles")
+        result["sectors"][sector["id"]] = {
+            "name": sector["name"],
             "icon": sector["icon"],
-            "articles": unique,
+            "articles": [],
         }
-        print(f"  ✅ {sector_name}: {len(unique)} article(s)")
+
+    pruned = store.prune(now)
+    store.save()
+    for sector_id, entry in result["sectors"].items():
+        entry["articles"] = store.articles(sector_id)[:MAX_PER_SECTOR]
 
     with open(OUTPUT_FILE, "w") as f:
         json.dump(result, f, indent=2)
 
     total = sum(len(s["articles"]) for s in result["sectors"].values())
     print(f"\n✅ Saved to {OUTPUT_FILE}")
-    print(f"   {len(result['sectors'])} sectors, {total} total articles")
+    print(f"   {len(result['sectors'])} sectors, {total} total articles ({pruned} aged out of the store)")
     return result
 
 
 if __name__ == "__main__":
-    fetch_sector_news()
+    try:
+        fetch_sector_news()
+    finally:
+        write_report()
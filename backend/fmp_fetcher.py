@@ -5,33 +5,71 @@ Used by fetch_prices.py for daily snapshots, baseline, backfill, and LTM high.
 
 import os
 import requests
+from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+from cassette import replayable, replaying
+from http_cache import ResponseCache, cache_key, get_default_cache
+from http_session import get_session, timeout_for
+from rate_limit import TokenBucket, backoff_delay, get_limiter, retry_after_seconds
+from run_metrics import get_metrics
+
 # Load .env from project root (parent of backend/)
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 
 class FMPFetcher:
     BASE_URL = "https://financialmodelingprep.com/stable"
+    # Response cache TTLs (seconds): EOD ranges ending before today never change
+    QUOTE_CACHE_TTL = 60
+    HISTORY_CACHE_TTL = 30 * 24 * 3600
+    DEFAULT_CACHE_TTL = 3600
+    # Retries of a 429 before giving up (waits for Retry-After, else backoff with jitter)
+    RATE_LIMIT_RETRIES = 3
 
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or os.getenv("FMP_API_KEY")
+    def __init__(self, api_key: str = None, cache: ResponseCache = None,
+                 session: requests.Session = None, base_url: str = None, limiter: TokenBucket = None):
+        self.api_key = api_key or os.getenv("FMP_API_KEY") or ("replay" if replaying() else None)
         if not self.api_key:
             raise ValueError("FMP API Key is missing. Set FMP_API_KEY in .env or pass to constructor.")
+        # Opt-in on-disk response cache (FMP_CACHE_PATH / FMP_CACHE=1); None = always hit the network
+        self.cache = cache if cache is not None else get_default_cache()
+        # Pooled keep-alive session shared across clients; tests can inject their own + a stub base_url
+        self.session = session if session is not None else get_session()
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        # Token bucket at the plan's requests/minute (FMP_RATE_PER_MIN), shared by all fetchers
+        self.limiter = limiter if limiter is not None else get_limiter("fmp")
+        # Flipped to False on the first 402 from batch-quote (premium endpoint)
+        self.batch_quote_supported = True
 
+    @replayable("fmp", lambda self, endpoint, params=None: endpoint,
+                key=lambda self, endpoint, params=None: [endpoint, params or {}])
     def _fetch_json(self, endpoint: str, params: dict = None):
         """
         Fetch JSON data from FMP Stable API with error handling.
         """
-        if params is None:
-            params = {}
+        params = dict(params or {})
+        key = cache_key(endpoint, params)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                get_metrics().record("fmp", endpoint, 0.0, "cache", cache_hit=True)
+                return cached
 
         params["apikey"] = self.api_key
-        url = f"{self.BASE_URL}/{endpoint}"
+        url = f"{self.base_url}/{endpoint}"
 
         try:
-            r = requests.get(url, params=params, timeout=30)
+            with get_metrics().timed("fmp", endpoint) as call:
+                for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+                    self.limiter.acquire()
+                    r = self.session.get(url, params=params, timeout=timeout_for(url))
+                    call.update(status=r.status_code, bytes=len(r.content or b""), retries=attempt)
+                    if r.status_code != 429 or attempt == self.RATE_LIMIT_RETRIES:
+                        break
+                    wait = retry_after_seconds(r)
+                    self.limiter.pause(wait if wait is not None else backoff_delay(attempt))
             r.raise_for_status()
 
             data = r.json()
@@ -43,6 +81,9 @@ class FMPFetcher:
                     raise PermissionError(f"Plan Upgrade Required: {error_msg}")
                 raise ValueError(f"FMP API Error: {error_msg}")
 
+            # Empty payloads are never cached: a transient empty answer must not stick for the TTL
+            if self.cache is not None and data:
+                self.cache.put(key, data, self._cache_ttl(endpoint, params))
             return data
 
         except requests.exceptions.HTTPError as e:
@@ -55,6 +96,17 @@ class FMPFetcher:
             print(f"[ERROR] Failed to fetch {url}: {e}")
             raise
 
+    def _cache_ttl(self, endpoint: str, params: dict) -> float:
+        """Long TTL for history that ends before today, short for quotes and ranges touching today."""
+        if endpoint in ("quote", "batch-quote"):
+            return self.QUOTE_CACHE_TTL
+        if endpoint.startswith("historical-price-eod"):
+            to_date = params.get("to")
+            if to_date and to_date < datetime.now().strftime("%Y-%m-%d"):
+                return self.HISTORY_CACHE_TTL
+            return self.QUOTE_CACHE_TTL
+        return self.DEFAULT_CACHE_TTL
+
     def get_quote(self, symbol: str) -> dict | None:
         """Get real-time quote for a single symbol. Returns first item or None."""
         data = self._fetch_json("quote", params={"symbol": symbol})
@@ -62,28 +114,37 @@ class FMPFetcher:
             return data[0]
         return None
 
-    def get_batch_quote(self, symbols: list[str]) -> list[dict]:
+    def get_batch_quote(self, symbols: list[str], fallback_to_single: bool = True) -> list[dict]:
         """
         Get real-time quotes for multiple symbols.
-        Tries batch-quote first; falls back to single quote per symbol if 402 (premium).
+        Tries batch-quote first; on 402 (premium endpoint) marks batch as unsupported for this
+        fetcher and falls back to single quote per symbol (or returns [] if fallback_to_single
+        is False, so the caller can fan out per-ticker requests itself).
         Returns list of quote objects (one per symbol).
         """
-        symbols_str = ",".join(symbols)
-        try:
-            data = self._fetch_json("batch-quote", params={"symbols": symbols_str})
-            if isinstance(data, list):
-                return data
-        except requests.exceptions.HTTPError as e:
-            if hasattr(e, "response") and e.response is not None and e.response.status_code == 402:
-                # batch-quote is premium on free plan; fall back to single quote per symbol
-                results = []
-                for sym in symbols:
-                    q = self.get_quote(sym)
-                    if q:
-                        results.append(q)
-                return results
-            raise
-        return []
+        if self.batch_quote_supported:
+            symbols_str = ",".join(symbols)
+            try:
+                data = self._fetch_json("batch-quote", params={"symbols": symbols_str})
+                if isinstance(data, list):
+                    return data
+                return []
+            except requests.exceptions.HTTPError as e:
+                if not (hasattr(e, "response") and e.response is not None and e.response.status_code == 402):
+                    raise
+                # batch-quote is premium on free plan; don't try it again this run
+                self.batch_quote_supported = False
+            except PermissionError:
+                # "Plan Upgrade Required" returned in a 200 body
+                self.batch_quote_supported = False
+        if not fallback_to_single:
+            return []
+        results = []
+        for sym in symbols:
+            q = self.get_quote(sym)
+            if q:
+                results.append(q)
+        return results
 
     def get_historical_eod(self, symbol: str, from_date: str, to_date: str) -> list[dict]:
         """
@@ -0,0 +1,102 @@
+"""
+Consolidated columnar price history (data/history.json), written alongside the daily snapshots.
+
+One file instead of one request per day for the frontend: a ticker list, one row per trading
+date, and close / prev_close / daily_pct matrices (rows follow dates, columns follow tickers,
+null where a ticker has no value). Names and sectors are not repeated per day.
+
+A date holds its close snapshot (2026-02-12.json) when one exists, otherwise the latest
+intraday one (2026-02-12-noon.json) — the same preference the frontend applies. DailyIndex
+updates the artifact incrementally whenever it writes a snapshot.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+HISTORY_FILENAME = "history.json"
+MATRICES = ("close", "prev_close", "daily_pct")
+
+
+class HistoryArtifact:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.tickers: list[str] = []
+        self.dates: list[str] = []
+        self.time_labels: list[str | None] = []
+        self.fetched_at: list[str | None] = []
+        self.matrices: dict[str, list[list]] = {m: [] for m in MATRICES}
+        self._loaded = False
+
+    def load(self) -> bool:
+        """Read the artifact from disk. Returns False if it is missing or unreadable."""
+        if self._loaded:
+            return True
+        try:
+            raw = json.loads(self.path.read_text())
+        except (json.JSONDecodeError, OSError):
+            return False
+        self.tickers = list(raw.get("tickers", []))
+        self.dates = list(raw.get("dates", []))
+        self.time_labels = list(raw.get("time_labels", [None] * len(self.dates)))
+        self.fetched_at = list(raw.get("fetched_at", [None] * len(self.dates)))
+        self.matrices = {m: [list(row) for row in raw.get(m, [])] for m in MATRICES}
+        self._loaded = True
+        return True
+
+    def _keeps_existing(self, row: int, snapshot: dict) -> bool:
+        """True if the stored row should win over snapshot for the same date."""
+        existing_label, incoming_label = self.time_labels[row], snapshot.get("time_label")
+        if existing_label is None and incoming_label is not None:
+            return True
+        if incoming_label is None and existing_label is not None:
+            return False
+        return (snapshot.get("fetched_at") or "") < (self.fetched_at[row] or "")
+
+    def update(self, snapshot: dict) -> bool:
+        """Insert or replace the row for snapshot's date. Returns True if the artifact changed."""
+        self._loaded = True
+        date_str = snapshot.get("date")
+        if not isinstance(date_str, str):
+            return False
+        tickers = snapshot.get("tickers", {})
+        for ticker in tickers:
+            if ticker not in self.tickers:
+                self.tickers.append(ticker)
+                for m in MATRICES:
+                    for values in self.matrices[m]:
+                        values.append(None)
+        if date_str in self.dates:
+            row = self.dates.index(date_str)
+            if self._keeps_existing(row, snapshot):
+                return False
+        else:
+            row = sum(1 for d in self.dates if d < date_str)
+            self.dates.insert(row, date_str)
+            self.time_labels.insert(row, None)
+            self.fetched_at.insert(row, None)
+            for m in MATRICES:
+                self.matrices[m].insert(row, [])
+        self.time_labels[row] = snapshot.get("time_label")
+        self.fetched_at[row] = snapshot.get("fetched_at")
+        for m in MATRICES:
+            self.matrices[m][row] = [tickers.get(t, {}).get(m) for t in self.tickers]
+        return True
+
+    def rebuild(self, snapshots) -> None:
+        """Replace the whole artifact from an iterable of snapshot dicts."""
+        self.__init__(self.path)
+        for snapshot in snapshots:
+            self.update(snapshot)
+
+    def save(self) -> Path:
+        out = {
+            "generated_at": datetime.now().isoformat(),
+            "tickers": self.tickers,
+            "dates": self.dates,
+            "time_labels": self.time_labels,
+            "fetched_at": self.fetched_at,
+        }
+        out.update({m: self.matrices[m] for m in MATRICES})
+        self.path.write_text(json.dumps(out, separators=(",", ":")))
+        return self.path
@@ -0,0 +1,103 @@
+"""
+Persistent on-disk cache for provider JSON responses (opt-in).
+Used by FMPFetcher: entries are keyed by endpoint + params (API key excluded), expire per
+entry TTL, and the file is capped in size with least-recently-used eviction.
+
+Enable with FMP_CACHE_PATH=/path/to/fmp_cache.sqlite (or FMP_CACHE=1 for the default
+.cache/fmp_cache.sqlite in the project root). FMP_CACHE_MAX_MB caps the size (default 200).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Params never stored in cache keys
+SECRET_PARAMS = frozenset({"apikey", "apiKey"})
+
+
+def cache_key(endpoint: str, params: dict | None) -> str:
+    """Stable key for an endpoint + params, ignoring credentials."""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in SECRET_PARAMS)
+    return endpoint + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+
+class ResponseCache:
+    def __init__(self, path: Path | str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str):
+        """Return cached JSON data for key, or None on miss/expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT body, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, data, ttl: float) -> None:
+        """Store JSON-serializable data for ttl seconds, evicting LRU entries over the size cap."""
+        if ttl <= 0:
+            return
+        body = json.dumps(data, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, body, len(body), now + ttl, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = f"{self.hits / total * 100:.0f}%" if total else "n/a"
+        return f"{self.hits} hit(s), {self.misses} miss(es), hit rate {rate}"
+
+
+_default_cache = None
+
+
+def get_default_cache() -> ResponseCache | None:
+    """Process-wide cache configured from env, or None when caching is off."""
+    global _default_cache
+    if _default_cache is None:
+        path = os.getenv("FMP_CACHE_PATH")
+        if not path and os.getenv("FMP_CACHE", "").lower() in ("1", "true", "yes"):
+            path = CACHE_DIR / "fmp_cache.sqlite"
+        if not path:
+            return None
+        max_mb = float(os.getenv("FMP_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+        _default_cache = ResponseCache(path, max_bytes=int(max_mb * 1024 * 1024))
+    return _default_cache
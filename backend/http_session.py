@@ -0,0 +1,61 @@
+"""
+Shared pooled HTTP session for API clients (FMP, NewsAPI).
+
+One requests.Session per process keeps TCP+TLS connections alive between calls instead of
+handshaking on every request. The per-host pool is sized to our fetch concurrency
+(HTTP_POOL_SIZE, default FETCH_WORKERS or 8) and timeouts are looked up per host.
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE") or os.getenv("FETCH_WORKERS") or "8")
+DEFAULT_TIMEOUT = 20
+# Seconds per host; EOD history ranges from FMP can be slow
+HOST_TIMEOUTS = {
+    "financialmodelingprep.com": 30,
+    "newsapi.org": 15,
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def make_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """New keep-alive session holding up to pool_size idle connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(HOST_TIMEOUTS) + 2, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide shared session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def set_pool_size(pool_size: int) -> None:
+    """Resize the shared session's pool (e.g. after --workers); drops idle connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = make_session(pool_size)
+
+
+def timeout_for(url: str) -> float:
+    """Timeout for url's host (subdomains match their parent entry)."""
+    host = urlsplit(url).hostname or ""
+    for name, timeout in HOST_TIMEOUTS.items():
+        if host == name or host.endswith("." + name):
+            return timeout
+    return DEFAULT_TIMEOUT
@@ -0,0 +1,76 @@
+"""
+Keyword classifier shared by the news fetchers (private health, sector news).
+
+All keyword sets are compiled into one phrase table keyed by lowercase word tuples. An
+article is tokenized once and every token position is looked up in the table, so one pass
+over the text returns every matched category. The cost depends on the text length and the
+longest phrase, not on how many keywords or categories there are.
+
+Keywords match whole words (like regex \\b...\\b, case-insensitive). Phrases match on word
+tokens, so punctuation inside a phrase is ignored: "p/e" also matches "P/E" and "p e".
+"""
+
+import re
+from typing import Iterable
+
+_WORD = re.compile(r"\w+")
+
+KEYWORDS = {
+    # Private company health: funding, M&A, layoffs (English)
+    "deal": [
+        "funding", "raised", "raise", "acquisition", "acquired", "acquirer", "valuation",
+        "series a", "series b", "series c", "series d", "seed round", "down round", "up round",
+        "layoff", "layoffs", "ipo", "merger", "invest", "investment", "venture", "vc", "private equity",
+    ],
+    # Spanish/Portuguese equivalents for LATAM companies
+    "deal_es_pt": [
+        "financiamiento", "financiación", "inversión", "inversão", "adquisición", "aquisição",
+        "valoración", "valoração", "valuación", "ronda", "funding", "levantamiento", "levantou",
+        "fusion", "fusão", "merger", "venture", "capital", "private equity",
+        "despidos", "demissões", "layoff", "serie a", "serie b", "serie c", "serie d", "seed",
+    ],
+    # Sector news: value, valuation or stock performance
+    "market": [
+        "valuation", "valuations", "value", "valued", "market cap", "market value",
+        "stock", "stocks", "share price", "shares", "equity", "ticker", "trading", "traded",
+        "analyst", "analysts", "earnings", "revenue", "growth", "outlook",
+        "price target", "downgrade", "upgrade", "downgraded", "upgraded",
+        "multiple", "p/e", "forward revenue", "arr",
+        "selloff", "sell-off", "crash", "drop", "decline", "rally",
+    ],
+}
+
+
+def _tokens(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+class KeywordClassifier:
+    def __init__(self, categories: dict[str, Iterable[str]]):
+        phrases: dict[tuple[str, ...], set[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                phrase = tuple(_tokens(keyword))
+                if phrase:
+                    phrases.setdefault(phrase, set()).add(category)
+        self._phrases = {p: frozenset(c) for p, c in phrases.items()}
+        self._lengths = sorted({len(p) for p in self._phrases})
+
+    def classify(self, text: str) -> set[str]:
+        """Categories with at least one keyword in text."""
+        tokens = _tokens(text)
+        found = set()
+        for i in range(len(tokens)):
+            for n in self._lengths:
+                categories = self._phrases.get(tuple(tokens[i:i + n]))
+                if categories:
+                    found |= categories
+        return found
+
+
+CLASSIFIER = KeywordClassifier(KEYWORDS)
+
+
+def classify(*parts: str) -> set[str]:
+    """Matched KEYWORDS categories across the given text parts (e.g. title, description)."""
+    return CLASSIFIER.classify(" ".join(p or "" for p in parts))
@@ -0,0 +1,93 @@
+"""
+Persistent article store for the news fetchers (private health, sector news).
+
+Articles are kept per group (company or sector id), keyed by a hash of their URL, with the
+time they were first seen. Each run asks providers only for articles newer than that
+group's last successful fetch, merges them in, and ages out entries older than the window.
+Articles found earlier stay in the output even if a provider stops ranking them.
+
+Stored under data/stores/ so it is committed with the data it produces.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+STORE_DIR = Path(__file__).parent.parent / "data" / "stores"
+# Re-ask for a little before the last fetch so late-indexed articles are not missed
+OVERLAP = timedelta(days=1)
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha1(url.strip().encode("utf-8")).hexdigest()[:16]
+
+
+class ArticleStore:
+    def __init__(self, path: Path, window_days: int):
+        self.path = Path(path)
+        self.window = timedelta(days=window_days)
+        self.groups: dict[str, dict[str, dict]] = {}
+        self.last_fetch: dict[str, str] = {}
+        try:
+            raw = json.loads(self.path.read_text())
+            self.groups = raw.get("groups", {})
+            self.last_fetch = raw.get("last_fetch", {})
+        except (json.JSONDecodeError, OSError):
+            pass
+
+    def since(self, group: str, now: datetime = None) -> datetime:
+        """Start of the fetch window for group: last successful fetch (minus overlap), or the full window."""
+        now = now or datetime.now()
+        start = now - self.window
+        last = self.last_fetch.get(group)
+        if last:
+            try:
+                start = max(start, datetime.fromisoformat(last) - OVERLAP)
+            except ValueError:
+                pass
+        return start
+
+    def is_fresh(self, group: str, max_age: timedelta, now: datetime = None) -> bool:
+        """True if group was fetched successfully within max_age (a rerun can skip it)."""
+        last = self.last_fetch.get(group)
+        try:
+            return bool(last) and (now or datetime.now()) - datetime.fromisoformat(last) < max_age
+        except ValueError:
+            return False
+
+    def add(self, group: str, article: dict, now: datetime = None) -> bool:
+        """Store article (needs "url") under group unless already seen. Returns True if new."""
+        key = url_key(article["url"])
+        entries = self.groups.setdefault(group, {})
+        if key in entries:
+            return False
+        entries[key] = {"first_seen": (now or datetime.now()).isoformat(), "article": article}
+        return True
+
+    def mark_fetched(self, group: str, now: datetime = None) -> None:
+        self.last_fetch[group] = (now or datetime.now()).isoformat()
+
+    def prune(self, now: datetime = None) -> int:
+        """Drop articles dated (or, undated, first seen) before the window. Returns number removed."""
+        cutoff = ((now or datetime.now()) - self.window).strftime("%Y-%m-%d")
+        removed = 0
+        for group, entries in self.groups.items():
+            for key in [k for k, e in entries.items() if self._date(e) < cutoff]:
+                del entries[key]
+                removed += 1
+        return removed
+
+    def articles(self, group: str) -> list[dict]:
+        """Articles for group, newest first (ties keep first-seen order)."""
+        entries = sorted(self.groups.get(group, {}).values(), key=lambda e: e["first_seen"])
+        return [e["article"] for e in sorted(entries, key=self._date, reverse=True)]
+
+    @staticmethod
+    def _date(entry: dict) -> str:
+        return (entry["article"].get("date") or entry["first_seen"])[:10]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        out = {"saved_at": datetime.now().isoformat(), "last_fetch": self.last_fetch, "groups": self.groups}
+        self.path.write_text(json.dumps(out, indent=2, ensure_ascii=False))
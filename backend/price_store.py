@@ -0,0 +1,152 @@
+"""
+Columnar historical price store shared by backfill, baseline, LTM high and repair passes.
+
+Per ticker: a sorted date list plus close/open/high/low arrays, and the date range the
+network has already answered with bars. fetch_prices fills it through its provider fallback
+chain and only asks for ranges not yet covered, so each ticker range with data is fetched
+at most once per run.
+Optionally persisted to JSON (PRICE_STORE_PATH) so later runs only fetch the new tail.
+"""
+
+import json
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+
+FIELDS = ("close", "open", "high", "low")
+
+
+def _shift(date_str: str, days: int) -> str:
+    return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+class PriceStore:
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path else None
+        self._dates: dict[str, list[str]] = {}
+        self._cols: dict[str, dict[str, array]] = {}
+        self._coverage: dict[str, tuple[str, str]] = {}
+        self._used_yahoo: dict[str, bool] = {}
+        self.lock = threading.RLock()
+        self._fetched = threading.Condition(self.lock)
+        self._in_flight: set[str] = set()
+        self.network_fetches = 0
+
+    def gaps(self, ticker: str, from_date: str, to_date: str) -> list[tuple[str, str]]:
+        """
+        Ranges to fetch so ticker's coverage includes [from_date, to_date]: at most one before
+        and one after what is already covered. Gaps extend to the covered edge so coverage
+        stays contiguous.
+        """
+        covered = self._coverage.get(ticker)
+        if covered is None:
+            return [(from_date, to_date)]
+        lo, hi = covered
+        out = []
+        if from_date < lo:
+            out.append((from_date, _shift(lo, -1)))
+        if to_date > hi:
+            out.append((_shift(hi, 1), to_date))
+        return out
+
+    def claim(self, tickers: list[str], from_date: str, to_date: str) -> dict[tuple[str, str], list[str]]:
+        """
+        Reserve the uncovered ranges of tickers for this caller to fetch, without holding the
+        lock over the network. Waits while another caller is fetching any of these tickers,
+        then returns {gap: [tickers]}; every ticker in it must be passed to release().
+        """
+        with self._fetched:
+            self._fetched.wait_for(lambda: not self._in_flight.intersection(tickers))
+            by_gap = {}
+            for t in tickers:
+                for gap in self.gaps(t, from_date, to_date) if from_date <= to_date else []:
+                    by_gap.setdefault(gap, []).append(t)
+            self._in_flight.update(t for gap_tickers in by_gap.values() for t in gap_tickers)
+            return by_gap
+
+    def release(self, tickers: list[str]) -> None:
+        """End a claim(); callers waiting on these tickers then read (or refetch) their ranges."""
+        with self._fetched:
+            self._in_flight.difference_update(tickers)
+            self._fetched.notify_all()
+
+    def add(self, ticker: str, rows: list[dict] | None, from_date: str, to_date: str, used_yahoo: bool = False) -> None:
+        """
+        Merge FMP-shaped rows for a fetched range; newer values win on overlapping dates.
+        Coverage grows from from_date to the last bar returned: a failed or empty fetch, and
+        the tail after the last bar (today before the close, a holiday), are asked for again.
+        """
+        fetched = [r for r in rows or [] if r.get("close") is not None and r.get("date", "")[:10] <= to_date]
+        if not fetched:
+            return
+        merged = {}
+        dates = self._dates.get(ticker, [])
+        cols = self._cols.get(ticker)
+        for i, d in enumerate(dates):
+            merged[d] = tuple(cols[f][i] for f in FIELDS)
+        for r in fetched:
+            close = float(r["close"])
+            merged[r.get("date", "")[:10]] = (
+                close,
+                float(r.get("open") if r.get("open") is not None else close),
+                float(r.get("high") if r.get("high") is not None else close),
+                float(r.get("low") if r.get("low") is not None else close),
+            )
+        new_dates = sorted(merged)
+        self._dates[ticker] = new_dates
+        self._cols[ticker] = {f: array("d", (merged[d][i] for d in new_dates)) for i, f in enumerate(FIELDS)}
+        last = max(r["date"][:10] for r in fetched)
+        lo, hi = self._coverage.get(ticker, (from_date, last))
+        self._coverage[ticker] = (min(lo, from_date), max(hi, last))
+        self._used_yahoo[ticker] = used_yahoo
+
+    def rows(self, ticker: str, from_date: str, to_date: str) -> list[dict]:
+        """Bars in [from_date, to_date] as FMP-shaped dicts, newest first."""
+        dates = self._dates.get(ticker)
+        if not dates:
+            return []
+        cols = self._cols[ticker]
+        start = bisect_left(dates, from_date)
+        end = bisect_right(dates, to_date)
+        return [
+            {"date": dates[i], "open": cols["open"][i], "high": cols["high"][i], "low": cols["low"][i], "close": cols["close"][i]}
+            for i in range(end - 1, start - 1, -1)
+        ]
+
+    def used_yahoo(self, ticker: str) -> bool:
+        return self._used_yahoo.get(ticker, False)
+
+    def load(self) -> None:
+        """
+        Load a persisted store. Coverage is clamped to end before today so the latest
+        (possibly intraday) bar is always refetched.
+        """
+        if not self.path or not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text())
+        except (json.JSONDecodeError, OSError):
+            return
+        yesterday = _shift(datetime.now().strftime("%Y-%m-%d"), -1)
+        for ticker, entry in raw.get("tickers", {}).items():
+            self._dates[ticker] = list(entry["dates"])
+            self._cols[ticker] = {f: array("d", entry[f]) for f in FIELDS}
+            lo, hi = entry["coverage"]
+            if lo <= yesterday:
+                self._coverage[ticker] = (lo, min(hi, yesterday))
+            self._used_yahoo[ticker] = entry.get("used_yahoo", False)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        out = {"saved_at": datetime.now().isoformat(), "tickers": {}}
+        for ticker, dates in self._dates.items():
+            if not dates or ticker not in self._coverage:
+                continue
+            entry = {"dates": dates, "coverage": list(self._coverage[ticker]), "used_yahoo": self.used_yahoo(ticker)}
+            entry.update({f: self._cols[ticker][f].tolist() for f in FIELDS})
+            out["tickers"][ticker] = entry
+        self.path.write_text(json.dumps(out, separators=(",", ":")))
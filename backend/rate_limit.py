@@ -0,0 +1,102 @@
+"""
+Per-provider rate limiting and retry backoff shared by all fetchers.
+
+Each provider gets a token bucket refilled at its plan's requests/minute, so a run goes as
+fast as the quota allows and only waits when the bucket is empty. A 429's Retry-After pauses
+the whole provider, not just the caller. Retries use exponential backoff with full jitter.
+
+Rates (requests/minute) come from env: FMP_RATE_PER_MIN, YAHOO_RATE_PER_MIN,
+NEWSAPI_RATE_PER_MIN, DDG_RATE_PER_MIN.
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from run_metrics import get_metrics
+
+DEFAULT_RATES_PER_MIN = {
+    "fmp": 300,      # FMP Starter plan
+    "yahoo": 120,    # unofficial; yfinance gets blocked when hammered
+    "newsapi": 60,   # free tier is 100/day; per-minute cap just spreads requests out
+    "ddg": 30,       # DuckDuckGo scraping
+}
+RETRY_BASE_SEC = 1.0
+RETRY_MAX_SEC = 30.0
+
+
+class TokenBucket:
+    def __init__(self, rate_per_min: float, burst: int = None, clock=time.monotonic, sleep=time.sleep,
+                 name: str = None):
+        self.name = name  # provider; waits are reported as rate_limit_wait_sec.<name>
+        self.rate = max(rate_per_min, 1e-6) / 60.0  # tokens per second
+        # Default burst: ~10 seconds of quota
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_min // 6)))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping only as long as needed. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now >= self._paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    if waited and self.name:
+                        get_metrics().add(f"rate_limit_wait_sec.{self.name}", waited)
+                    return waited
+                delay = max(self._paused_until - now, (1 - self.tokens) / self.rate)
+            self._sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for seconds (e.g. a 429's Retry-After) and drain the bucket."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self.tokens = 0.0
+
+
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> TokenBucket:
+    """Process-wide bucket for provider, configured from <PROVIDER>_RATE_PER_MIN."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            default = DEFAULT_RATES_PER_MIN.get(provider, 60)
+            rate = float(os.getenv(f"{provider.upper()}_RATE_PER_MIN", default))
+            _limiters[provider] = TokenBucket(rate, name=provider)
+        return _limiters[provider]
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_SEC, cap: float = RETRY_MAX_SEC) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(response) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None if absent."""
+    value = (getattr(response, "headers", None) or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
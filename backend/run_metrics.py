@@ -0,0 +1,170 @@
+"""
+Run metrics: per-call provider accounting and a machine-readable run report.
+
+Provider calls (FMP, Yahoo, NewsAPI, DDG) are recorded with latency, status, response
+bytes, retries and cache hits; counters track fallbacks and time spent sleeping on retries
+and rate limits; stages record where the wall time went. At the end of a run the entry
+point writes everything, with p50/p95 latency per provider, to data/reports/run_report.json
+(override with RUN_REPORT_PATH). The CI refresh commits it with the data, so quota burn and
+latency regressions show up in git history.
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+REPORT_PATH = Path(os.getenv("RUN_REPORT_PATH") or Path(__file__).parent.parent / "data" / "reports" / "run_report.json")
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of values (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class RunMetrics:
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = datetime.now().isoformat()
+            self._start = self._clock()
+            self.calls: list[dict] = []
+            self.counters: dict[str, float] = {}
+            self.stages: dict[str, dict] = {}
+
+    def record(self, provider: str, operation: str, seconds: float, status="ok",
+               nbytes: int = 0, cache_hit: bool = False, retries: int = 0) -> None:
+        call = {"provider": provider, "operation": operation, "seconds": seconds, "status": str(status),
+                "bytes": nbytes, "cache_hit": cache_hit, "retries": retries}
+        with self._lock:
+            self.calls.append(call)
+
+    @contextmanager
+    def timed(self, provider: str, operation: str):
+        """
+        Time one provider call. Yields a dict the caller may update with status, bytes,
+        cache_hit and retries; an exception records status "error" and is re-raised.
+        """
+        call = {"status": "ok", "bytes": 0, "cache_hit": False, "retries": 0}
+        start = self._clock()
+        try:
+            yield call
+        except BaseException:
+            if call["status"] == "ok":
+                call["status"] = "error"
+            raise
+        finally:
+            self.record(provider, operation, self._clock() - start, call["status"],
+                        call["bytes"], call["cache_hit"], call["retries"])
+
+    def add(self, counter: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    @contextmanager
+    def stage(self, name: str):
+        start = self._clock()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            with self._lock:
+                self.stages[name] = {"seconds": round(self._clock() - start, 3), "status": status}
+
+    def set_stage(self, name: str, seconds: float, status: str) -> None:
+        """Record a stage timed elsewhere (e.g. on another thread)."""
+        with self._lock:
+            self.stages[name] = {"seconds": round(seconds, 3), "status": status}
+
+    def providers(self) -> dict:
+        """Per-provider call accounting with p50/p95 latency of network calls (cache hits excluded)."""
+        with self._lock:
+            calls = list(self.calls)
+        out = {}
+        for provider in sorted({c["provider"] for c in calls}):
+            mine = [c for c in calls if c["provider"] == provider]
+            network_ms = [c["seconds"] * 1000 for c in mine if not c["cache_hit"]]
+            status, operations = {}, {}
+            for c in mine:
+                status[c["status"]] = status.get(c["status"], 0) + 1
+                operations[c["operation"]] = operations.get(c["operation"], 0) + 1
+            out[provider] = {
+                "calls": len(mine),
+                "network_calls": len(network_ms),
+                "cache_hits": len(mine) - len(network_ms),
+                "errors": sum(1 for c in mine if _is_error(c["status"])),
+                "retries": sum(c["retries"] for c in mine),
+                "bytes": sum(c["bytes"] for c in mine),
+                "status": status,
+                "operations": operations,
+                "latency_ms": {
+                    "p50": _round(_percentile(network_ms, 50)),
+                    "p95": _round(_percentile(network_ms, 95)),
+                    "max": _round(max(network_ms, default=None)),
+                    "total": _round(sum(network_ms)),
+                },
+            }
+        return out
+
+    def report(self, entry_point: str = None) -> dict:
+        with self._lock:
+            counters = {k: _round(v) for k, v in sorted(self.counters.items())}
+            stages = dict(self.stages)
+        return {
+            "entry_point": entry_point or " ".join([Path(sys.argv[0]).name] + sys.argv[1:]),
+            "started_at": self.started_at,
+            "finished_at": datetime.now().isoformat(),
+            "wall_sec": round(self._clock() - self._start, 3),
+            "stages": stages,
+            "providers": self.providers(),
+            "counters": counters,
+        }
+
+    def write(self, path: Path = None, entry_point: str = None) -> Path:
+        path = Path(path or REPORT_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.report(entry_point), indent=2))
+        tmp.replace(path)
+        return path
+
+
+def _is_error(status: str) -> bool:
+    """Statuses are "ok", "cache", "empty", "error" or an HTTP status code."""
+    return status == "error" or (status.isdigit() and int(status) >= 400)
+
+
+def _round(value):
+    return round(value, 2) if isinstance(value, float) else value
+
+
+_metrics = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    """Process-wide metrics for the current run."""
+    return _metrics
+
+
+def write_report(entry_point: str = None) -> None:
+    """Write the run report and print where it went (never fails the run)."""
+    try:
+        path = _metrics.write(entry_point=entry_point)
+        print(f"📊 Run report: {path}")
+    except OSError as e:
+        print(f"⚠ Could not write run report: {e}")
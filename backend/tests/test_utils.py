@@ -122,3 +122,1165 @@ class TestDataFileFormats:
             union = ticker_sets[0].union(ticker_sets[1])
             overlap = len(common) / len(union) if union else 1
             assert overlap >= 0.8, f"Ticker overlap between daily files is only {overlap:.0%}"
+
+
+class TestConcurrentQuotes:
+    """Test the bounded-pool quote engine in fetch_prices."""
+
+    def _fake_quote(self, ticker):
+        return {"symbol": ticker, "price": 100.0, "previousClose": 99.0, "change": 1.0, "changePercentage": 1.0101}
+
+    def test_snapshot_identical_to_serial_run(self, tmp_path, monkeypatch):
+        """Concurrent and single-worker runs should write the same snapshot (ignoring fetched_at)."""
+        import fetch_prices
+
+        monkeypatch.setattr(fetch_prices, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fetch_prices, "_get_fetcher", lambda: None)
+        monkeypatch.setattr(fetch_prices, "_price_store", None)
+        monkeypatch.setattr(fetch_prices, "RETRY_DELAY_SEC", 0)
+        monkeypatch.setattr(fetch_prices, "yf_get_quote", self._fake_quote)
+        monkeypatch.setattr(fetch_prices, "yf_get_quotes", lambda tickers: {})
+        monkeypatch.setattr(fetch_prices, "yf_get_historical_eod", lambda *a: [])
+        monkeypatch.setattr(fetch_prices, "_patch_missing_tickers_in_daily", lambda *a: None)
+
+        snapshots = []
+        for workers, date_str in ((1, "2026-03-02"), (8, "2026-03-03")):
+            monkeypatch.setattr(fetch_prices, "FETCH_WORKERS", workers)
+            snap = fetch_prices.fetch_daily_snapshot(date_str)
+            snap.pop("fetched_at")
+            snap.pop("date")
+            snapshots.append(json.dumps(snap))
+        assert snapshots[0] == snapshots[1]
+
+    def test_slow_ticker_does_not_block_others(self, monkeypatch):
+        """Quotes are fetched in parallel and returned in ticker order."""
+        import threading
+        import fetch_prices
+
+        started = threading.Barrier(3, timeout=5)
+
+        def slow_quote(ticker):
+            started.wait()  # deadlocks unless three tickers are in flight at once
+            return self._fake_quote(ticker)
+
+        monkeypatch.setattr(fetch_prices, "FETCH_WORKERS", 3)
+        monkeypatch.setattr(fetch_prices, "_provider_slots", {"fmp": threading.BoundedSemaphore(3), "yahoo": threading.BoundedSemaphore(3)})
+        monkeypatch.setattr(fetch_prices, "yf_get_quote", slow_quote)
+        monkeypatch.setattr(fetch_prices, "yf_get_quotes", lambda tickers: {})
+        quotes = fetch_prices._fetch_quotes(["HUBS", "CRM", "ADP"], None)
+        assert [q["symbol"] for q in quotes] == ["HUBS", "CRM", "ADP"]
+
+
+class TestBatchQuotes:
+    """Test the batch-quote pipeline and 402 downgrade."""
+
+    def _quote(self, ticker):
+        return {"symbol": ticker, "price": 10.0, "previousClose": 9.5, "change": 0.5, "changePercentage": 5.26}
+
+    def test_single_batch_request_for_fmp_tickers(self, monkeypatch):
+        """FMP-routed tickers come from one batch call; misses share one Yahoo download."""
+        import fetch_prices
+
+        fetcher = MagicMock()
+        fetcher.batch_quote_supported = True
+        fetcher.get_batch_quote.return_value = [self._quote("HUBS"), self._quote("CRM")]
+        yahoo_calls = []
+        monkeypatch.setattr(fetch_prices, "yf_get_quotes", lambda ts: yahoo_calls.append(ts) or {t: self._quote(t) for t in ts})
+        monkeypatch.setattr(fetch_prices, "yf_get_quote", MagicMock(side_effect=AssertionError("per-ticker Yahoo call")))
+
+        quotes = fetch_prices._fetch_quotes(["HUBS", "CRM", "ADP", "XRO.AX"], fetcher)
+
+        fetcher.get_batch_quote.assert_called_once_with(["HUBS", "CRM", "ADP"], False)
+        fetcher.get_quote.assert_not_called()
+        assert yahoo_calls == [["ADP", "XRO.AX"]]
+        assert [q["symbol"] for q in quotes] == ["HUBS", "CRM", "ADP", "XRO.AX"]
+
+    def test_402_downgrades_to_per_ticker(self):
+        """A 402 on batch-quote disables batch for the fetcher and returns no quotes."""
+        import requests
+
+        fetcher = FMPFetcher(api_key="test-key")
+        response = MagicMock(status_code=402)
+        error = requests.exceptions.HTTPError(response=response)
+        with patch.object(fetcher, "_fetch_json", side_effect=error) as fetch_json:
+            assert fetcher.get_batch_quote(["HUBS", "CRM"], fallback_to_single=False) == []
+            assert fetcher.batch_quote_supported is False
+            fetcher.get_batch_quote(["HUBS"], fallback_to_single=False)
+        fetch_json.assert_called_once()
+
+
+class TestYahooBatch:
+    """Test splitting multi-symbol yfinance downloads back into per-ticker FMP shapes."""
+
+    def _frame(self):
+        import pandas as pd
+
+        idx = pd.to_datetime(["2026-02-02", "2026-02-03", "2026-02-04"])
+        cols = pd.MultiIndex.from_product([["Close", "High", "Low", "Open"], ["CRM", "XRO.AX"]], names=["Price", "Ticker"])
+        values = [
+            [200.0, 100.0, 201.0, 101.0, 199.0, 99.0, 200.0, 100.0],
+            [190.0, float("nan"), 191.0, float("nan"), 189.0, float("nan"), 190.0, float("nan")],
+            [180.0, 90.0, 181.0, 91.0, 179.0, 89.0, 180.0, 90.0],
+        ]
+        return pd.DataFrame(values, index=idx, columns=cols)
+
+    def test_get_quotes_splits_by_ticker(self):
+        """Quotes use each ticker's last two non-NaN closes."""
+        import yf_fallback
+
+        with patch.object(yf_fallback.load_yfinance(), "download", return_value=self._frame()) as download:
+            quotes = yf_fallback.get_quotes(["CRM", "XRO.AX"])
+        download.assert_called_once()
+        assert quotes["CRM"]["price"] == 180.0 and quotes["CRM"]["previousClose"] == 190.0
+        assert quotes["XRO.AX"]["price"] == 90.0 and quotes["XRO.AX"]["previousClose"] == 100.0
+
+    def test_get_historical_eod_batch_drops_other_markets_days(self):
+        """Per-ticker rows are newest first and skip rows where that ticker did not trade."""
+        import yf_fallback
+
+        with patch.object(yf_fallback.load_yfinance(), "download", return_value=self._frame()):
+            rows = yf_fallback.get_historical_eod_batch(["CRM", "XRO.AX", "MISSING"], "2026-02-01", "2026-02-05")
+        assert [r["date"] for r in rows["CRM"]] == ["2026-02-04", "2026-02-03", "2026-02-02"]
+        assert [r["date"] for r in rows["XRO.AX"]] == ["2026-02-04", "2026-02-02"]
+        assert rows["XRO.AX"][0] == {"date": "2026-02-04", "open": 90.0, "high": 91.0, "low": 89.0, "close": 90.0}
+        assert "MISSING" not in rows
+
+    def test_frame_to_rows_flat_columns(self):
+        """Columnar conversion handles flat columns and fills missing OHL from close."""
+        import pandas as pd
+        import yf_fallback
+
+        frame = pd.DataFrame(
+            {"Close": [10.0, float("nan"), 12.0], "High": [11.0, 12.0, float("nan")]},
+            index=pd.to_datetime(["2026-02-02", "2026-02-03", "2026-02-04"]),
+        )
+        assert yf_fallback._frame_to_rows(frame) == [
+            {"date": "2026-02-04", "open": 12.0, "high": 12.0, "low": 12.0, "close": 12.0},
+            {"date": "2026-02-02", "open": 10.0, "high": 11.0, "low": 10.0, "close": 10.0},
+        ]
+
+
+class TestPriceStore:
+    """Test the shared columnar history store."""
+
+    def _rows(self, dates):
+        return [{"date": d, "open": 1.0, "high": 2.0, "low": 0.5, "close": float(i + 1)} for i, d in enumerate(dates)]
+
+    def test_gaps_and_rows(self):
+        """Only uncovered edges are reported as gaps; rows come back newest first."""
+        from price_store import PriceStore
+
+        store = PriceStore()
+        assert store.gaps("CRM", "2026-02-01", "2026-02-10") == [("2026-02-01", "2026-02-10")]
+        store.add("CRM", self._rows(["2026-02-02", "2026-02-03", "2026-02-04"]), "2026-02-01", "2026-02-10")
+        assert store.gaps("CRM", "2026-02-03", "2026-02-04") == []
+        # Coverage ends at the last bar returned, so the empty tail is asked for again
+        assert store.gaps("CRM", "2026-01-20", "2026-02-12") == [("2026-01-20", "2026-01-31"), ("2026-02-05", "2026-02-12")]
+        assert [r["date"] for r in store.rows("CRM", "2026-02-03", "2026-02-09")] == ["2026-02-04", "2026-02-03"]
+
+    def test_persisted_store_round_trip(self, tmp_path):
+        """A saved store reloads its bars and coverage."""
+        from price_store import PriceStore
+
+        store = PriceStore(tmp_path / "store.json")
+        store.add("CRM", self._rows(["2026-02-02", "2026-02-03"]), "2026-02-01", "2026-02-05", used_yahoo=True)
+        store.save()
+        loaded = PriceStore(tmp_path / "store.json")
+        loaded.load()
+        assert loaded.rows("CRM", "2026-02-01", "2026-02-05") == store.rows("CRM", "2026-02-01", "2026-02-05")
+        assert loaded.used_yahoo("CRM") is True
+        assert loaded.gaps("CRM", "2026-02-01", "2026-02-05") == [("2026-02-04", "2026-02-05")]
+
+    def test_each_range_fetched_once_per_run(self, monkeypatch):
+        """Passes reading overlapping ranges hit the network once per ticker."""
+        import fetch_prices
+
+        calls = []
+
+        def fake_many(tickers, from_date, to_date, fetcher):
+            calls.append((tuple(tickers), from_date, to_date))
+            return {t: (self._rows(["2026-01-30", "2026-02-02", "2026-02-03", "2026-02-20"]), False) for t in tickers}
+
+        monkeypatch.setattr(fetch_prices, "_price_store", None)
+        monkeypatch.setattr(fetch_prices, "_fetch_historical_many", fake_many)
+        fetch_prices._load_history(["CRM", "ADP"], "2026-01-27", "2026-02-20", None)
+        baseline = fetch_prices._load_history(["CRM", "ADP"], "2026-02-03", "2026-02-08", None)
+        fetch_prices._load_history(["CRM"], "2026-01-29", "2026-02-20", None)
+        assert calls == [(("CRM", "ADP"), "2026-01-27", "2026-02-20")]
+        assert baseline["CRM"][0][0]["date"] == "2026-02-03"
+
+    def test_network_fetches_run_outside_the_store_lock(self, monkeypatch):
+        """Callers for different tickers fetch concurrently; later callers reuse what they fetched."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        import fetch_prices
+
+        both_fetching = threading.Barrier(2, timeout=5)
+        calls = []
+
+        def fake_many(tickers, from_date, to_date, fetcher):
+            calls.append(tuple(tickers))
+            both_fetching.wait()  # times out if the first fetch holds the store lock
+            return {t: (self._rows(["2026-02-02", "2026-02-03"]), False) for t in tickers}
+
+        monkeypatch.setattr(fetch_prices, "_price_store", None)
+        monkeypatch.setattr(fetch_prices, "_fetch_historical_many", fake_many)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            jobs = [pool.submit(fetch_prices._load_history, [t], "2026-02-01", "2026-02-03", None) for t in ("CRM", "ADP")]
+            results = [job.result() for job in jobs]
+            again = pool.submit(fetch_prices._load_history, ["CRM"], "2026-02-01", "2026-02-03", None).result()
+        assert sorted(calls) == [("ADP",), ("CRM",)]
+        assert results[0]["CRM"] == again["CRM"]
+
+    def test_failed_or_empty_fetch_is_not_covered(self, tmp_path, monkeypatch):
+        """Tickers a fetch returned nothing for are retried, in this run and the next."""
+        import fetch_prices
+        from price_store import PriceStore
+
+        calls = []
+
+        def fake_many(tickers, from_date, to_date, fetcher):
+            calls.append(tuple(tickers))
+            return {"CRM": (self._rows(["2026-02-02", "2026-02-03"]), False)}
+
+        monkeypatch.setattr(fetch_prices, "PRICE_STORE_PATH", tmp_path / "store.json")
+        monkeypatch.setattr(fetch_prices, "_price_store", None)
+        monkeypatch.setattr(fetch_prices, "_fetch_historical_many", fake_many)
+        fetch_prices._load_history(["CRM", "ADP"], "2026-02-01", "2026-02-03", None)
+        fetch_prices._load_history(["CRM", "ADP"], "2026-02-01", "2026-02-03", None)
+        assert calls == [("CRM", "ADP"), ("ADP",)]
+        fetch_prices._get_price_store().save()
+        loaded = PriceStore(tmp_path / "store.json")
+        loaded.load()
+        assert loaded.gaps("CRM", "2026-02-01", "2026-02-03") == []
+        assert loaded.gaps("ADP", "2026-02-01", "2026-02-03") == [("2026-02-01", "2026-02-03")]
+
+    def test_today_yahoo_lookup_includes_todays_bar(self, monkeypatch):
+        """yfinance's end is exclusive: a lookup ending today still gets today's bar."""
+        from datetime import datetime, timedelta
+        import fetch_prices
+
+        today = datetime.now()
+        days = [(today - timedelta(days=n)).strftime("%Y-%m-%d") for n in (1, 0)]
+
+        def fake_batch(tickers, start, end):
+            return {t: self._rows([d for d in days if start <= d < end])[::-1] for t in tickers}
+
+        monkeypatch.setattr(fetch_prices, "_price_store", None)
+        monkeypatch.setattr(fetch_prices, "yf_get_historical_eod_batch", fake_batch)
+        history = fetch_prices._load_history(["XRO.AX"], days[0], days[1], None)
+        assert history["XRO.AX"][0][0]["date"] == days[1]
+
+
+class TestResponseCache:
+    """Test the opt-in FMP response cache."""
+
+    def test_key_excludes_api_key(self):
+        """Cache keys ignore credentials and param order."""
+        from http_cache import cache_key
+
+        assert cache_key("quote", {"symbol": "CRM", "apikey": "secret"}) == cache_key("quote", {"symbol": "CRM"})
+        assert cache_key("q", {"b": 1, "a": 2}) == "q?a=2&b=1"
+
+    def test_ttl_expiry_and_lru_eviction(self, tmp_path, monkeypatch):
+        """Expired entries miss; the least recently used entry is evicted over the size cap."""
+        import http_cache
+
+        clock = [1000.0]
+        monkeypatch.setattr(http_cache.time, "time", lambda: clock[0])
+        cache = http_cache.ResponseCache(tmp_path / "c.sqlite", max_bytes=25)
+        cache.put("a", ["x" * 5], ttl=10)
+        cache.put("b", ["y" * 5], ttl=100)
+        clock[0] += 1
+        assert cache.get("b") == ["yyyyy"]
+        cache.put("c", ["z" * 5], ttl=100)  # over 25 bytes: evicts "a" (least recently used)
+        assert cache.get("a") is None
+        assert cache.get("b") == ["yyyyy"]
+        clock[0] += 200
+        assert cache.get("c") is None
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_fetcher_serves_repeat_history_from_cache(self, tmp_path):
+        """A past-date history request goes over the network once."""
+        from http_cache import ResponseCache
+
+        session = MagicMock()
+        session.get.return_value.json.return_value = [{"date": "2026-02-03", "close": 10.0}]
+        fetcher = FMPFetcher(api_key="test-key", cache=ResponseCache(tmp_path / "c.sqlite"), session=session)
+        first = fetcher.get_historical_eod("CRM", "2026-01-01", "2026-02-03")
+        second = fetcher.get_historical_eod("CRM", "2026-01-01", "2026-02-03")
+        session.get.assert_called_once()
+        assert first == second
+        assert fetcher.cache.summary().startswith("1 hit(s), 1 miss(es)")
+
+    def test_empty_history_is_not_cached(self, tmp_path):
+        """A transient empty answer for a past range is asked for again."""
+        from http_cache import ResponseCache
+
+        session = MagicMock()
+        session.get.return_value.json.return_value = []
+        fetcher = FMPFetcher(api_key="test-key", cache=ResponseCache(tmp_path / "c.sqlite"), session=session)
+        fetcher.get_historical_eod("CRM", "2026-01-01", "2026-02-03")
+        fetcher.get_historical_eod("CRM", "2026-01-01", "2026-02-03")
+        assert session.get.call_count == 2
+
+
+class TestIncrementalBackfill:
+    """Test that incremental backfill only requests the missing tail."""
+
+    def _snapshot(self, date_str, tickers):
+        rows = {t: {"name": t, "sector": "crm", "close": 10.0, "prev_close": 10.0, "daily_pct": 0.0} for t in tickers}
+        return {"date": date_str, "tickers": rows, "sectors": {}}
+
+    def test_requests_only_gap_after_last_stored_date(self, tmp_path, monkeypatch):
+        import fetch_prices
+
+        monkeypatch.setattr(fetch_prices, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fetch_prices, "TICKERS", {"CRM": {"name": "Salesforce", "sector": "crm"}, "ADP": {"name": "ADP", "sector": "payroll"}})
+        monkeypatch.setattr(fetch_prices, "SECTORS", {})
+        monkeypatch.setattr(fetch_prices, "_get_fetcher", lambda: None)
+        (tmp_path / "2026-02-03.json").write_text(json.dumps(self._snapshot("2026-02-03", ["CRM", "ADP"])))
+        (tmp_path / "2026-02-04.json").write_text(json.dumps(self._snapshot("2026-02-04", ["CRM"])))
+
+        requests_seen = []
+
+        def fake_history(tickers, from_date, to_date, fetcher):
+            requests_seen.append((tuple(tickers), from_date))
+            rows = [{"date": d, "close": 11.0} for d in ("2026-02-04", "2026-02-05")]
+            return {t: (rows, False) for t in tickers}
+
+        monkeypatch.setattr(fetch_prices, "_load_history", fake_history)
+        fetch_prices.backfill(incremental=True)
+
+        assert requests_seen[:2] == [(("ADP",), "2026-01-29"), (("CRM",), "2026-01-30")]
+        # The patch pass then loads only ADP, the one ticker missing from a stored file
+        assert requests_seen[2:] == [(("ADP",), "2026-01-27")]
+        assert json.loads((tmp_path / "2026-02-05.json").read_text())["tickers"].keys() == {"CRM", "ADP"}
+
+
+class TestDifferentialRefresh:
+    """Test that refresh only touches stale, incomplete or missing files."""
+
+    TICKERS = {"CRM": {"name": "Salesforce", "sector": "crm"}, "ADP": {"name": "ADP", "sector": "payroll"}}
+
+    def _daily(self, date_str, tickers, close=10.0):
+        rows = {t: {"name": t, "sector": "crm", "close": close, "prev_close": close, "daily_pct": 0.0} for t in tickers}
+        return json.dumps({"date": date_str, "tickers": rows, "sectors": {}}, indent=2)
+
+    def test_refresh_leaves_finalized_files_alone(self, tmp_path, monkeypatch):
+        import hashlib
+        import fetch_prices
+
+        monkeypatch.setattr(fetch_prices, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fetch_prices, "TICKERS", self.TICKERS)
+        monkeypatch.setattr(fetch_prices, "SECTORS", {})
+        monkeypatch.setattr(fetch_prices, "_get_fetcher", lambda: None)
+        prices = {"CRM": {"price": 10.0}, "ADP": {"price": 10.0}}
+        (tmp_path / "baseline.json").write_text(json.dumps({"date": "2026-02-03", "tickers": prices}))
+        ltm = {t: {"high_price": 12.0, "ltm_high_pct": 20.0} for t in self.TICKERS}
+        (tmp_path / "ltm_high.json").write_text(json.dumps({"tickers": ltm, "sectors": {}}))
+        (tmp_path / "2026-02-03.json").write_text(self._daily("2026-02-03", ["CRM", "ADP"]))
+        (tmp_path / "2026-02-04.json").write_text(self._daily("2026-02-04", ["CRM", "ADP"]))
+        sha = {n: hashlib.sha256((tmp_path / n).read_bytes()).hexdigest() for n in ("2026-02-03.json", "2026-02-04.json")}
+        manifest = {n: {"sha256": h, "tickers": 2, "final": True} for n, h in sha.items()}
+        (tmp_path / "manifest.json").write_text(json.dumps({"files": manifest}))
+        (tmp_path / "2026-02-04.json").write_text(self._daily("2026-02-04", ["CRM", "ADP"], close=99.0))  # edited
+        (tmp_path / "2026-02-05.json").write_text(self._daily("2026-02-05", ["CRM"]))  # incomplete
+        untouched = (tmp_path / "2026-02-03.json").read_text()
+
+        def fake_history(tickers, from_date, to_date, fetcher):
+            rows = [{"date": d, "close": 11.0} for d in ("2026-02-06", "2026-02-05", "2026-02-04", "2026-02-03")]
+            return {t: ([r for r in rows if from_date <= r["date"] <= to_date], False) for t in tickers}
+
+        quotes = [{"symbol": t, "price": 11.0, "previousClose": 11.0} for t in self.TICKERS]
+        monkeypatch.setattr(fetch_prices, "_load_history", fake_history)
+        monkeypatch.setattr(fetch_prices, "_fetch_quotes", lambda *a, **k: quotes)
+
+        assert fetch_prices.refresh_data() is True
+        assert (tmp_path / "2026-02-03.json").read_text() == untouched
+        assert json.loads((tmp_path / "2026-02-04.json").read_text())["tickers"]["CRM"]["close"] == 11.0
+        assert set(json.loads((tmp_path / "2026-02-05.json").read_text())["tickers"]) == {"CRM", "ADP"}
+        assert (tmp_path / "2026-02-06.json").exists()
+        written = json.loads((tmp_path / "manifest.json").read_text())["files"]
+        assert written["2026-02-03.json"]["final"] is True
+
+
+class TestDailyIndex:
+    """Test that daily snapshots are parsed once and only changed files are rewritten."""
+
+    def test_parses_once_and_flushes_only_dirty(self, tmp_path, monkeypatch):
+        import daily_index
+        from daily_index import DailyIndex
+
+        for d in ("2026-02-03", "2026-02-04"):
+            (tmp_path / f"{d}.json").write_text(json.dumps({"date": d, "tickers": {"CRM": {"close": 1.0}}}))
+        (tmp_path / "2026-02-04-noon.json").write_text(json.dumps({"date": "2026-02-04", "tickers": {}}))
+        (tmp_path / "2026-02-05.json").write_text("{not json")
+
+        reads = []
+        real_loads = json.loads
+        monkeypatch.setattr(daily_index.json, "loads", lambda s: reads.append(1) or real_loads(s))
+        index = DailyIndex(tmp_path)
+        assert index.stems() == ["2026-02-03", "2026-02-04", "2026-02-04-noon"]
+        assert index.stems(dates_only=True) == ["2026-02-03", "2026-02-04"]
+        assert index.unreadable == {"2026-02-05"}
+        index.tickers("2026-02-03")
+        index.items()
+        assert len(reads) == 4
+
+        before = (tmp_path / "2026-02-03.json").read_text()
+        index.get("2026-02-04")["tickers"]["ADP"] = {"close": 2.0}
+        index.mark_dirty("2026-02-04")
+        assert index.flush() == 1
+        assert (tmp_path / "2026-02-03.json").read_text() == before
+        assert set(real_loads((tmp_path / "2026-02-04.json").read_text())["tickers"]) == {"CRM", "ADP"}
+        assert index.flush() == 0
+
+    def test_validate_prefers_close_over_intraday_of_same_day(self, tmp_path, monkeypatch):
+        """With D.json and D-noon.json both present, validation checks the close file."""
+        import fetch_prices
+
+        tickers = {"CRM": {"name": "Salesforce", "sector": "crm"}, "ADP": {"name": "ADP", "sector": "payroll"}}
+        monkeypatch.setattr(fetch_prices, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fetch_prices, "_daily_index", None)
+        monkeypatch.setattr(fetch_prices, "TICKERS", tickers)
+        full = {t: {"price": 1.0, "close": 1.0} for t in tickers}
+        for name in ("baseline.json", "ltm_high.json"):
+            (tmp_path / name).write_text(json.dumps({"tickers": full}))
+        (tmp_path / "2026-02-11.json").write_text(json.dumps({"date": "2026-02-11", "tickers": {"CRM": {}}}))
+        (tmp_path / "2026-02-12.json").write_text(json.dumps({"date": "2026-02-12", "tickers": full}))
+        (tmp_path / "2026-02-12-noon.json").write_text(json.dumps({"date": "2026-02-12", "tickers": {"CRM": {}}}))
+        assert fetch_prices.validate_data() is True
+
+        # A newer intraday file is still checked when its day has no close yet
+        (tmp_path / "2026-02-13-noon.json").write_text(json.dumps({"date": "2026-02-13", "tickers": {"CRM": {}}}))
+        monkeypatch.setattr(fetch_prices, "_daily_index", None)
+        assert fetch_prices.validate_data() is False
+
+
+class TestHistoryArtifact:
+    """Test that history.json tracks snapshot writes incrementally."""
+
+    def _snapshot(self, date_str, closes, time_label=None, fetched_at="2026-02-04T16:30:00"):
+        snap = {"date": date_str, "fetched_at": fetched_at, "tickers": {t: {"close": c, "prev_close": c, "daily_pct": 0.0} for t, c in closes.items()}}
+        if time_label:
+            snap["time_label"] = time_label
+        return snap
+
+    def test_writes_update_history(self, tmp_path):
+        from daily_index import DailyIndex
+        from history_artifact import HistoryArtifact
+
+        (tmp_path / "2026-02-03.json").write_text(json.dumps(self._snapshot("2026-02-03", {"CRM": 100.0})))
+        index = DailyIndex(tmp_path, HistoryArtifact(tmp_path / "history.json"))
+        index.write("2026-02-05", self._snapshot("2026-02-05", {"CRM": 102.0, "ADP": 50.0}))
+        history = json.loads((tmp_path / "history.json").read_text())
+        assert history["dates"] == ["2026-02-03", "2026-02-05"]  # seeded from existing files
+        assert history["tickers"] == ["CRM", "ADP"]
+        assert history["close"] == [[100.0, None], [102.0, 50.0]]
+
+        index.write("2026-02-04-noon", self._snapshot("2026-02-04", {"CRM": 101.0}, "noon"))
+        index.write("2026-02-04", self._snapshot("2026-02-04", {"CRM": 101.5, "ADP": 49.0}))
+        index.write("2026-02-04-11am", self._snapshot("2026-02-04", {"CRM": 99.0}, "11am"))  # close wins
+        history = json.loads((tmp_path / "history.json").read_text())
+        assert history["dates"] == ["2026-02-03", "2026-02-04", "2026-02-05"]
+        assert history["close"][1] == [101.5, 49.0]
+        assert history["time_labels"] == [None, None, None]
+        assert "date" not in history  # keeps it out of the frontend's per-day snapshot list
+
+    def test_backfill_saves_history_once(self, tmp_path, monkeypatch):
+        """Multi-day backfill writes every day but re-serializes history.json once."""
+        import fetch_prices
+        from history_artifact import HistoryArtifact
+
+        monkeypatch.setattr(fetch_prices, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fetch_prices, "_daily_index", None)
+        monkeypatch.setattr(fetch_prices, "TICKERS", {"CRM": {"name": "Salesforce", "sector": "crm"}})
+        monkeypatch.setattr(fetch_prices, "SECTORS", {})
+        monkeypatch.setattr(fetch_prices, "_get_fetcher", lambda: None)
+        dates = ["2026-02-02", "2026-02-03", "2026-02-04", "2026-02-05", "2026-02-06"]
+        rows = [{"date": d, "close": 10.0 + i} for i, d in enumerate(dates)]
+        monkeypatch.setattr(fetch_prices, "_load_history", lambda tickers, *a: {t: (rows, False) for t in tickers})
+        saves = []
+        real_save = HistoryArtifact.save
+        monkeypatch.setattr(HistoryArtifact, "save", lambda self: saves.append(1) or real_save(self))
+
+        fetch_prices.backfill()
+
+        assert len(saves) == 1
+        assert json.loads((tmp_path / "history.json").read_text())["dates"] == dates[1:]
+        assert sorted(p.stem for p in tmp_path.glob("2026-*.json")) == dates[1:]
+
+
+class TestHttpSession:
+    """Test that FMPFetcher reuses pooled keep-alive connections."""
+
+    def test_fetcher_reuses_connection_against_stub_server(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from http_session import make_session
+
+        connections, paths = [], []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                connections.append(self.client_address)
+
+            def do_GET(self):
+                paths.append(self.path)
+                body = json.dumps([{"symbol": "CRM", "price": 10.0}]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            fetcher = FMPFetcher(
+                api_key="test-key", session=make_session(2),
+                base_url=f"http://127.0.0.1:{server.server_address[1]}/stable",
+            )
+            fetcher.cache = None  # ignore any FMP_CACHE set in the environment
+            for _ in range(3):
+                assert fetcher.get_quote("CRM")["price"] == 10.0
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert len(paths) == 3 and paths[0].startswith("/stable/quote?")
+        assert len(connections) == 1
+
+    def test_timeout_per_host(self):
+        from http_session import DEFAULT_TIMEOUT, timeout_for
+
+        assert timeout_for("https://financialmodelingprep.com/stable/quote") == 30
+        assert timeout_for("https://newsapi.org/v2/everything") == 15
+        assert timeout_for("http://127.0.0.1:8000/x") == DEFAULT_TIMEOUT
+
+
+class TestRateLimit:
+    """Test the token bucket and 429 handling."""
+
+    def _bucket(self, rate_per_min, burst=None):
+        from rate_limit import TokenBucket
+
+        clock, sleeps = [0.0], []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        return TokenBucket(rate_per_min, burst=burst, clock=lambda: clock[0], sleep=sleep), sleeps
+
+    def test_bucket_only_waits_when_empty(self):
+        bucket, sleeps = self._bucket(60, burst=3)
+        for _ in range(3):
+            assert bucket.acquire() == 0.0
+        assert sleeps == []
+        assert bucket.acquire() == pytest.approx(1.0)  # 60/min refills one token per second
+        bucket.pause(5)
+        assert bucket.acquire() == pytest.approx(5.0)
+
+    def test_fetcher_honors_retry_after(self):
+        limited, ok = MagicMock(status_code=429, headers={"Retry-After": "7"}), MagicMock(status_code=200, headers={})
+        ok.json.return_value = [{"symbol": "CRM", "price": 10.0}]
+        session = MagicMock()
+        session.get.side_effect = [limited, ok]
+        limiter, sleeps = self._bucket(600)
+        fetcher = FMPFetcher(api_key="test-key", session=session, limiter=limiter)
+        fetcher.cache = None
+        assert fetcher.get_quote("CRM")["price"] == 10.0
+        assert session.get.call_count == 2
+        assert sleeps == [pytest.approx(7.0)]
+
+    def test_retry_after_http_date(self):
+        from email.utils import formatdate
+        import time as _time
+        from rate_limit import retry_after_seconds
+
+        assert retry_after_seconds(MagicMock(headers={"Retry-After": "3"})) == 3.0
+        assert retry_after_seconds(MagicMock(headers={})) is None
+        later = formatdate(_time.time() + 60, usegmt=True)
+        assert 55 <= retry_after_seconds(MagicMock(headers={"Retry-After": later})) <= 60
+
+
+class TestCircuitBreaker:
+    """Test that a failing provider is skipped after consecutive failures and probed later."""
+
+    def test_breaker_opens_and_half_opens(self):
+        from circuit_breaker import CircuitBreaker
+
+        clock = [0.0]
+        breaker = CircuitBreaker("FMP", threshold=2, cooldown=30, clock=lambda: clock[0])
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert not breaker.allow() and breaker.is_open()
+        clock[0] = 31
+        assert breaker.allow()  # single half-open probe
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.allow() and not breaker.is_open()
+
+    def test_fmp_outage_costs_threshold_calls(self, monkeypatch):
+        """With FMP raising, only `threshold` FMP calls are made; the rest go straight to Yahoo."""
+        import fetch_prices
+        from circuit_breaker import CircuitBreaker
+
+        fetcher = MagicMock()
+        fetcher.batch_quote_supported = False
+        fetcher.get_quote.side_effect = RuntimeError("FMP down")
+        monkeypatch.setattr(fetch_prices, "_breakers", {"fmp": CircuitBreaker("FMP", threshold=2), "yahoo": CircuitBreaker("Yahoo")})
+        monkeypatch.setattr(fetch_prices, "FETCH_WORKERS", 1)
+        monkeypatch.setattr(fetch_prices, "RETRY_DELAY_SEC", 0)
+        monkeypatch.setattr(fetch_prices, "yf_get_quotes", lambda tickers: {})
+        monkeypatch.setattr(fetch_prices, "yf_get_quote", lambda t: {"symbol": t, "price": 10.0, "previousClose": 9.0})
+
+        tickers = ["HUBS", "CRM", "ADP", "PAYX", "DOCU", "SHOP"]
+        quotes = fetch_prices._fetch_quotes(tickers, fetcher)
+
+        assert [q["symbol"] for q in quotes] == tickers
+        assert fetcher.get_quote.call_count == 2
+
+    def test_no_retries_when_every_provider_is_open(self, monkeypatch):
+        import fetch_prices
+        from circuit_breaker import CircuitBreaker
+
+        fmp, yahoo = CircuitBreaker("FMP", threshold=1), CircuitBreaker("Yahoo", threshold=1)
+        fmp.record_failure()
+        yahoo.record_failure()
+        monkeypatch.setattr(fetch_prices, "_breakers", {"fmp": fmp, "yahoo": yahoo})
+        monkeypatch.setattr(fetch_prices.time, "sleep", MagicMock(side_effect=AssertionError("retry sleep")))
+        assert fetch_prices._fetch_quote_with_fallback("CRM", MagicMock()) == (None, False)
+
+    def test_only_blocked_yahoo_calls_count_as_failures(self, monkeypatch):
+        """Empty Yahoo results (holidays, delisted symbols) keep the breaker closed; logged rate limits open it."""
+        import logging
+        import fetch_prices
+        from circuit_breaker import CircuitBreaker
+
+        yahoo = CircuitBreaker("Yahoo", threshold=2)
+        monkeypatch.setattr(fetch_prices, "_breakers", {"fmp": CircuitBreaker("FMP"), "yahoo": yahoo})
+        for _ in range(5):
+            assert fetch_prices._call_provider("yahoo", lambda: []) == []
+        assert not yahoo.is_open()
+
+        def rate_limited():
+            logging.getLogger("yfinance").error("['CRM']: YFRateLimitError('Too Many Requests. Rate limited.')")
+            return []
+
+        fetch_prices._call_provider("yahoo", rate_limited)
+        fetch_prices._call_provider("yahoo", rate_limited)
+        assert yahoo.is_open()
+
+
+class TestFundamentalsCache:
+    """Test the concurrent fundamentals fetch and its per-ticker .info cache."""
+
+    class _FakeTicker:
+        info_calls = []
+
+        def __init__(self, ticker, **kwargs):
+            self.ticker = ticker
+            # fast_info.market_cap is in quote units (e.g. pence): it must not be used
+            self.fast_info = MagicMock(market_cap=200_000.0, last_price=20.0)
+
+        @property
+        def info(self):
+            self.info_calls.append(self.ticker)
+            return {"enterpriseValue": 1_100.0, "marketCap": 1_000.0, "currentPrice": 10.0, "totalRevenue": 100.0,
+                    "revenueGrowth": 0.3, "ebitdaMargins": 0.2, "totalDebt": 200.0, "totalCash": 100.0}
+
+    def test_rerun_only_refreshes_price_fields(self, tmp_path, monkeypatch):
+        import fetch_fundamentals
+
+        self._FakeTicker.info_calls = []
+        monkeypatch.setattr(fetch_fundamentals, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fetch_fundamentals, "INFO_CACHE_PATH", tmp_path / "yf_info.json")
+        monkeypatch.setattr(fetch_fundamentals, "TICKERS", {"CRM": {"name": "Salesforce", "sector": "crm"}, "ADP": {"name": "ADP", "sector": "payroll"}})
+        monkeypatch.setattr(fetch_fundamentals.load_yfinance(), "Ticker", self._FakeTicker)
+
+        first = fetch_fundamentals.fetch_fundamentals(workers=2)
+        assert sorted(self._FakeTicker.info_calls) == ["ADP", "CRM"]
+        assert first["tickers"]["CRM"]["arr_multiple"] == 11.0
+        assert first["tickers"]["CRM"]["rule_of_40"] == 50.0
+
+        second = fetch_fundamentals.fetch_fundamentals(workers=2)
+        assert len(self._FakeTicker.info_calls) == 2  # no further .info calls
+        crm = second["tickers"]["CRM"]
+        assert crm["market_cap"] == 2_000.0
+        assert crm["enterprise_value"] == 2_100.0  # rescaled market cap + cached net debt
+        assert crm["arr_multiple"] == 21.0
+        assert crm["rule_of_40"] == 50.0
+        assert list(second["tickers"]) == ["CRM", "ADP"]
+
+        fetch_fundamentals.fetch_fundamentals(workers=1, refresh_cache=True)
+        assert len(self._FakeTicker.info_calls) == 4
+
+    def test_reprice_from_snapshot_is_offline(self, tmp_path, monkeypatch):
+        """Market cap, EV and ARR multiple follow the snapshot close; revenue stays as fetched."""
+        import fetch_fundamentals
+
+        monkeypatch.setattr(fetch_fundamentals.load_yfinance(), "Ticker", MagicMock(side_effect=AssertionError("network call")))
+        entry = {"current_price": 10.0, "market_cap": 1_000.0, "enterprise_value": 1_100.0, "ttm_revenue": 100.0,
+                 "arr_multiple": 11.0, "rule_of_40": 50.0, "inputs": {}}
+        (tmp_path / "fundamentals.json").write_text(json.dumps({"tickers": {"CRM": entry, "ADP": dict(entry)}}))
+        snapshot = {"date": "2026-02-05", "tickers": {"CRM": {"close": 12.0}}}
+
+        assert fetch_fundamentals.reprice_from_snapshot(snapshot, tmp_path) == 1
+        out = json.loads((tmp_path / "fundamentals.json").read_text())
+        crm = out["tickers"]["CRM"]
+        assert (crm["market_cap"], crm["enterprise_value"], crm["arr_multiple"]) == (1_200.0, 1_300.0, 13.0)
+        assert crm["rule_of_40"] == 50.0 and crm["price_date"] == "2026-02-05"
+        assert out["tickers"]["ADP"]["market_cap"] == 1_000.0  # not in the snapshot
+        assert out["price_date"] == "2026-02-05"
+
+
+class TestPrivateHealthSearch:
+    """Test the coalesced, concurrent NewsAPI search."""
+
+    def test_planner_dedupes_names_and_respects_query_limit(self):
+        import fetch_private_health as fph
+
+        plan = fph._plan_queries(["Zoho CRM", "Zoho Books", "Gusto", "SIIGO"], max_chars=115)
+        assert plan == [("en", ["Zoho", "Gusto"]), ("en", ["SIIGO"]), ("es", ["SIIGO"]), ("pt", ["SIIGO"])]
+        assert all(len(fph._build_query(names, lang)) <= 115 for lang, names in plan)
+        # Common-word names get a query of their own
+        assert fph._plan_queries(["Gusto", "Notion", "Zoho CRM"]) == [("en", ["Notion"]), ("en", ["Gusto", "Zoho"])]
+
+    def test_attribution_matches_whole_words(self):
+        import fetch_private_health as fph
+
+        assert fph._mentions({"title": "Buk raises Series C"}, "Buk")
+        assert not fph._mentions({"title": "Bukele signs new law"}, "Buk")
+        assert not fph._mentions({"description": "Investors dig deeper into payroll"}, "Deel")
+        assert fph._mentions({"content": "...customers of Deel, the HR platform"}, "Deel")
+
+    def test_queries_run_concurrently_and_attribute_articles(self, tmp_path, monkeypatch):
+        import threading
+        from datetime import date
+        import fetch_private_health as fph
+
+        today = date.today().isoformat()
+        started = threading.Barrier(3, timeout=5)  # en (Gusto+SIIGO), es and pt all in flight at once
+        calls = []
+
+        def fake_search(names, api_key, from_date, language="en"):
+            calls.append((language, tuple(names)))
+            started.wait()
+            return [
+                {"title": f"{name} raised funding ({language})", "url": f"https://x/{name}/{language}",
+                 "publishedAt": f"{today}T00:00:00Z", "source": {"name": "Src"}}
+                for name in names
+            ] + [{"title": "Unrelated startup raised funding", "url": "https://x/other", "source": {}}]
+
+        monkeypatch.setenv("NEWS_API_KEY", "k")
+        monkeypatch.setattr(fph, "PRIVATE_COMPANIES", ["Gusto", "SIIGO"])
+        monkeypatch.setattr(fph, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fph, "OUTPUT_FILE", tmp_path / "private_health.json")
+        monkeypatch.setattr(fph, "STORE_FILE", tmp_path / "stores" / "private_health.json")
+        monkeypatch.setattr(fph, "_top_headlines", lambda name, api_key: [])
+        monkeypatch.setattr(fph, "_search_news", fake_search)
+        monkeypatch.setattr(fph.sys, "argv", ["fetch_private_health.py"])
+
+        result = fph.fetch_private_health()
+
+        assert sorted(calls) == [("en", ("Gusto", "SIIGO")), ("es", ("SIIGO",)), ("pt", ("SIIGO",))]
+        assert list(result["companies"]) == ["Gusto", "SIIGO"]
+        assert [a["url"] for a in result["companies"]["Gusto"]] == ["https://x/Gusto/en"]
+        assert [a["url"] for a in result["companies"]["SIIGO"]] == ["https://x/SIIGO/en", "https://x/SIIGO/es", "https://x/SIIGO/pt"]
+        assert json.loads((tmp_path / "private_health.json").read_text())["companies"] == result["companies"]
+
+    def test_top_headlines_probe_and_per_name_budget(self, tmp_path, monkeypatch):
+        """A name the probe answers skips its English everything search; each name keeps 5 results per query."""
+        from datetime import date
+        import fetch_private_health as fph
+        from news_store import ArticleStore
+
+        today = date.today().isoformat()
+        calls = []
+
+        def article(name, n, lang):
+            return {"title": f"{name} raised funding {n}", "url": f"https://x/{name}/{lang}/{n}",
+                    "publishedAt": f"{today}T00:00:00Z", "source": {"name": "Src"}}
+
+        def fake_search(names, api_key, from_date, language="en"):
+            calls.append((language, tuple(names)))
+            return [article(name, n, language) for name in names for n in range(7)]
+
+        def fake_headlines(name, api_key):
+            return [article(name, "headline", "top")] if name == "Gusto" else []
+
+        monkeypatch.setenv("NEWS_API_KEY", "k")
+        monkeypatch.setattr(fph, "PRIVATE_COMPANIES", ["Gusto", "Deel"])
+        monkeypatch.setattr(fph, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fph, "OUTPUT_FILE", tmp_path / "private_health.json")
+        monkeypatch.setattr(fph, "STORE_FILE", tmp_path / "stores" / "private_health.json")
+        monkeypatch.setattr(fph, "_top_headlines", fake_headlines)
+        monkeypatch.setattr(fph, "_search_news", fake_search)
+        monkeypatch.setattr(fph.sys, "argv", ["fetch_private_health.py"])
+
+        fph.fetch_private_health()
+
+        assert calls == [("en", ("Deel",))]
+        store = ArticleStore(tmp_path / "stores" / "private_health.json", fph.WINDOW_DAYS)
+        assert [a["url"] for a in store.articles("Gusto")] == ["https://x/Gusto/top/headline"]
+        assert len(store.articles("Deel")) == 5
+
+
+class TestNewsStore:
+    """Test the incremental seen-URL article store used by the news fetchers."""
+
+    def test_dedupes_orders_and_prunes(self, tmp_path):
+        from datetime import datetime
+        from news_store import ArticleStore
+
+        now = datetime(2026, 3, 1, 12, 0)
+        store = ArticleStore(tmp_path / "s.json", window_days=15)
+        assert store.add("crm", {"url": "https://a", "date": "2026-02-25"}, now)
+        assert not store.add("crm", {"url": "https://a ", "date": "2026-02-25"}, now)  # same URL
+        assert store.add("crm", {"url": "https://b", "date": "2026-02-28"}, now)
+        assert store.add("crm", {"url": "https://old", "date": "2026-02-01"}, now)
+        assert [a["url"] for a in store.articles("crm")] == ["https://b", "https://a", "https://old"]
+
+        assert store.prune(now) == 1
+        store.save()
+        reloaded = ArticleStore(tmp_path / "s.json", window_days=15)
+        assert [a["url"] for a in reloaded.articles("crm")] == ["https://b", "https://a"]
+
+    def test_since_last_fetch_window(self, tmp_path):
+        from datetime import datetime, timedelta
+        from news_store import OVERLAP, ArticleStore
+
+        now = datetime(2026, 3, 1, 12, 0)
+        store = ArticleStore(tmp_path / "s.json", window_days=30)
+        assert store.since("Gusto", now) == now - timedelta(days=30)
+        assert not store.is_fresh("Gusto", timedelta(hours=12), now)
+
+        store.mark_fetched("Gusto", now - timedelta(days=3))
+        assert store.since("Gusto", now) == now - timedelta(days=3) - OVERLAP
+        assert not store.is_fresh("Gusto", timedelta(hours=12), now)
+        store.mark_fetched("Gusto", now - timedelta(hours=1))
+        assert store.is_fresh("Gusto", timedelta(hours=12), now)
+
+    def test_rerun_skips_fresh_companies_and_keeps_articles(self, tmp_path, monkeypatch):
+        from datetime import date
+        import fetch_private_health as fph
+
+        today = date.today().isoformat()
+        calls = []
+
+        def fake_search(names, api_key, from_date, language="en"):
+            calls.append(language)
+            return [{"title": f"{n} raised funding", "url": f"https://x/{n}", "publishedAt": f"{today}T00:00:00Z",
+                     "source": {"name": "Src"}} for n in names]
+
+        monkeypatch.setenv("NEWS_API_KEY", "k")
+        monkeypatch.setattr(fph, "PRIVATE_COMPANIES", ["Gusto"])
+        monkeypatch.setattr(fph, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fph, "OUTPUT_FILE", tmp_path / "private_health.json")
+        monkeypatch.setattr(fph, "STORE_FILE", tmp_path / "stores" / "private_health.json")
+        monkeypatch.setattr(fph, "_top_headlines", lambda name, api_key: [])
+        monkeypatch.setattr(fph, "_search_news", fake_search)
+        monkeypatch.setattr(fph.sys, "argv", ["fetch_private_health.py"])
+
+        first = fph.fetch_private_health()
+        second = fph.fetch_private_health()
+
+        assert calls == ["en"]  # second run served entirely from the store
+        assert first["companies"] == second["companies"] == {
+            "Gusto": [{"date": today, "summary": "Gusto raised funding", "source": "Src", "url": "https://x/Gusto"}]
+        }
+
+    def test_failed_query_does_not_advance_last_fetch(self, tmp_path, monkeypatch):
+        import fetch_private_health as fph
+
+        monkeypatch.setenv("NEWS_API_KEY", "k")
+        monkeypatch.setattr(fph, "PRIVATE_COMPANIES", ["Gusto"])
+        monkeypatch.setattr(fph, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fph, "OUTPUT_FILE", tmp_path / "private_health.json")
+        monkeypatch.setattr(fph, "STORE_FILE", tmp_path / "stores" / "private_health.json")
+        monkeypatch.setattr(fph, "_top_headlines", lambda name, api_key: [])
+        monkeypatch.setattr(fph, "_search_news", lambda *a, **k: None)
+        monkeypatch.setattr(fph.sys, "argv", ["fetch_private_health.py"])
+
+        fph.fetch_private_health()
+
+        stored = json.loads((tmp_path / "stores" / "private_health.json").read_text())
+        assert stored["last_fetch"] == {}
+
+
+class TestSectorNewsSearch:
+    """Test the concurrent DuckDuckGo sector search."""
+
+    def test_queries_run_concurrently_and_merge_per_sector(self, tmp_path, monkeypatch):
+        import threading
+        from datetime import date
+        import fetch_sector_news as fsn
+
+        today = date.today().isoformat()
+        started = threading.Barrier(3, timeout=5)
+
+        def fake_search(query, max_results=fsn.MAX_PER_QUERY, timelimit="m"):
+            started.wait()  # three searches in flight at once
+            if query == "retail software market outlook":
+                return None
+            return [
+                {"title": f"{query} stock outlook", "url": f"https://x/{query}", "date": today, "body": ""},
+                {"title": "Shared analyst note on stocks", "url": "https://x/shared", "date": today, "body": ""},
+                {"title": "Company picnic photos", "url": f"https://x/{query}/picnic", "date": today, "body": ""},
+            ]
+
+        monkeypatch.setattr(fsn, "SECTORS", fsn.SECTORS[:8])  # 24 queries: a multiple of the barrier size
+        monkeypatch.setattr(fsn, "SECTOR_NEWS_WORKERS", 3)
+        monkeypatch.setattr(fsn, "DDGS", MagicMock())
+        monkeypatch.setattr(fsn, "DATA_DIR", tmp_path)
+        monkeypatch.setattr(fsn, "OUTPUT_FILE", tmp_path / "sector_news.json")
+        monkeypatch.setattr(fsn, "STORE_FILE", tmp_path / "stores" / "sector_news.json")
+        monkeypatch.setattr(fsn, "_search_news", fake_search)
+
+        result = fsn.fetch_sector_news()
+
+        assert list(result["sectors"]) == [s["id"] for s in fsn.SECTORS]
+        for sector in fsn.SECTORS:
+            urls = {a["url"] for a in result["sectors"][sector["id"]]["articles"]}
+            expected = {f"https://x/{q}" for q in sector["queries"] if q != "retail software market outlook"}
+            assert urls == expected | {"https://x/shared"}
+        stored = json.loads((tmp_path / "stores" / "sector_news.json").read_text())
+        assert "ecommerce" not in stored["last_fetch"] and "crm" in stored["last_fetch"]
+
+
+class TestNewsClassifier:
+    """Test the shared single-pass keyword classifier."""
+
+    def test_classify_matches_whole_words_and_phrases(self):
+        from news_classifier import classify
+
+        assert classify("Gusto raises prices", "") == set()  # "raises" is not a keyword
+        assert classify("Gusto closes Series B", None) == {"deal"}
+        assert classify("SIIGO cierra una ronda de financiación") == {"deal_es_pt"}
+        assert classify("Private equity firm buys Nubox") == {"deal", "deal_es_pt", "market"}
+        assert classify("Toast stock sell-off deepens", "P/E compresses") == {"market"}
+        assert classify("Valuation reset", "") == {"deal", "market"}
+        assert classify("Company picnic photos") == set()
+
+    def test_fetchers_use_shared_categories(self):
+        import fetch_private_health as fph
+
+        layoff = {"title": "Acme announces layoffs", "description": ""}
+        ronda = {"title": "Alegra levanta una ronda", "description": ""}
+        assert fph._is_relevant(layoff, "Gusto")
+        assert not fph._is_relevant(ronda, "Alegra")
+        assert fph._is_relevant(ronda, "Alegra", use_es_pt=True)
+        # Ambiguous names must appear in the text
+        assert not fph._is_relevant({"title": "Physics wave funding", "description": ""}, "Notion")
+        assert fph._is_relevant({"title": "Notion funding round", "description": ""}, "Notion")
+
+
+class TestUpdateAll:
+    """Test the in-process update orchestrator's stage scheduling."""
+
+    def test_independent_stages_overlap_and_deps_wait(self):
+        import threading
+        import time
+        import update_all
+
+        events = []
+        lock = threading.Lock()
+
+        def stage(name, seconds):
+            def run():
+                with lock:
+                    events.append(("start", name))
+                time.sleep(seconds)
+                with lock:
+                    events.append(("end", name))
+            return run
+
+        stages = {
+            "prices": (stage("prices", 0.2), (), False),
+            "report": (stage("report", 0), ("prices", "news"), False),
+            "news": (stage("news", 0.05), (), True),
+        }
+        start = time.perf_counter()
+        status = update_all.run_stages(stages)
+
+        assert status == {"prices": "ok", "news": "ok", "report": "ok"}
+        assert time.perf_counter() - start < 0.35  # news ran alongside prices
+        assert events.index(("start", "report")) > events.index(("end", "prices"))
+
+    def test_failures_skip_dependents_unless_optional(self):
+        import update_all
+
+        ran = []
+
+        def boom():
+            raise RuntimeError("down")
+
+        stages = {
+            "prices": (boom, (), False),
+            "news": (lambda: (_ for _ in ()).throw(SystemExit(1)), (), True),
+            "daily": (lambda: ran.append("daily"), ("prices",), False),
+            "validate": (lambda: ran.append("validate"), ("daily",), False),
+            "report": (lambda: ran.append("report"), ("news", "missing"), False),
+        }
+        status = update_all.run_stages(stages)
+
+        assert status == {"prices": "failed", "news": "failed", "daily": "skipped",
+                          "validate": "skipped", "report": "ok"}
+        assert ran == ["report"]
+
+    def test_stage_graph_is_acyclic(self):
+        import update_all
+
+        stages = {name: (lambda: None, deps, optional) for name, (_, deps, optional) in update_all.STAGES.items()}
+        assert set(update_all.run_stages(stages).values()) == {"ok"}
+        with pytest.raises(ValueError, match="cycle"):
+            update_all.run_stages({"a": (lambda: None, ("b",), False), "b": (lambda: None, ("a",), False)})
+
+    def test_fundamentals_stay_off_the_price_chain(self):
+        """Only the reprice stage waits for fundamentals; daily → repair → validate never do."""
+        import update_all
+
+        def upstream(name):
+            deps = set(update_all.STAGES[name][1])
+            return deps.union(*(upstream(d) for d in deps))
+
+        assert "fundamentals" not in upstream("validate")
+        assert {"daily", "fundamentals"} <= upstream("reprice")
+
+
+class TestImportTime:
+    """Entry points must not import the Yahoo stack (yfinance/pandas/numpy) at load time."""
+
+    HEAVY_MODULES = ("yfinance", "pandas", "numpy", "curl_cffi")
+    IMPORT_BUDGET_MS = 400  # measured ~120 ms without the Yahoo stack, ~600 ms with it
+
+    # The DDG client is a real dependency of fetch_sector_news: stub it so only our own imports are timed
+    DDGS_STUB = "import types; sys.modules['duckduckgo_search'] = types.SimpleNamespace(DDGS=object); "
+
+    @pytest.mark.parametrize("module", ["fetch_prices", "fetch_fundamentals", "fetch_private_health",
+                                        "fetch_sector_news", "update_all"])
+    def test_entry_point_import_is_light(self, module):
+        import subprocess
+
+        backend = Path(__file__).resolve().parent.parent
+        code = (f"import sys; {self.DDGS_STUB}import {module}; "
+                f"print(','.join(m for m in {self.HEAVY_MODULES!r} if m in sys.modules))")
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              cwd=backend, capture_output=True, text=True, check=True)
+        assert proc.stdout.strip() == ""
+        # -X importtime lines: "import time: self [us] | cumulative | name"
+        cumulative = next(int(line.split("|")[1]) for line in proc.stderr.splitlines()
+                          if line.split("|")[-1].strip() == module)
+        assert cumulative / 1000 < self.IMPORT_BUDGET_MS
+
+
+class TestRunMetrics:
+    """Test provider call accounting and the run report."""
+
+    def test_report_percentiles_cache_hits_and_errors(self, tmp_path):
+        from run_metrics import RunMetrics
+
+        metrics = RunMetrics()
+        for ms in range(1, 21):  # 1..20 ms
+            metrics.record("fmp", "quote", ms / 1000, 200, nbytes=100)
+        metrics.record("fmp", "batch-quote", 0.0, "cache", cache_hit=True)
+        metrics.record("fmp", "quote", 0.5, 429, retries=2)
+        with pytest.raises(RuntimeError):
+            with metrics.timed("yahoo", "quote"):
+                raise RuntimeError("blocked")
+        metrics.add("fallbacks.quote.yahoo")
+        with metrics.stage("daily"):
+            pass
+
+        path = metrics.write(tmp_path / "reports" / "run.json", entry_point="fetch_prices")
+        report = json.loads(path.read_text())
+        fmp = report["providers"]["fmp"]
+        assert (fmp["calls"], fmp["network_calls"], fmp["cache_hits"], fmp["errors"]) == (22, 21, 1, 1)
+        assert fmp["retries"] == 2 and fmp["bytes"] == 2000
+        assert fmp["status"] == {"200": 20, "cache": 1, "429": 1}
+        assert fmp["latency_ms"]["p50"] == 11.0 and fmp["latency_ms"]["p95"] == 20.0 and fmp["latency_ms"]["max"] == 500.0
+        assert report["providers"]["yahoo"]["status"] == {"error": 1}
+        assert report["counters"] == {"fallbacks.quote.yahoo": 1}
+        assert report["stages"]["daily"]["status"] == "ok" and report["entry_point"] == "fetch_prices"
+
+    def test_fmp_fetcher_records_calls(self, tmp_path):
+        import run_metrics
+        from http_cache import ResponseCache
+
+        metrics = run_metrics.RunMetrics()
+        session = MagicMock()
+        session.get.return_value = MagicMock(status_code=200, content=b'[{"price": 1}]', json=lambda: [{"price": 1}])
+        fetcher = FMPFetcher(api_key="k", cache=ResponseCache(tmp_path / "c.sqlite"), session=session)
+        with patch.object(run_metrics, "_metrics", metrics):
+            fetcher._fetch_json("quote", {"symbol": "CRM"})
+            fetcher._fetch_json("quote", {"symbol": "CRM"})
+
+        fmp = metrics.providers()["fmp"]
+        assert (fmp["calls"], fmp["network_calls"], fmp["cache_hits"], fmp["bytes"]) == (2, 1, 1, 14)
+
+
+class TestCassette:
+    """Test record/replay of provider responses."""
+
+    @pytest.fixture
+    def use_cassette(self, monkeypatch):
+        import cassette
+
+        def use(c):
+            monkeypatch.setattr(cassette, "_cassette", c)
+            monkeypatch.setattr(cassette, "_cassette_loaded", True)
+            return c
+        return use
+
+    def test_record_then_replay_offline(self, tmp_path, use_cassette, monkeypatch):
+        from cassette import RECORD, REPLAY, Cassette, CassetteMiss
+
+        path = tmp_path / "run.json.gz"
+        session = MagicMock()
+        responses = iter([
+            MagicMock(status_code=200, content=b"[]", json=lambda: [{"symbol": "CRM", "price": 190.0}]),
+            MagicMock(status_code=200, content=b"[]", json=lambda: [{"symbol": "CRM", "price": 191.0}]),
+        ])
+        session.get.side_effect = lambda *a, **k: next(responses)
+        recorder = use_cassette(Cassette(path, RECORD))
+        live = FMPFetcher(api_key="k", session=session)
+        assert live._fetch_json("quote", {"symbol": "CRM"})[0]["price"] == 190.0
+        assert live._fetch_json("quote", {"symbol": "CRM"})[0]["price"] == 191.0
+        recorder.save()
+
+        sleeps = []
+        use_cassette(Cassette(path, REPLAY, latency_ms="25", sleep=sleeps.append))
+        monkeypatch.delenv("FMP_API_KEY", raising=False)
+        offline = FMPFetcher(session=MagicMock(get=MagicMock(side_effect=AssertionError("network call"))))
+        prices = [offline._fetch_json("quote", {"symbol": "CRM"})[0]["price"] for _ in range(3)]
+        assert prices == [190.0, 191.0, 191.0]  # recorded order, then the last response repeats
+        assert sleeps == [0.025] * 3
+        with pytest.raises(CassetteMiss):
+            offline._fetch_json("quote", {"symbol": "HUBS"})
+
+    def test_replayed_http_error_keeps_status(self, tmp_path, use_cassette):
+        import requests
+        from cassette import RECORD, REPLAY, Cassette
+
+        path = tmp_path / "run.json.gz"
+        error = requests.exceptions.HTTPError("402 Payment Required", response=MagicMock(status_code=402))
+        session = MagicMock()
+        session.get.return_value = MagicMock(status_code=402, content=b"", raise_for_status=MagicMock(side_effect=error))
+        recorder = use_cassette(Cassette(path, RECORD))
+        with pytest.raises(requests.exceptions.HTTPError):
+            FMPFetcher(api_key="k", session=session)._fetch_json("batch-quote", {"symbols": "CRM,HUBS"})
+        recorder.save()
+
+        use_cassette(Cassette(path, REPLAY))
+        offline = FMPFetcher(api_key="k", session=MagicMock())
+        assert offline.get_batch_quote(["CRM", "HUBS"], fallback_to_single=False) == []
+        assert offline.batch_quote_supported is False  # 402 replayed: batch endpoint marked unsupported
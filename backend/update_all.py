@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+SaaSpocalypse Full Update — keeps ALL project tabs coherent.
+
+Runs every fetch stage in one process as a dependency graph: the price chain
+(backfill → LTM → today's snapshot → repair → validate) and the independent stages
+(fundamentals, private health, sector news) share one startup, one FMP fetcher, one price
+store and one parsed data/ index. Stages start as soon as their dependencies finish, so
+the update takes about as long as its critical path.
+
+Run: python update_all.py [--skip fundamentals,sector-news] [--workers N]
+Or:  npm run update
+"""
+
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import fetch_prices
+from run_metrics import get_metrics, write_report
+
+
+def _backfill():
+    # Baseline, backfill and the daily patch pass share one history load
+    fetch_prices._prime_history(fetch_prices.BACKFILL_HISTORY_START)
+    fetch_prices.fetch_baseline()
+    fetch_prices.backfill()
+
+
+def _daily():
+    # Force: overwrite today's snapshot if it exists
+    today = datetime.now().strftime("%Y-%m-%d")
+    f = fetch_prices.DATA_DIR / f"{today}.json"
+    if f.exists():
+        f.unlink()
+    fetch_prices.fetch_daily_snapshot(reprice=False)
+    fetch_prices._patch_baseline_from_daily()
+    fetch_prices._patch_ltm_from_daily()
+
+
+def _reprice():
+    # ARR multiples from today's closes, once both the snapshot and the fundamentals fetch are in
+    from fetch_fundamentals import reprice_from_snapshot
+    today = datetime.now().strftime("%Y-%m-%d")
+    snapshot = fetch_prices._get_daily_index().get(today)
+    repriced = reprice_from_snapshot(snapshot, fetch_prices.DATA_DIR) if snapshot else 0
+    print(f"  📐 Repriced fundamentals for {repriced} tickers from {today} closes")
+
+
+def _validate():
+    if not fetch_prices.validate_data():
+        raise RuntimeError("validation failed")
+
+
+def _fundamentals():
+    from fetch_fundamentals import fetch_fundamentals
+    fetch_fundamentals()
+
+
+def _private_health():
+    from fetch_private_health import fetch_private_health
+    fetch_private_health()
+
+
+def _sector_news():
+    from fetch_sector_news import fetch_sector_news
+    fetch_sector_news()
+
+
+# name: (function, dependencies, optional). A failed optional stage is reported and
+# skipped; a failed required stage skips everything that depends on it.
+STAGES = {
+    "backfill": (_backfill, (), False),
+    "ltm": (fetch_prices.fetch_ltm_high, ("backfill",), False),  # sector calculations depend on this
+    "fundamentals": (_fundamentals, (), True),
+    "daily": (_daily, ("ltm",), False),
+    # Off the price chain: the fundamentals fetch must not delay daily, repair and validate
+    "reprice": (_reprice, ("daily", "fundamentals"), True),
+    "repair": (fetch_prices.repair_daily_files, ("daily",), False),
+    "private-health": (_private_health, (), True),  # needs NEWS_API_KEY
+    "sector-news": (_sector_news, (), True),  # needs duckduckgo-search
+    "validate": (_validate, ("repair",), False),
+}
+
+
+def run_stages(stages: dict, workers: int = 4) -> dict[str, str]:
+    """
+    Run stages {name: (fn, deps, optional)} on a thread pool in dependency order.
+    Returns {name: "ok" | "failed" | "skipped"}. Dependencies on a stage that is not in
+    stages (e.g. removed with --skip) are treated as satisfied.
+    """
+    status = {}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while len(status) < len(stages):
+            resolved = len(status)
+            for name, (fn, deps, optional) in stages.items():
+                if name in status or name in running.values():
+                    continue
+                deps = [d for d in deps if d in stages]
+                blocked = [d for d in deps if status.get(d) in ("failed", "skipped") and not stages[d][2]]
+                if blocked:
+                    status[name] = "skipped"
+                    get_metrics().set_stage(name, 0.0, "skipped")
+                    print(f"⏭ {name}: skipped ({', '.join(blocked)} did not complete)")
+                elif all(d in status for d in deps):
+                    print(f"▶ {name}")
+                    running[pool.submit(_timed, name, fn)] = name
+            if not running:
+                if len(status) == resolved:
+                    raise ValueError(f"dependency cycle among: {', '.join(n for n in stages if n not in status)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error, elapsed = future.result()
+                if error is None:
+                    status[name] = "ok"
+                    print(f"✅ {name} ({elapsed:.1f}s)")
+                else:
+                    status[name] = "failed"
+                    optional = stages[name][2]
+                    print(f"{'⚠' if optional else '❌'} {name} failed after {elapsed:.1f}s: {error}")
+    return status
+
+
+def _timed(name: str, fn) -> tuple[str | None, float]:
+    start = time.perf_counter()
+    try:
+        fn()
+        error = None
+    except SystemExit as e:  # fetchers exit when a key or package is missing
+        error = f"exited ({e.code})"
+    except Exception as e:
+        traceback.print_exc()
+        error = str(e) or type(e).__name__
+    elapsed = time.perf_counter() - start
+    get_metrics().set_stage(name, elapsed, "ok" if error is None else "failed")
+    return error, elapsed
+
+
+def _arg_list(flag: str) -> list[str]:
+    """Comma-separated values following flag in sys.argv (e.g. --skip a,b), or []."""
+    if flag in sys.argv:
+        idx = sys.argv.index(flag)
+        if idx + 1 < len(sys.argv):
+            return [v for v in sys.argv[idx + 1].split(",") if v]
+    return []
+
+
+def main() -> int:
+    skip = _arg_list("--skip")
+    unknown = [s for s in skip if s not in STAGES]
+    if unknown:
+        print(f"❌ Unknown stage(s): {', '.join(unknown)}. Stages: {', '.join(STAGES)}")
+        return 2
+    fetch_prices.set_concurrency(workers=fetch_prices._arg_int("--workers"))
+    stages = {name: stage for name, stage in STAGES.items() if name not in skip}
+
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("  SaaSpocalypse Tracker — Full Update")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
+    start = time.perf_counter()
+    try:
+        status = run_stages(stages)
+    finally:
+        fetch_prices._save_price_store()
+        fetch_prices._report_cache_stats()
+        fetch_prices._report_breakers()
+        write_report()
+
+    failed = [name for name, s in status.items() if s != "ok" and not stages[name][2]]
+    print("\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    if failed:
+        print(f"  ❌ Update incomplete ({', '.join(failed)}) after {time.perf_counter() - start:.0f}s")
+    else:
+        print(f"  ✅ Update complete in {time.perf_counter() - start:.0f}s. All tabs are coherent.")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,12 +3,20 @@ Yahoo Finance fallback when FMP has no data (402, empty, or missing tickers).
 All tickers are listed and active; "possibly delisted" / "no timezone found" are
 Yahoo bot-protection false positives. We suppress those and use a browser-like
 session when available.
+
+yfinance (and pandas/numpy with it) is imported on first use, not at module load, so
+--validate, --repair with nothing to fetch and FMP-only runs never pay for it.
 """
 
 import logging
+import threading
 import warnings
 from datetime import datetime, timedelta
 
+from cassette import replayable
+from rate_limit import get_limiter
+from run_metrics import get_metrics
+
 # Suppress yfinance false "possibly delisted" / "no timezone found" messages
 # (Yahoo rate-limit/bot-protection triggers these for valid, listed tickers)
 warnings.filterwarnings("ignore", message=".*possibly delisted.*")
@@ -16,23 +24,74 @@ warnings.filterwarnings("ignore", message=".*no timezone found.*")
 warnings.filterwarnings("ignore", message=".*No timezone found.*")
 logging.getLogger("yfinance").setLevel(logging.WARNING)
 
-try:
-    import yfinance as yf
-except ImportError:
-    yf = None
+# Messages yfinance raises or logs when Yahoo rate-limits or blocks us, as opposed to a
+# symbol or date range that simply has no data
+BLOCKED_MARKERS = ("too many requests", "rate limit", "error 401", "error 403", "unauthorized", "forbidden",
+                   "invalid crumb", "will be right back", "currently down")
+_blocked = threading.local()
+
+
+def _note_blocked(message: str) -> None:
+    if any(m in message.lower() for m in BLOCKED_MARKERS):
+        _blocked.flag = True
+
+
+def take_blocked() -> bool:
+    """True if a Yahoo call on this thread was rate-limited or blocked since the last check; clears it."""
+    flag = getattr(_blocked, "flag", False)
+    _blocked.flag = False
+    return flag
 
-# Optional: browser-impersonating session to bypass Yahoo bot protection
+
+class _BlockedLogHandler(logging.Handler):
+    """yf.download logs per-symbol errors instead of raising; catch the blocking ones."""
+
+    def emit(self, record):
+        _note_blocked(record.getMessage())
+
+
+logging.getLogger("yfinance").addHandler(_BlockedLogHandler(logging.ERROR))
+
+_yf = None
 _yf_session = None
-try:
-    from curl_cffi import requests as curl_requests
-    _yf_session = curl_requests.Session(impersonate="chrome", timeout=15)
-except ImportError:
-    pass
+_yf_loaded = False
+_yf_lock = threading.Lock()
+
+
+def load_yfinance():
+    """
+    Import yfinance and set up the Yahoo session on first call. Returns the yfinance
+    module, or None if it is not installed.
+    """
+    global _yf, _yf_session, _yf_loaded
+    with _yf_lock:
+        if not _yf_loaded:
+            try:
+                import yfinance
+                _yf = yfinance
+            except ImportError:
+                pass
+            # Optional: browser-impersonating session to bypass Yahoo bot protection
+            try:
+                from curl_cffi import requests as curl_requests
+                _yf_session = curl_requests.Session(impersonate="chrome", timeout=15)
+            except ImportError:
+                pass
+            _yf_loaded = True
+    return _yf
+
+
+def yahoo_session():
+    """Browser-impersonating session for yfinance calls, or None if curl_cffi is not installed."""
+    load_yfinance()
+    return _yf_session
 
 
 def _ensure_yf():
+    yf = load_yfinance()
     if yf is None:
         raise ImportError("yfinance not installed. Run: pip install yfinance")
+    return yf
 
 
 def _get_close_series(data, ticker):
@@ -51,18 +110,23 @@ def _get_close_series(data, ticker):
     return col.dropna()
 
 
+@replayable("yahoo", "quote")
 def get_quote(ticker: str) -> dict | None:
     """
     Get current quote for a ticker via yfinance.
     Returns dict with: symbol, price, previousClose, change, changePercentage
     (matching FMP quote shape for compatibility).
     """
-    _ensure_yf()
+    yf = _ensure_yf()
     try:
         kwargs = {"progress": False, "threads": False, "auto_adjust": True, "ignore_tz": True}
         if _yf_session is not None:
             kwargs["session"] = _yf_session
-        data = yf.download(ticker, period="5d", **kwargs)
+        get_limiter("yahoo").acquire()
+        with get_metrics().timed("yahoo", "quote") as call:
+            data = yf.download(ticker, period="5d", **kwargs)
+            if data is None or data.empty:
+                call["status"] = "empty"
         if data is None or data.empty or len(data) < 2:
             return None
         closes = _get_close_series(data, ticker)
@@ -78,24 +142,58 @@ def get_quote(ticker: str) -> dict | None:
             "change": current - prev_close,
             "changePercentage": daily_change,
         }
-    except Exception:
+    except Exception as e:
+        _note_blocked(f"{type(e).__name__}: {e}")
         return None
 
 
-def _get_row_val(row, key, default=0):
-    """Extract value from row (handles multi-level columns like ('Close', 'AAPL'))."""
-    for c in row.index:
+def _resolve_column(data, key):
+    """Return the column for key (or the first ('Close', ticker)-style column in MultiIndex frames), or None."""
+    for c in data.columns:
         if c == key or (isinstance(c, tuple) and c[0] == key):
-            return float(row[c])
-    return float(default)
+            return data[c]
+    return None
+
+
+def _frame_to_rows(data) -> list[dict]:
+    """
+    Convert a single-ticker yfinance DataFrame to FMP-shaped rows, newest first.
+    Columnar: resolves Open/High/Low/Close once and builds rows from whole arrays.
+    Rows without a close are dropped; missing open/high/low fall back to close.
+    """
+    import numpy as np
+
+    close_col = _resolve_column(data, "Close")
+    if close_col is None:
+        return []
+    close = close_col.to_numpy(dtype=float)
+    keep = ~np.isnan(close)
+    close = close[keep]
+    index = data.index[keep]
+    dates = index.strftime("%Y-%m-%d") if hasattr(index, "strftime") else [str(i)[:10] for i in index]
+    ohl = []
+    for key in ("Open", "High", "Low"):
+        col = _resolve_column(data, key)
+        if col is None:
+            ohl.append(close)
+            continue
+        vals = col.to_numpy(dtype=float)[keep]
+        ohl.append(np.where(np.isnan(vals), close, vals))
+    rows = [
+        {"date": d, "open": o, "high": h, "low": lo, "close": c}
+        for d, o, h, lo, c in zip(list(dates), ohl[0].tolist(), ohl[1].tolist(), ohl[2].tolist(), close.tolist())
+    ]
+    rows.sort(key=lambda r: r["date"], reverse=True)
+    return rows
 
 
+@replayable("yahoo", "historical")
 def get_historical_eod(ticker: str, from_date: str, to_date: str) -> list[dict]:
     """
     Get historical EOD data for a ticker via yfinance.
     Returns list of dicts with: date, open, high, low, close (matching FMP shape).
     """
-    _ensure_yf()
+    yf = _ensure_yf()
     try:
         kwargs = {
             "start": from_date,
@@ -108,21 +206,115 @@ def get_historical_eod(ticker: str, from_date: str, to_date: str) -> list[dict]:
         }
         if _yf_session is not None:
             kwargs["session"] = _yf_session
-        data = yf.download(ticker, **kwargs)
+        get_limiter("yahoo").acquire()
+        with get_metrics().timed("yahoo", "historical") as call:
+            data = yf.download(ticker, **kwargs)
+            if data is None or data.empty:
+                call["status"] = "empty"
         if data is None or data.empty:
             return []
-        rows = []
-        for idx, row in data.iterrows():
-            date_str = idx.strftime("%Y-%m-%d") if hasattr(idx, "strftime") else str(idx)[:10]
-            close_val = _get_row_val(row, "Close", 0)
-            rows.append({
-                "date": date_str,
-                "open": _get_row_val(row, "Open", close_val),
-                "high": _get_row_val(row, "High", close_val),
-                "low": _get_row_val(row, "Low", close_val),
-                "close": close_val,
-            })
-        rows.sort(key=lambda r: r["date"], reverse=True)
-        return rows
-    except Exception:
+        return _frame_to_rows(data)
+    except Exception as e:
+        _note_blocked(f"{type(e).__name__}: {e}")
         return []
+
+
+def _download_many(tickers: list[str], **kwargs):
+    """
+    One multi-symbol yf.download. Always returns (field, ticker) MultiIndex columns
+    (group_by="column"), or None on failure / no data.
+    """
+    kwargs.update({
+        "group_by": "column",
+        "progress": False,
+        "threads": True,
+        "auto_adjust": True,
+        "ignore_tz": True,
+        "timeout": 15,
+    })
+    yf = _ensure_yf()
+    if _yf_session is not None:
+        kwargs["session"] = _yf_session
+    get_limiter("yahoo").acquire()
+    operation = "batch-historical" if "start" in kwargs else "batch-quote"
+    with get_metrics().timed("yahoo", operation) as call:
+        data = yf.download(list(tickers), **kwargs)
+        if data is None or data.empty:
+            call["status"] = "empty"
+    if data is None or data.empty:
+        return None
+    if getattr(data.columns, "nlevels", 1) < 2:
+        # Older yfinance collapses a one-symbol download to flat columns
+        import pandas as pd
+        data.columns = pd.MultiIndex.from_product([data.columns, [tickers[0]]])
+    return data
+
+
+def _ticker_frame(data, ticker: str):
+    """Slice one ticker's columns out of a (field, ticker) MultiIndex frame; drops empty rows."""
+    if ticker not in data.columns.get_level_values(1):
+        return None
+    frame = data.xs(ticker, axis=1, level=1)
+    if "Close" not in frame.columns:
+        return None
+    # Calendars differ across exchanges: a multi-symbol frame has NaN rows on the
+    # other markets' trading days
+    return frame.dropna(subset=["Close"])
+
+
+@replayable("yahoo", "batch-quote")
+def get_quotes(tickers: list[str]) -> dict[str, dict]:
+    """
+    Batch variant of get_quote: one multi-symbol yfinance download for all tickers.
+    Returns {ticker: quote} (FMP quote shape) for tickers with at least two closes.
+    """
+    _ensure_yf()
+    if not tickers:
+        return {}
+    try:
+        data = _download_many(tickers, period="5d")
+        if data is None:
+            return {}
+        quotes = {}
+        for ticker in tickers:
+            frame = _ticker_frame(data, ticker)
+            if frame is None or len(frame) < 2:
+                continue
+            current = float(frame["Close"].iloc[-1])
+            prev_close = float(frame["Close"].iloc[-2])
+            quotes[ticker] = {
+                "symbol": ticker,
+                "price": current,
+                "previousClose": prev_close,
+                "change": current - prev_close,
+                "changePercentage": ((current - prev_close) / prev_close) * 100,
+            }
+        return quotes
+    except Exception as e:
+        _note_blocked(f"{type(e).__name__}: {e}")
+        return {}
+
+
+@replayable("yahoo", "batch-historical")
+def get_historical_eod_batch(tickers: list[str], from_date: str, to_date: str) -> dict[str, list[dict]]:
+    """
+    Batch variant of get_historical_eod: one multi-symbol yfinance download.
+    Returns {ticker: rows} (FMP shape, newest first) for tickers with data.
+    """
+    _ensure_yf()
+    if not tickers:
+        return {}
+    try:
+        data = _download_many(tickers, start=from_date, end=to_date)
+        if data is None:
+            return {}
+        result = {}
+        for ticker in tickers:
+            frame = _ticker_frame(data, ticker)
+            if frame is None or frame.empty:
+                continue
+            result[ticker] = _frame_to_rows(frame)
+        return result
+    except Exception as e:
+        _note_blocked(f"{type(e).__name__}: {e}")
+        return {}
@@ -0,0 +1,36 @@
+/**
+ * UNIT TESTS — history.json → snapshot expansion
+ * Bottom of the test pyramid: fast, no DOM, no React.
+ */
+import { describe, it, expect } from "vitest";
+import { snapshotsFromHistory } from "../../priceHistory.js";
+
+const HISTORY = {
+  tickers: ["CRM", "ADP"],
+  dates: ["2026-02-03", "2026-02-04"],
+  time_labels: [null, "noon"],
+  fetched_at: ["2026-02-03T16:30:00", "2026-02-04T12:05:00"],
+  close: [[100, 50], [101, null]],
+  prev_close: [[99, 49], [100, null]],
+  daily_pct: [[1.01, 2.04], [1.0, null]],
+};
+
+describe("snapshotsFromHistory", () => {
+  it("returns one snapshot per date with per-ticker values", () => {
+    const snapshots = snapshotsFromHistory(HISTORY);
+    expect(snapshots.map((s) => s.date)).toEqual(["2026-02-03", "2026-02-04"]);
+    expect(snapshots[0].tickers.ADP).toEqual({ close: 50, prev_close: 49, daily_pct: 2.04 });
+  });
+
+  it("skips tickers without a close and keeps intraday labels", () => {
+    const [, second] = snapshotsFromHistory(HISTORY);
+    expect(Object.keys(second.tickers)).toEqual(["CRM"]);
+    expect(second.time_label).toBe("noon");
+    expect(snapshotsFromHistory(HISTORY)[0].time_label).toBeUndefined();
+  });
+
+  it("returns an empty list for a missing or malformed artifact", () => {
+    expect(snapshotsFromHistory(null)).toEqual([]);
+    expect(snapshotsFromHistory({ files: [] })).toEqual([]);
+  });
+});
@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useMemo } from "react";
 import { SECTORS } from "../sectors.js";
+import { loadDailySnapshots } from "../priceHistory.js";
 import { theme } from "../atoms/tokens/theme.js";
 
 const SECTOR_ORDER = ["crm", "project", "document", "payroll", "accounting", "ecommerce", "pos", "hotel", "consolidators"];
@@ -175,18 +176,12 @@ export default function IndexesTab() {
 
   async function loadData() {
     try {
-      const listRes = await fetch("/api/data/");
-      const list = await listRes.json();
-      const dailyFiles = list.files.filter(
-        (f) => f !== "baseline.json" && f !== "ltm_high.json" && f !== "fundamentals.json" && f !== "private_health.json" && f !== "sector_news.json"
-      );
-      const [baselineData, ltmData, fundData, ...snapshots] = await Promise.all([
+      const [baselineData, ltmData, fundData, valid] = await Promise.all([
         fetch("/api/data/baseline.json").then((r) => (r.ok ? r.json() : null)).catch(() => null),
         fetch("/api/data/ltm_high.json").then((r) => (r.ok ? r.json() : null)).catch(() => null),
         fetch("/api/data/fundamentals.json").then((r) => (r.ok ? r.json() : null)).catch(() => null),
-        ...dailyFiles.map((f) => fetch(`/api/data/${f}`).then((r) => r.json())),
+        loadDailySnapshots(),
       ]);
-      const valid = snapshots.filter((s) => s && typeof s.date === "string");
       const normalizedSnapshots = normalizeSnapshotsByDate(valid);
       setBaseline(buildBaseline(baselineData, normalizedSnapshots[0]));
       setDailyData(normalizedSnapshots);
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { SECTORS } from "../sectors.js";
+import { loadDailySnapshots } from "../priceHistory.js";
 import { CompanyRow } from "../molecules/index.js";
 import SectorChart from "./SectorChart.jsx";
 import ConsolidatorDetailModal from "./ConsolidatorDetailModal.jsx";
@@ -216,17 +217,12 @@ export default function Tracker() {
 
   async function loadData() {
     try {
-      const listRes = await fetch("/api/data/");
-      const list = await listRes.json();
-      const dailyFiles = list.files.filter((f) => f !== "baseline.json" && f !== "ltm_high.json" && f !== "fundamentals.json");
-
-      const [baselineData, ltmHighData, ...snapshots] = await Promise.all([
+      const [baselineData, ltmHighData, validSnapshots] = await Promise.all([
         fetch("/api/data/baseline.json").then((r) => (r.ok ? r.json() : null)).catch(() => null),
         fetch("/api/data/ltm_high.json").then((r) => (r.ok ? r.json() : null)).catch(() => null),
-        ...dailyFiles.map((f) => fetch(`/api/data/${f}`).then((r) => r.json())),
+        loadDailySnapshots(),
       ]);
 
-      const validSnapshots = snapshots.filter((s) => s && typeof s.date === "string");
       const normalizedSnapshots = normalizeSnapshotsByDate(validSnapshots);
       const firstDay = normalizedSnapshots[0] || null;
       const base = buildBaseline(baselineData, firstDay);
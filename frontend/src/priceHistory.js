@@ -0,0 +1,54 @@
+// Daily price snapshots — loaded from the consolidated history.json written by
+// backend/fetch_prices.py, falling back to one request per daily file when it is missing.
+
+export const HISTORY_FILE = "history.json";
+
+// data/ files that are not daily snapshots
+const NON_SNAPSHOT_FILES = new Set([
+  "baseline.json",
+  "ltm_high.json",
+  "fundamentals.json",
+  "private_health.json",
+  "sector_news.json",
+  "manifest.json",
+  HISTORY_FILE,
+]);
+
+/**
+ * Expand the columnar artifact ({ tickers, dates, close[][], prev_close[][], daily_pct[][] })
+ * back into snapshot objects shaped like the per-day files: { date, time_label, fetched_at, tickers }.
+ */
+export function snapshotsFromHistory(history) {
+  if (!history || !Array.isArray(history.dates) || !Array.isArray(history.tickers)) return [];
+  return history.dates.map((date, row) => {
+    const tickers = {};
+    history.tickers.forEach((ticker, col) => {
+      const close = history.close?.[row]?.[col];
+      if (close == null) return;
+      tickers[ticker] = {
+        close,
+        prev_close: history.prev_close?.[row]?.[col] ?? null,
+        daily_pct: history.daily_pct?.[row]?.[col] ?? null,
+      };
+    });
+    const snapshot = { date, tickers };
+    if (history.time_labels?.[row]) snapshot.time_label = history.time_labels[row];
+    if (history.fetched_at?.[row]) snapshot.fetched_at = history.fetched_at[row];
+    return snapshot;
+  });
+}
+
+/** All daily snapshots: one request for history.json, or the file list + every daily file. */
+export async function loadDailySnapshots() {
+  const history = await fetch(`/api/data/${HISTORY_FILE}`)
+    .then((r) => (r.ok ? r.json() : null))
+    .catch(() => null);
+  const fromHistory = snapshotsFromHistory(history);
+  if (fromHistory.length) return fromHistory;
+
+  const listRes = await fetch("/api/data/");
+  const list = await listRes.json();
+  const dailyFiles = (list.files || []).filter((f) => !NON_SNAPSHOT_FILES.has(f));
+  const snapshots = await Promise.all(dailyFiles.map((f) => fetch(`/api/data/${f}`).then((r) => r.json())));
+  return snapshots.filter((s) => s && typeof s.date === "string");
+}